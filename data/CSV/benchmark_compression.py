@@ -0,0 +1,122 @@
+"""
+benchmark_compression.py
+Compares parsing raw and compressed stats.txt files
+
+Copies every data/part4/<design>/<workload>/stats.txt into a temporary
+directory (decompressing runs the runner already compressed), compresses
+the copies with each available codec (gzip, and
+zstd with the zstandard package) the way run_part4_sim.py --compress does,
+and reports:
+- disk footprint of the raw and compressed files and the compression
+  ratio, plus the time taken to compress them
+- parse throughput (best of --repeat passes over all files) of the
+  filtered ROI parse used by parse_data.py (stops after the ROI dump) and
+  of a full read of every dump, in files/s and raw MB/s
+Checks every codec gives the same stats as the raw files.
+
+Usage:
+  python3 data/CSV/benchmark_compression.py [--repeat 5]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from parse_data import DATA_DIR, existing_stats_files, extract_middle_stats
+from metric_registry import stat_paths
+from gem5stats import compression, read_dumps
+
+
+def roi_parse(stats_file: Path) -> Dict[str, float]:
+    return extract_middle_stats(stats_file, names=stat_paths())
+
+
+def full_parse(stats_file: Path) -> Dict[int, Dict[str, float]]:
+    return read_dumps(stats_file, 'all')
+
+
+PARSERS = {
+    "roi": roi_parse,
+    "all dumps": full_parse
+}
+
+
+def time_parser(parse: Callable, files: List[Path], repeat: int) -> float:
+    """Best wall-clock time of repeat passes over all files."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for stats_file in files:
+            parse(stats_file)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def copy_tree(files: List[Path], target: Path) -> List[Path]:
+    """Copy stats files, decompressed, to target/<design>/<workload>/stats.txt."""
+    copies = []
+    for stats_file in files:
+        copy = target / stats_file.parent.parent.name / stats_file.parent.name / "stats.txt"
+        copy.parent.mkdir(parents=True, exist_ok=True)
+        with compression.open_binary(stats_file) as source, open(copy, 'wb') as out:
+            shutil.copyfileobj(source, out)
+        copies.append(copy)
+    return copies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing raw versus compressed stats.txt files")
+    parser.add_argument('--repeat', type=int, default=5, help="passes over all files per parser")
+    args = parser.parse_args()
+
+    runs = existing_stats_files()
+    if not runs:
+        print(f"✗ No stats.txt files under {DATA_DIR}")
+        return
+    codecs = compression.available_codecs()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = copy_tree(runs, Path(tmp) / "raw")
+        raw_bytes = sum(f.stat().st_size for f in files)
+        print("=" * 80)
+        print(f"Benchmarking {len(files)} stats.txt files ({raw_bytes / 1024 ** 2:.1f} MiB raw), "
+              f"codecs: {', '.join(codecs)}")
+        if "zstd" not in codecs:
+            print("  (zstd skipped: the zstandard package is not installed)")
+        print("=" * 80)
+
+        variants = {"raw": files}
+        for codec in codecs:
+            copies = copy_tree(files, Path(tmp) / codec)
+            start = time.perf_counter()
+            variants[codec] = [compression.compress_file(copy, codec) for copy in copies]
+            seconds = time.perf_counter() - start
+            size = sum(f.stat().st_size for f in variants[codec])
+            print(f"  {codec:>5}: {size / 1024 ** 2:8.2f} MiB on disk, ratio {raw_bytes / size:5.1f}x, "
+                  f"compressed in {seconds:.2f}s ({raw_bytes / seconds / 1e6:.0f} MB/s)")
+
+        # repr() so that nan stats (e.g. avgBlocked) compare equal
+        expected = repr([full_parse(f) for f in files])
+        for codec in codecs:
+            if repr([full_parse(f) for f in variants[codec]]) != expected:
+                print(f"✗ {codec} files parse differently from the raw files")
+                return
+        print("✓ Every codec gives the same stats as the raw files\n")
+
+        for name, parse in PARSERS.items():
+            print(f"Parse throughput ({name}):")
+            baseline = None
+            for variant, paths in variants.items():
+                seconds = time_parser(parse, paths, args.repeat)
+                baseline = baseline or seconds
+                print(f"  {variant:>5}: {seconds * 1000:8.1f} ms for all files "
+                      f"({len(paths) / seconds:7.1f} files/s, {raw_bytes / seconds / 1e6:6.1f} MB/s raw), "
+                      f"{seconds / baseline:.2f}x raw time")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+benchmark_ingest.py
+Scaling benchmark for parallel stats ingestion
+
+Parses the Part 4 stats.txt files with parse_runs (no parse cache) at
+increasing worker counts and reports files/sec and speedup over one
+worker. --copies repeats the file list to mimic a larger sweep (the same
+files are re-read, so after the first pass they come from the page
+cache). Also checks every worker count gives the same rows in the same
+order.
+
+Usage:
+  python3 data/CSV/benchmark_ingest.py [--workers 1 2 4 8] [--copies 10]
+"""
+
+import argparse
+import os
+import time
+
+from parse_data import DESIGNS, WORKLOADS, parse_runs, run_stats_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel stats ingestion")
+    cores = os.cpu_count() or 1
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, 8, cores}),
+                        help="worker counts to measure")
+    parser.add_argument('--copies', type=int, default=10,
+                        help="times each of the part4 files is parsed per measurement")
+    args = parser.parse_args()
+
+    runs = []
+    for design_id in DESIGNS:
+        for workload in WORKLOADS:
+            stats_file = run_stats_file(design_id, workload)
+            if stats_file.exists():
+                runs.append(stats_file)
+    if not runs:
+        print("✗ No Part 4 stats.txt files found")
+        return
+    runs = runs * args.copies
+
+    print("=" * 80)
+    print(f"Parallel ingestion: {len(runs)} files, {cores} CPU cores")
+    print("=" * 80)
+    print(f"  {'workers':>7}  {'seconds':>8}  {'files/sec':>10}  {'speedup':>7}")
+
+    reference = None
+    baseline = None
+    consistent = True
+    for workers in args.workers:
+        start = time.perf_counter()
+        rows = parse_runs(runs, workers)
+        elapsed = time.perf_counter() - start
+
+        if reference is None:
+            reference = rows
+        elif rows != reference:
+            print(f"  ✗ {workers} workers returned different rows")
+            consistent = False
+        baseline = baseline or elapsed
+        print(f"  {workers:>7}  {elapsed:8.2f}  {len(runs) / elapsed:10.1f}  {baseline / elapsed:6.2f}x")
+
+    if consistent:
+        print("\n✓ Rows identical and in the same order for every worker count")
+
+
+if __name__ == "__main__":
+    main()
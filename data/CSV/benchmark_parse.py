@@ -0,0 +1,120 @@
+"""
+benchmark_parse.py
+Compares the shared gem5stats parser with the original split-based one
+
+Times three ways of getting Part 4 metrics out of every
+data/part4/<design>/<workload>/stats.txt (decompressed into a temporary
+directory first, as the split parser reads raw files):
+- split: the original parser (reads the whole file, re-splits it on the
+  dump markers, then parses the ROI dump's lines), kept here as the
+  baseline
+- streaming: extract_middle_stats (gem5stats, stops after the ROI dump)
+  then extract_metrics on the parsed values
+- filtered: the same, converting only the registry's stats (parse_run)
+Checks all give the same metrics, then reports the best of --repeat
+passes over all files and the peak memory of one pass (tracemalloc).
+
+Usage:
+  python3 data/CSV/benchmark_parse.py [--repeat 5]
+"""
+
+import argparse
+import re
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from parse_data import DATA_DIR, existing_stats_files, extract_metrics, extract_middle_stats
+from metric_registry import stat_paths
+from benchmark_compression import copy_tree
+
+
+def split_parse(stats_file: Path) -> Dict[str, any]:
+    with open(stats_file, 'r') as f:
+        content = f.read()
+    dumps = re.split(r'-{10} Begin Simulation Statistics -{10}', content)
+    dump = dumps[2] if len(dumps) >= 3 else dumps[-1]
+    lines = dump.split('---------- End Simulation Statistics')[0].strip().split('\n')
+    return extract_metrics(lines)
+
+
+def streaming_parse(stats_file: Path) -> Dict[str, any]:
+    return extract_metrics(extract_middle_stats(stats_file))
+
+
+def filtered_parse(stats_file: Path) -> Dict[str, any]:
+    return extract_metrics(extract_middle_stats(stats_file, names=stat_paths()))
+
+
+PARSERS = {
+    "split": split_parse,
+    "streaming": streaming_parse,
+    "filtered": filtered_parse
+}
+
+
+def time_parser(parse: Callable, files: List[Path], repeat: int) -> float:
+    """Best wall-clock time of repeat passes over all files."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for stats_file in files:
+            parse(stats_file)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(parse: Callable, files: List[Path]) -> int:
+    """Peak bytes allocated while parsing each file once."""
+    tracemalloc.start()
+    for stats_file in files:
+        parse(stats_file)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark(files: List[Path], repeat: int):
+    """Check the parsers agree on files, then time them."""
+    total_bytes = sum(f.stat().st_size for f in files)
+
+    print("=" * 80)
+    print(f"Benchmarking stats parsers on {len(files)} files ({total_bytes / 1024 ** 2:.1f} MiB)")
+    print("=" * 80)
+
+    mismatched = [f for f in files
+                  if not split_parse(f) == streaming_parse(f) == filtered_parse(f)]
+    if mismatched:
+        print(f"✗ Parsers disagree on {len(mismatched)} files, e.g. {mismatched[0]}")
+    else:
+        print("✓ All parsers give identical metrics for every file")
+
+    results = {}
+    for name, parse in PARSERS.items():
+        seconds = time_parser(parse, files, repeat)
+        results[name] = seconds
+        print(f"  {name:>10}: {seconds * 1000:8.1f} ms for all files "
+              f"({seconds / len(files) * 1000:.2f} ms/file), "
+              f"peak memory {peak_memory(parse, files) / 1024:.0f} KiB")
+
+    print(f"\nStreaming speedup: {results['split'] / results['streaming']:.2f}x, "
+          f"filtered: {results['split'] / results['filtered']:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the stats.txt parsers")
+    parser.add_argument('--repeat', type=int, default=5, help="passes over all files per parser")
+    args = parser.parse_args()
+
+    runs = existing_stats_files()
+    if not runs:
+        print(f"✗ No stats.txt files under {DATA_DIR}")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmark(copy_tree(runs, Path(tmp)), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+metric_registry.py
+Declarative registry of the Part 4 metrics and their vectorized evaluation
+
+Every column of part4_metrics.csv is declared once in METRICS:
+- stat(name, path): a raw gem5 stat of the ROI dump (the stats of the
+  gem5stats PART4_O3 schema)
+- config(name, key): a property of the run (credits, pipeline widths),
+  read from the run's gem5 config.ini when there is one and otherwise
+  from its design in scripts/designs.py
+- derived(name, depends, formula): computed from other metrics
+
+evaluate() turns a run matrix (one row per run, one column per stat path
+and config key) into a metrics DataFrame. Only the metrics asked for and
+their dependencies are computed (lazily, in dependency order), each
+formula runs once over all runs as NumPy/pandas column arithmetic, and a
+missing input gives NaN in every metric that depends on it, instead of
+per-row None checks.
+"""
+
+import configparser
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# The shared stats package lives in data/gem5stats
+sys.path.insert(0, str(PROJECT_ROOT / "data"))
+from gem5stats import PART4_O3, compression
+
+
+class Metric:
+    """One metric: a raw stat, a run property, or a formula over other metrics."""
+
+    def __init__(self, name: str, stat: Optional[str] = None, config: Optional[str] = None,
+                 depends: Optional[List[str]] = None, formula: Optional[Callable] = None):
+        self.name = name
+        self.stat = stat
+        self.config = config
+        self.depends = depends or []
+        self.formula = formula
+
+
+def stat(name: str, path: str) -> Metric:
+    return Metric(name, stat=path)
+
+
+def config(name: str, key: str) -> Metric:
+    return Metric(name, config=key)
+
+
+def derived(name: str, depends: List[str], formula: Callable) -> Metric:
+    """formula gets a DataFrame holding (at least) the depends columns."""
+    return Metric(name, depends=depends, formula=formula)
+
+
+def nonzero(column: pd.Series) -> pd.Series:
+    """column with zeros replaced by NaN, for use as a divisor."""
+    return column.where(column != 0)
+
+
+METRICS = [
+    # Raw stats of the ROI dump, in the Part 4 O3 schema's column order
+    *(stat(name, path) for name, path in PART4_O3.stats.items()),
+
+    # Run configuration
+    config('credits', 'credits'),
+    config('issue_width', 'issue_width'),
+    config('commit_width', 'commit_width'),
+
+    # Derived metrics
+    derived('ipc_per_credit', ['ipc', 'credits'],
+            lambda m: m['ipc'] / m['credits']),
+    derived('issue_utilization_pct', ['numIssuedDist_mean', 'issue_width'],
+            lambda m: (m['numIssuedDist_mean'] / m['issue_width']) * 100),
+    derived('commit_utilization_pct', ['numCommittedDist_mean', 'commit_width'],
+            lambda m: (m['numCommittedDist_mean'] / m['commit_width']) * 100),
+    # Hit rates from the miss rates the stats already provide
+    derived('l1i_hit_rate', ['l1i_miss_rate'],
+            lambda m: 1.0 - m['l1i_miss_rate']),
+    derived('l1d_hit_rate', ['l1d_miss_rate'],
+            lambda m: 1.0 - m['l1d_miss_rate']),
+    # Squashed / committed instructions
+    derived('speculation_overhead_pct', ['commitSquashedInsts', 'simInsts'],
+            lambda m: (m['commitSquashedInsts'] / nonzero(m['simInsts'])) * 100),
+    # Per 1K instructions
+    derived('branch_mispredict_rate', ['branchMispredicts', 'simInsts'],
+            lambda m: (m['branchMispredicts'] / nonzero(m['simInsts'])) * 1000),
+    derived('memory_ops_pct', ['committed_MemRead', 'committed_MemWrite', 'simOps'],
+            lambda m: ((m['committed_MemRead'] + m['committed_MemWrite']) / nonzero(m['simOps'])) * 100)
+]
+
+REGISTRY = {metric.name: metric for metric in METRICS}
+
+# Metrics that are properties of the run rather than of its stats, and
+# not written to the CSV
+RUN_PROPERTIES = ['issue_width', 'commit_width']
+
+# gem5 config.ini keys of the run properties read from it
+CONFIG_INI_KEYS = {
+    'issue_width': ('system.cpu', 'issueWidth'),
+    'commit_width': ('system.cpu', 'commitWidth')
+}
+
+
+def stat_paths(registry: Dict[str, Metric] = REGISTRY) -> List[str]:
+    """Every gem5 stat the registry reads."""
+    return [metric.stat for metric in registry.values() if metric.stat]
+
+
+def evaluation_order(names: List[str], registry: Dict[str, Metric] = REGISTRY) -> List[str]:
+    """names and everything they depend on, each after its dependencies."""
+    order = []
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"metric dependency cycle: {' -> '.join(path + [name])}")
+        if name not in registry:
+            raise KeyError(f"unknown metric {name!r}")
+        state[name] = 'visiting'
+        for dependency in registry[name].depends:
+            visit(dependency, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in names:
+        visit(name, [])
+    return order
+
+
+def evaluate(runs: pd.DataFrame, names: Optional[List[str]] = None,
+             registry: Dict[str, Metric] = REGISTRY) -> pd.DataFrame:
+    """
+    Metrics (default: all of the registry) for every row of runs, whose
+    columns are stat paths and config keys. Missing inputs and divisions
+    by zero give NaN, which propagates to dependent metrics.
+    """
+    names = list(registry) if names is None else names
+    metrics = pd.DataFrame(index=runs.index)
+    for name in evaluation_order(names, registry):
+        metric = registry[name]
+        source = metric.stat or metric.config
+        if source is not None:
+            column = runs[source] if source in runs else np.nan
+            metrics[name] = pd.to_numeric(pd.Series(column, index=runs.index), errors='coerce')
+        else:
+            metrics[name] = metric.formula(metrics).replace([np.inf, -np.inf], np.nan)
+    return metrics[names]
+
+
+def design_params(design: str) -> Dict[str, any]:
+    """A design's a3_part4.py parameters from scripts/designs.py."""
+    scripts_dir = str(PROJECT_ROOT / "scripts")
+    if scripts_dir not in sys.path:
+        sys.path.insert(0, scripts_dir)
+    from designs import PROCESSOR_CONFIGS
+    return PROCESSOR_CONFIGS.get(design, {}).get('params', {})
+
+
+def run_config(run_dir: Path, design: str) -> Dict[str, Optional[float]]:
+    """
+    The run properties of one run: from the config.ini gem5 wrote with its
+    stats if there is one, otherwise from its design's parameters.
+    """
+    values = {}
+    config_ini = compression.resolve(Path(run_dir) / "config.ini")
+    if config_ini.exists():
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        with compression.open_text(config_ini) as f:
+            parser.read_file(f)
+        for name, (section, key) in CONFIG_INI_KEYS.items():
+            if parser.has_option(section, key):
+                values[name] = float(parser.get(section, key))
+    params = design_params(design)
+    for name in CONFIG_INI_KEYS:
+        values.setdefault(name, params.get(name))
+    return values
@@ -0,0 +1,124 @@
+"""
+pareto.py
+IPC-versus-credit Pareto frontiers of the Part 4 designs
+
+A design is on the frontier when no other design reaches at least its
+IPC for at most its credits (and is strictly better at one of the two):
+the designs actually worth paying for. Frontiers are computed per
+workload and for the geometric mean IPC over the whole run matrix (the
+designs that ran every workload), all at once:
+sorting by credits, then IPC descending, a design is on its frontier iff
+its IPC beats the running maximum of every cheaper design's, which is a
+grouped cumulative max rather than a pairwise comparison, so a sweep of
+thousands of points is filtered in one pass.
+
+Runs come from part4_metrics.csv, or with --catalog from the results
+catalog (scripts/results_catalog.py), which also holds sweep points.
+Credits are each design's cost under scripts/cost_model.py.
+The frontier designs are printed and written to part4_pareto.csv.
+
+Usage:
+  python3 data/CSV/pareto.py [--catalog [PATH]] [--all]
+"""
+
+import argparse
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from parse_data import CSV_OUTPUT_DIR, WORKLOADS
+
+METRICS_CSV = CSV_OUTPUT_DIR / "part4_metrics.csv"
+PARETO_CSV = CSV_OUTPUT_DIR / "part4_pareto.csv"
+
+GEOMEAN_SCOPE = "geomean"
+
+
+def load_runs(catalog_path: Optional[Path] = None) -> pd.DataFrame:
+    """design, workload, credits, ipc of every full run on the large inputs."""
+    if catalog_path is None:
+        runs = pd.read_csv(METRICS_CSV, usecols=['design', 'workload', 'credits', 'ipc'])
+    else:
+        from results_catalog import ResultsCatalog
+        catalog = ResultsCatalog(catalog_path)
+        try:
+            rows = catalog.query(show=['credits', 'ipc'])
+        finally:
+            catalog.close()
+        runs = pd.DataFrame([row for row in rows if row['mode'] == 'full'],
+                            columns=['design', 'workload', 'credits', 'ipc'])
+    runs = runs[runs['workload'].isin(WORKLOADS)].dropna(subset=['credits', 'ipc'])
+    return runs.astype({'credits': float, 'ipc': float}).reset_index(drop=True)
+
+
+def geomean_runs(runs: pd.DataFrame) -> pd.DataFrame:
+    """One row per design that ran every workload, with its geometric mean IPC."""
+    matrix = runs.pivot_table(index='design', columns='workload', values='ipc', aggfunc='last')
+    matrix = matrix[matrix.columns.intersection(WORKLOADS)].dropna()
+    credits = runs.groupby('design')['credits'].first()
+    return pd.DataFrame({
+        'design': matrix.index,
+        'workload': GEOMEAN_SCOPE,
+        'credits': credits.loc[matrix.index].to_numpy(),
+        'ipc': np.exp(np.log(matrix.to_numpy()).mean(axis=1))
+    })
+
+
+def mark_frontier(runs: pd.DataFrame) -> pd.DataFrame:
+    """
+    runs sorted by workload and credits, with an on_frontier column:
+    True for the designs no other design of the same workload dominates.
+    """
+    runs = runs.sort_values(['workload', 'credits', 'ipc'], ascending=[True, True, False],
+                            kind='stable').reset_index(drop=True)
+    best_before = runs.groupby('workload')['ipc'].cummax().groupby(runs['workload']).shift(1)
+    runs['on_frontier'] = (runs['ipc'] > best_before) | best_before.isna()
+    runs['ipc_per_credit'] = runs['ipc'] / runs['credits']
+    return runs
+
+
+def pareto_frontiers(runs: pd.DataFrame) -> pd.DataFrame:
+    """Every run and the geomean rows, each marked on or off its frontier."""
+    return mark_frontier(pd.concat([runs, geomean_runs(runs)], ignore_index=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IPC-versus-credit Pareto frontiers of the Part 4 designs")
+    parser.add_argument('--catalog', nargs='?', const='', default=None,
+                        help="read runs from the results catalog (default path if none is given) "
+                             "instead of part4_metrics.csv")
+    parser.add_argument('--all', action='store_true',
+                        help="write every design to part4_pareto.csv, not only the frontiers")
+    args = parser.parse_args()
+
+    if args.catalog is None:
+        runs = load_runs()
+    else:
+        from results_catalog import CATALOG_FILE
+        runs = load_runs(Path(args.catalog) if args.catalog else CATALOG_FILE)
+    if runs.empty:
+        print("✗ No runs with both IPC and credits")
+        return
+
+    frontiers = pareto_frontiers(runs)
+    scopes = [w for w in WORKLOADS if w in set(frontiers['workload'])] + [GEOMEAN_SCOPE]
+    for scope in scopes:
+        rows = frontiers[frontiers['workload'] == scope]
+        if rows.empty:
+            print(f"\n{scope}: no design ran every workload")
+            continue
+        frontier = rows[rows['on_frontier']]
+        print(f"\n{scope}: {len(frontier)} of {len(rows)} designs on the frontier")
+        for row in frontier.itertuples(index=False):
+            print(f"  {row.design:<24} {row.credits:>7.0f} credits  IPC {row.ipc:.4f}  "
+                  f"IPC/credit {row.ipc_per_credit:.6f}")
+
+    output = frontiers if args.all else frontiers[frontiers['on_frontier']]
+    output.to_csv(PARETO_CSV, index=False)
+    print(f"\n✓ {output['design'].nunique()} designs written to {PARETO_CSV}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+parse_cache.py
+Incremental re-parse cache for parse_data.py
+
+Keeps each run's parsed stats (the ones the metric registry reads) with the
+fingerprint of the stats.txt it came from: path, size, mtime and SHA-256
+of the content. parse_all_simulations() then re-parses only new or
+changed runs and reuses the cached stats for the rest.
+
+A file whose size and mtime are unchanged is taken as unchanged without
+reading it. If only the mtime moved (e.g. outputs restored from the
+result cache or copied), the content hash decides. The whole cache is
+dropped when the parser or registry changes, since cached stats would no
+longer match what they produce.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+CACHE_VERSION = 1
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Parsed rows keyed on the fingerprint of the stats file they came from."""
+
+    def __init__(self, cache_file: Path, parser_version: str, root: Path):
+        self.cache_file = Path(cache_file)
+        self.parser_version = parser_version
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != CACHE_VERSION or data.get('parser') != self.parser_version:
+            return {}
+        return data.get('entries', {})
+
+    def _key(self, stats_file: Path) -> str:
+        stats_file = Path(stats_file).resolve()
+        try:
+            return str(stats_file.relative_to(self.root.resolve()))
+        except ValueError:
+            return str(stats_file)
+
+    def lookup(self, stats_file: Path) -> Optional[Dict[str, any]]:
+        """The cached row for stats_file if the file is unchanged, else None."""
+        entry = self.entries.get(self._key(stats_file))
+        stat = Path(stats_file).stat()
+        if entry is not None and entry['size'] == stat.st_size:
+            if entry['mtime_ns'] == stat.st_mtime_ns:
+                self.hits += 1
+                return entry['row']
+            if entry['sha256'] == hash_file(stats_file):
+                entry['mtime_ns'] = stat.st_mtime_ns
+                self.hits += 1
+                return entry['row']
+        self.misses += 1
+        return None
+
+    def store(self, stats_file: Path, row: Dict[str, any]):
+        """Remember the row parsed from stats_file."""
+        stat = Path(stats_file).stat()
+        self.entries[self._key(stats_file)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': hash_file(stats_file),
+            'row': row
+        }
+
+    def prune(self, stats_files):
+        """Forget runs other than stats_files (e.g. deleted outputs)."""
+        keep = {self._key(path) for path in stats_files}
+        self.entries = {key: entry for key, entry in self.entries.items() if key in keep}
+
+    def save(self):
+        """Write the cache atomically."""
+        data = {'version': CACHE_VERSION, 'parser': self.parser_version, 'entries': self.entries}
+        tmp_file = self.cache_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f)
+        tmp_file.replace(self.cache_file)
+
+    def summary(self) -> str:
+        return f"{self.hits} cached, {self.misses} parsed"
@@ -3,25 +3,61 @@ parse_data.py
 Parses gem5 stats.txt files from Part 4 simulations and extracts key metrics
 Reads the MIDDLE dump (2nd stat dump) from each stats.txt file
 Outputs comprehensive CSV files for analysis
+
+stats.txt files are read with the shared gem5stats package (data/
+gem5stats/): streamed line by line, only the stats the metric registry
+needs are converted, and reading stops once the ROI dump ends, so the
+exit dump is never touched and files of runs still in progress can be
+read (or followed) as gem5 writes them.
+
+Metrics are declared in metric_registry.py (stat path or formula each)
+and evaluated over all runs at once; per-run pipeline widths come from
+each run's configuration.
+
+Parsed stats are cached next to the CSV (see parse_cache.py), so only new
+or changed runs are re-parsed; --no-cache re-parses everything. With
+--workers, the runs that need parsing are spread over a process pool;
+rows are merged back in design x workload order, so the CSV does not
+depend on the number of workers.
 """
 
-import re
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import csv
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# The shared stats parser lives in data/gem5stats
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import gem5stats
+from gem5stats import compression, parse_lines, read_dumps
+
+import metric_registry
+from metric_registry import METRICS, REGISTRY, RUN_PROPERTIES, evaluate, run_config, stat_paths
+from parse_cache import ParseCache
+
+# The processor designs are shared with the runner in scripts/
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "scripts"))
+from designs import PROCESSOR_CONFIGS
+from checkpoints import restored_inside_roi
 
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 DATA_DIR = PROJECT_ROOT / "data" / "part4"
 CSV_OUTPUT_DIR = Path(__file__).parent
 
-# Processor designs and their credit costs
-DESIGNS = {
-    "design_a": 820,
-    "design_b": 960,
-    "design_c": 900,
-    "design_d": 1000
-}
+# Rows parsed by earlier runs, keyed on each stats.txt's fingerprint
+PARSE_CACHE_FILE = CSV_OUTPUT_DIR / "part4_parse_cache.json"
+
+# Processor designs and their credit costs (scripts/designs.py, costed by
+# scripts/cost_model.py)
+DESIGNS = {design_id: config['credits'] for design_id, config in PROCESSOR_CONFIGS.items()}
 
 # Workloads
 WORKLOADS = [
@@ -37,39 +73,27 @@ WORKLOADS = [
 ]
 
 
-def extract_middle_dump(stats_file_path: Path) -> Optional[List[str]]:
-    """
-    Extract the middle (2nd) statistics dump from a gem5 stats.txt file.
-
-    gem5 typically outputs multiple stat dumps:
-    - 1st dump: initialization
-    - 2nd dump: middle/ROI (Region of Interest) - THIS IS WHAT WE WANT
-    - 3rd dump: final
-
-    Returns the lines from the middle dump, or None if not found.
-    """
-    try:
-        with open(stats_file_path, 'r') as f:
-            content = f.read()
+def run_stats_file(design_id: str, workload: str) -> Path:
+    """A run's stats.txt, or its compressed variant if that is what exists."""
+    return compression.resolve(DATA_DIR / design_id / workload / "stats.txt")
 
-        # Split by "Begin Simulation Statistics" markers
-        dumps = re.split(r'-{10} Begin Simulation Statistics -{10}', content)
 
-        if len(dumps) < 3:
-            print(f"Warning: {stats_file_path} has fewer than 3 stat dumps (found {len(dumps)-1})")
-            # If there's only one dump, use it
-            if len(dumps) == 2:
-                return dumps[1].split('---------- End Simulation Statistics')[0].strip().split('\n')
-            return None
+def existing_stats_files(data_dir: Path = DATA_DIR) -> List[Path]:
+    """The stats.txt (or compressed variant) of every design_*/<workload> run under data_dir."""
+    files = (compression.resolve(run_dir / "stats.txt") for run_dir in sorted(data_dir.glob("design_*/*/")))
+    return [stats_file for stats_file in files if stats_file.exists()]
 
-        # Get the 2nd dump (index 2, since index 0 is before first marker)
-        middle_dump = dumps[2]
-
-        # Extract only until "End Simulation Statistics"
-        middle_dump = middle_dump.split('---------- End Simulation Statistics')[0].strip()
-
-        return middle_dump.split('\n')
 
+def extract_middle_stats(stats_file_path: Path, names: Optional[Iterable[str]] = None,
+                         **stream_options) -> Optional[Dict[str, float]]:
+    """
+    Stat name -> value of the middle (ROI) dump of a stats.txt file (only
+    the stats in names if given), reading no further than its end. A file
+    with a single dump falls back to that dump. Returns None if no dump is
+    complete or the file is missing.
+    """
+    try:
+        dumps = read_dumps(stats_file_path, 'roi', names, **stream_options)
     except FileNotFoundError:
         print(f"Error: File not found: {stats_file_path}")
         return None
@@ -77,115 +101,78 @@ def extract_middle_dump(stats_file_path: Path) -> Optional[List[str]]:
         print(f"Error reading {stats_file_path}: {e}")
         return None
 
+    if 0 in dumps:
+        print(f"Warning: {stats_file_path} has only one complete stat dump; using it")
+    return next(iter(dumps.values()), None)
 
-def parse_stat_value(line: str) -> Optional[float]:
+
+def extract_metrics(stats: Union[Dict[str, float], List[str]]) -> Dict[str, any]:
     """
-    Parse a stat line and extract its numeric value.
-    Example line: "system.cpu.ipc                               0.695843                       # IPC: instructions per cycle"
+    Extract the registry's raw stat metrics from one stat dump, given as
+    stat name -> value (see extract_middle_stats) or as the dump's lines.
+    Returns a dictionary of metric_name -> value (None if missing).
+    Derived metrics need the run's configuration: see compute_metrics.
     """
-    # Split by whitespace and get the second column (the value)
-    parts = line.split()
-    if len(parts) >= 2:
-        try:
-            # Handle scientific notation and regular numbers
-            return float(parts[1])
-        except ValueError:
-            return None
-    return None
-
-
-def extract_metrics(stat_lines: List[str]) -> Dict[str, any]:
+    if not isinstance(stats, dict):
+        stats = parse_lines(stats)
+    return {metric.name: stats.get(metric.stat) for metric in METRICS if metric.stat}
+
+
+def parse_run(stats_file: Path) -> Optional[Dict[str, float]]:
     """
-    Extract all relevant metrics from the stat dump lines.
-    Returns a dictionary of metric_name -> value.
+    Parse one run's stats.txt: the ROI dump's value of every stat the
+    metric registry reads. Returns None if it cannot be parsed.
     """
-    metrics = {}
-
-    # Create a lookup dictionary for faster searching
-    stat_dict = {}
-    for line in stat_lines:
-        if line.strip() and not line.startswith('#') and not line.startswith('-'):
-            parts = line.split()
-            if len(parts) >= 2:
-                stat_name = parts[0]
-                stat_dict[stat_name] = line
-
-    # Helper function to get stat value
-    def get_stat(stat_name: str) -> Optional[float]:
-        if stat_name in stat_dict:
-            return parse_stat_value(stat_dict[stat_name])
-        return None
+    return extract_middle_stats(stats_file, names=stat_paths())
+
 
-    # 1. Core Performance Metrics
-    metrics['simSeconds'] = get_stat('simSeconds')
-    metrics['simTicks'] = get_stat('simTicks')
-    metrics['simInsts'] = get_stat('simInsts')  # Total instructions simulated
-    metrics['simOps'] = get_stat('simOps')  # Total ops (including micro-ops)
-    metrics['numCycles'] = get_stat('system.cpu.numCycles')
-    metrics['ipc'] = get_stat('system.cpu.ipc')
-    metrics['cpi'] = get_stat('system.cpu.cpi')
-
-    # 2. Pipeline Utilization
-    metrics['instsIssued'] = get_stat('system.cpu.instsIssued')
-    metrics['instsAdded'] = get_stat('system.cpu.instsAdded')
-    metrics['numIssuedDist_mean'] = get_stat('system.cpu.numIssuedDist::mean')
-    metrics['numIssuedDist_0'] = get_stat('system.cpu.numIssuedDist::0')
-    metrics['numIssuedDist_1'] = get_stat('system.cpu.numIssuedDist::1')
-    metrics['numIssuedDist_2'] = get_stat('system.cpu.numIssuedDist::2')
-    metrics['numIssuedDist_total'] = get_stat('system.cpu.numIssuedDist::total')
-
-    # 3. Commit Stage Stats
-    metrics['commitSquashedInsts'] = get_stat('system.cpu.commit.commitSquashedInsts')
-    metrics['branchMispredicts'] = get_stat('system.cpu.commit.branchMispredicts')
-    metrics['numCommittedDist_mean'] = get_stat('system.cpu.commit.numCommittedDist::mean')
-    metrics['numCommittedDist_0'] = get_stat('system.cpu.commit.numCommittedDist::0')
-    metrics['numCommittedDist_1'] = get_stat('system.cpu.commit.numCommittedDist::1')
-    metrics['numCommittedDist_2'] = get_stat('system.cpu.commit.numCommittedDist::2')
-
-    # 4. Speculation Stats
-    metrics['squashedInstsIssued'] = get_stat('system.cpu.squashedInstsIssued')
-    metrics['squashedInstsExamined'] = get_stat('system.cpu.squashedInstsExamined')
-
-    # 5. Functional Unit Busy Rates
-    metrics['fuBusy_IntAlu'] = get_stat('system.cpu.statFuBusy::IntAlu')
-    metrics['fuBusy_IntMult'] = get_stat('system.cpu.statFuBusy::IntMult')
-    metrics['fuBusy_IntDiv'] = get_stat('system.cpu.statFuBusy::IntDiv')
-    metrics['fuBusy_FloatAdd'] = get_stat('system.cpu.statFuBusy::FloatAdd')
-    metrics['fuBusy_FloatMult'] = get_stat('system.cpu.statFuBusy::FloatMult')
-    metrics['fuBusy_FloatDiv'] = get_stat('system.cpu.statFuBusy::FloatDiv')
-    metrics['fuBusy_MemRead'] = get_stat('system.cpu.statFuBusy::MemRead')
-    metrics['fuBusy_MemWrite'] = get_stat('system.cpu.statFuBusy::MemWrite')
-    metrics['fuBusy_SimdAlu'] = get_stat('system.cpu.statFuBusy::SimdAlu')
-    metrics['fuBusy_SimdCvt'] = get_stat('system.cpu.statFuBusy::SimdCvt')
-    metrics['fuBusy_SimdMisc'] = get_stat('system.cpu.statFuBusy::SimdMisc')
-
-    # 6. L1 Instruction Cache Performance
-    metrics['l1i_hits'] = get_stat('system.cpu.l1i.demandHits::total')
-    metrics['l1i_misses'] = get_stat('system.cpu.l1i.demandMisses::total')
-    metrics['l1i_miss_rate'] = get_stat('system.cpu.l1i.demandMissRate::total')
-    metrics['l1i_accesses'] = get_stat('system.cpu.l1i.demandAccesses::total')
-
-    # 7. L1 Data Cache Performance
-    metrics['l1d_hits'] = get_stat('system.cpu.l1d.demandHits::total')
-    metrics['l1d_misses'] = get_stat('system.cpu.l1d.demandMisses::total')
-    metrics['l1d_miss_rate'] = get_stat('system.cpu.l1d.demandMissRate::total')
-    metrics['l1d_accesses'] = get_stat('system.cpu.l1d.demandAccesses::total')
-    metrics['l1d_avg_miss_latency'] = get_stat('system.cpu.l1d.demandAvgMissLatency::total')
-
-    # 8. Instruction Type Breakdown (from commit stage)
-    metrics['committed_IntAlu'] = get_stat('system.cpu.commit.committedInstType_0::IntAlu')
-    metrics['committed_IntMult'] = get_stat('system.cpu.commit.committedInstType_0::IntMult')
-    metrics['committed_IntDiv'] = get_stat('system.cpu.commit.committedInstType_0::IntDiv')
-    metrics['committed_FloatAdd'] = get_stat('system.cpu.commit.committedInstType_0::FloatAdd')
-    metrics['committed_MemRead'] = get_stat('system.cpu.commit.committedInstType_0::MemRead')
-    metrics['committed_MemWrite'] = get_stat('system.cpu.commit.committedInstType_0::MemWrite')
-
-    return metrics
-
-
-def parse_all_simulations():
+def parse_runs(stats_files: List[Path], workers: int = 1) -> List[Optional[Dict[str, float]]]:
+    """
+    parse_run every stats file, across a pool of worker processes if
+    workers > 1 (0: one per core). Workers return only the registry's
+    stats, and results come back in the order of stats_files whatever the
+    number of workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(stats_files) <= 1:
+        return [parse_run(stats_file) for stats_file in stats_files]
+    workers = min(workers, len(stats_files))
+    # A few chunks per worker balances uneven files without per-file overhead
+    chunksize = max(1, len(stats_files) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_run, stats_files, chunksize=chunksize))
+
+
+def compute_metrics(runs: List[Tuple[str, str, int, Dict[str, float]]]) -> List[Dict[str, any]]:
+    """
+    part4_metrics.csv rows of (design_id, workload, credits, stats) runs.
+    Every registry metric is evaluated once over all runs, with each run's
+    widths taken from its own configuration (see metric_registry.run_config).
+    Missing values are None.
+    """
+    if not runs:
+        return []
+    matrix = pd.DataFrame([
+        {**stats, 'credits': credits, **run_config(DATA_DIR / design_id / workload, design_id)}
+        for design_id, workload, credits, stats in runs
+    ])
+    names = [name for name in REGISTRY if name not in RUN_PROPERTIES and name != 'credits']
+    metrics = evaluate(matrix, names)
+
+    rows = []
+    for (design_id, workload, credits, _), values in zip(runs, metrics.itertuples(index=False)):
+        row = {'design': design_id, 'workload': workload, 'credits': credits}
+        row.update((name, None if np.isnan(value) else float(value)) for name, value in zip(names, values))
+        rows.append(row)
+    return rows
+
+
+def parse_all_simulations(use_cache: bool = True, workers: int = 1):
     """
     Parse all simulation stats files and create CSV output.
+    Unchanged runs reuse their rows from the parse cache unless use_cache
+    is False (the cache is rewritten either way); the others are parsed
+    by parse_runs with the given number of workers.
     """
     print("=" * 80)
     print("Parsing gem5 Part 4 Simulation Statistics")
@@ -195,87 +182,74 @@ def parse_all_simulations():
     print()
 
     all_results = []
+    parsed_files = []
+
+    # Cached stats are only valid for this exact parser, metric registry and
+    # gem5stats package (tokenizer and stat schemas)
+    sources = [Path(__file__), Path(metric_registry.__file__)]
+    sources += sorted(Path(gem5stats.__file__).parent.glob("*.py"))
+    parser_version = hashlib.sha256(b"".join(path.read_bytes() for path in sources)).hexdigest()
+    parse_cache = ParseCache(PARSE_CACHE_FILE, parser_version, PROJECT_ROOT)
+
+    # Look every run up in the cache first, so the ones that need parsing
+    # can be handed to the workers together
+    run_stats = {}
+    cached_files = set()
+    partial_files = set()
+    to_parse = []
+    for design_id, credits in DESIGNS.items():
+        for workload in WORKLOADS:
+            stats_file = run_stats_file(design_id, workload)
+            if not stats_file.exists():
+                continue
+            # A restore inside the ROI leaves an ROI dump of only part of it
+            if restored_inside_roi(stats_file.parent):
+                partial_files.add(stats_file)
+                continue
+            stats = parse_cache.lookup(stats_file) if use_cache else None
+            if stats is not None:
+                run_stats[stats_file] = stats
+                cached_files.add(stats_file)
+            else:
+                to_parse.append(stats_file)
+    for stats_file, stats in zip(to_parse, parse_runs(to_parse, workers)):
+        if stats is not None:
+            run_stats[stats_file] = stats
+            parse_cache.store(stats_file, stats)
+
+    # Evaluate the metrics over all runs at once
+    runs = [(design_id, workload, credits, run_stats[run_stats_file(design_id, workload)])
+            for design_id, credits in DESIGNS.items() for workload in WORKLOADS
+            if run_stats_file(design_id, workload) in run_stats]
+    rows = {(row['design'], row['workload']): row for row in compute_metrics(runs)}
 
     # Iterate through all designs and workloads
     for design_id, credits in DESIGNS.items():
         print(f"\nProcessing {design_id} (credits: {credits})...")
 
         for workload in WORKLOADS:
-            stats_file = DATA_DIR / design_id / workload / "stats.txt"
+            stats_file = run_stats_file(design_id, workload)
 
             if not stats_file.exists():
                 print(f"  ⚠ Missing: {workload}")
                 continue
+            if stats_file in partial_files:
+                print(f"  ⚠ Skipped: {workload} (restored from a checkpoint inside the ROI; re-run it)")
+                continue
 
-            # Extract middle dump
-            stat_lines = extract_middle_dump(stats_file)
-
-            if stat_lines is None:
+            result = rows.get((design_id, workload))
+            if result is None:
                 print(f"  ✗ Failed to parse: {workload}")
                 continue
+            cached = stats_file in cached_files
 
-            # Extract metrics
-            metrics = extract_metrics(stat_lines)
-
-            # Add metadata
-            result = {
-                'design': design_id,
-                'workload': workload,
-                'credits': credits,
-                **metrics
-            }
-
-            # Calculate derived metrics
-            if metrics['ipc'] is not None:
-                result['ipc_per_credit'] = metrics['ipc'] / credits
-            else:
-                result['ipc_per_credit'] = None
-
-            # Calculate issue utilization percentage (max issue width is 2)
-            if metrics['numIssuedDist_mean'] is not None:
-                result['issue_utilization_pct'] = (metrics['numIssuedDist_mean'] / 2.0) * 100
-            else:
-                result['issue_utilization_pct'] = None
-
-            # Calculate commit utilization percentage
-            if metrics['numCommittedDist_mean'] is not None:
-                result['commit_utilization_pct'] = (metrics['numCommittedDist_mean'] / 2.0) * 100
-            else:
-                result['commit_utilization_pct'] = None
-
-            # L1I cache hit rate (already in stats as miss_rate, so hit_rate = 1 - miss_rate)
-            if metrics['l1i_miss_rate'] is not None:
-                result['l1i_hit_rate'] = 1.0 - metrics['l1i_miss_rate']
-            else:
-                result['l1i_hit_rate'] = None
-
-            # L1D cache hit rate
-            if metrics['l1d_miss_rate'] is not None:
-                result['l1d_hit_rate'] = 1.0 - metrics['l1d_miss_rate']
-            else:
-                result['l1d_hit_rate'] = None
-
-            # Calculate speculation overhead (squashed / committed instructions)
-            if metrics['commitSquashedInsts'] is not None and metrics['simInsts'] is not None:
-                result['speculation_overhead_pct'] = (metrics['commitSquashedInsts'] / metrics['simInsts']) * 100
-            else:
-                result['speculation_overhead_pct'] = None
-
-            # Branch misprediction rate
-            if metrics['branchMispredicts'] is not None and metrics['simInsts'] is not None:
-                result['branch_mispredict_rate'] = (metrics['branchMispredicts'] / metrics['simInsts']) * 1000  # per 1K instructions
-            else:
-                result['branch_mispredict_rate'] = None
-
-            # Memory operation percentage
-            if metrics['committed_MemRead'] is not None and metrics['committed_MemWrite'] is not None and metrics['simOps'] is not None:
-                total_mem_ops = metrics['committed_MemRead'] + metrics['committed_MemWrite']
-                result['memory_ops_pct'] = (total_mem_ops / metrics['simOps']) * 100 if metrics['simOps'] > 0 else None
-            else:
-                result['memory_ops_pct'] = None
-
+            parsed_files.append(stats_file)
             all_results.append(result)
-            print(f"  ✓ {workload}: IPC={metrics['ipc']:.4f}, IPC/credit={result['ipc_per_credit']:.6f}")
+            print(f"  ✓ {workload}: IPC={result['ipc']:.4f}, IPC/credit={result['ipc_per_credit']:.6f}"
+                  + (" (cached)" if cached else ""))
+
+    parse_cache.prune(parsed_files)
+    parse_cache.save()
 
     # Write to CSV
     if not all_results:
@@ -299,7 +273,7 @@ def parse_all_simulations():
         writer.writerows(all_results)
 
     print("\n" + "=" * 80)
-    print(f"✓ Successfully parsed {len(all_results)} simulations")
+    print(f"✓ Successfully parsed {len(all_results)} simulations ({parse_cache.summary()})")
     print(f"✓ CSV output written to: {output_file}")
     print("=" * 80)
 
@@ -315,4 +289,10 @@ def parse_all_simulations():
 
 
 if __name__ == "__main__":
-    parse_all_simulations()
+    parser = argparse.ArgumentParser(description="Parse Part 4 stats.txt files into part4_metrics.csv")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="re-parse every run instead of reusing unchanged runs' cached rows")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="parse runs in this many processes (0: one per core)")
+    args = parser.parse_args()
+    parse_all_simulations(use_cache=not args.no_cache, workers=args.workers)
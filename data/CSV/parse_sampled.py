@@ -0,0 +1,521 @@
+"""
+parse_sampled.py
+Parses sampled Part 4 simulations and rebuilds whole-program metrics
+
+SimPoint (scripts/run_simpoint.py): each design x workload has one run per
+representative interval under data/simpoint/<design>/<workload>/sp_<id>/.
+Each interval's CPI is measured from the dumps after its warmup, and
+whole-program IPC is rebuilt from the CPIs weighted by the fraction of the
+program each interval represents (intervals have equal instruction counts,
+so CPIs - not IPCs - add up).
+
+SMARTS (run_part4_sim.py --smarts-period): each run lives under
+data/part4/<design>/<workload>/smarts/ and measures many short windows of
+equal instruction count spread evenly over the program, listed in
+smarts_windows.json. Windows inside the workload's ROI (between its own
+first two stat dumps) are kept; IPC is the inverse of their mean CPI, with
+a Student-t confidence interval since windows are a systematic sample.
+
+Truncated runs (run_part4_sim.py --max-insts/--converge): each run lives
+under data/part4/<design>/<workload>/truncated/ and dumps stats every
+interval (convergence.json) until it converges, reaches its instruction
+budget or the program exits. The ROI measured so far is extrapolated to
+the whole ROI, whose length (committed instructions, the same on every
+design) comes from the full runs in part4_metrics.csv. Each result is
+flagged with how certain it is: "complete" if the ROI ended, "high" if the
+run converged and the IPC interval over its intervals is within
+TARGET_RELATIVE_ERROR, "low" otherwise.
+
+Usage:
+  python3 data/CSV/parse_sampled.py simpoint
+  python3 data/CSV/parse_sampled.py smarts
+  python3 data/CSV/parse_sampled.py truncated
+"""
+
+import argparse
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import stats
+
+from parse_data import DESIGNS, WORKLOADS
+import gem5stats  # on sys.path via parse_data
+
+# Project paths
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+SIMPOINT_DIR = PROJECT_ROOT / "data" / "simpoint"
+PROFILE_DIR = SIMPOINT_DIR / "profiles"
+CSV_OUTPUT_DIR = Path(__file__).parent
+FULL_RUN_CSV = CSV_OUTPUT_DIR / "part4_metrics.csv"
+PART4_DIR = PROJECT_ROOT / "data" / "part4"
+SMARTS_SUBDIR = "smarts"
+TRUNCATED_SUBDIR = "truncated"
+
+# Confidence level of SMARTS and truncated-run IPC intervals, and the relative CPI error
+# the recommended window count is sized for
+CONFIDENCE = 0.95
+TARGET_RELATIVE_ERROR = 0.03
+
+
+# Count stats summed over a truncated run's ROI dumps and scaled up to the
+# whole ROI
+EXTRAPOLATED_STATS = {
+    'numCycles': 'system.cpu.numCycles',
+    'simTicks': 'simTicks',
+    'l1d_accesses': 'system.cpu.l1d.overallAccesses::total',
+    'l1d_misses': 'system.cpu.l1d.overallMisses::total',
+    'l1i_accesses': 'system.cpu.l1i.overallAccesses::total',
+    'l1i_misses': 'system.cpu.l1i.overallMisses::total',
+    'branchMispredicts': 'system.cpu.commit.branchMispredicts'
+}
+
+
+def read_dumps(stats_file_path: Path) -> List[Dict[str, float]]:
+    """
+    Read every complete dump of a stats.txt file as a dict of
+    stat name -> value (non-numeric values are skipped).
+    """
+    return list(gem5stats.read_dumps(stats_file_path, 'all').values())
+
+
+def measure_window(dumps: List[Dict[str, float]], start_tick: float,
+                   end_tick: float = float('inf')) -> Optional[Dict[str, float]]:
+    """
+    Sum cycles and committed instructions over the dumps made in
+    (start_tick, end_tick] (a workload's own m5 dump ops can split a
+    window in two). Dumps of zero length or at a tick already counted,
+    such as gem5's exit dump right after the interval's, are dropped.
+    """
+    window = []
+    seen_ticks = set()
+    for dump in dumps:
+        tick = dump.get('finalTick', 0)
+        if start_tick < tick <= end_tick and dump.get('simTicks', 0) > 0 and tick not in seen_ticks:
+            seen_ticks.add(tick)
+            window.append(dump)
+    cycles = sum(dump.get('system.cpu.numCycles', 0) for dump in window)
+    insts = sum(dump.get('simInsts', 0) for dump in window)
+    if not cycles or not insts:
+        return None
+    return {'cycles': cycles, 'insts': insts, 'cpi': cycles / insts, 'ipc': insts / cycles}
+
+
+def weighted_ipc(weights: List[float], cpis: List[float]) -> Optional[float]:
+    """
+    Whole-program IPC from per-interval CPIs and weights. Weights are
+    renormalized, so intervals that could not be measured are left out.
+    """
+    total_weight = sum(weights)
+    if not total_weight:
+        return None
+    cpi = sum(w * c for w, c in zip(weights, cpis)) / total_weight
+    return 1.0 / cpi if cpi else None
+
+
+def extract_simpoint_metrics(design: str, workload: str) -> Optional[Dict[str, any]]:
+    """Rebuild one design x workload's IPC from its simpoint measurements."""
+    simpoints_file = PROFILE_DIR / workload / "simpoints.json"
+    if not simpoints_file.exists():
+        return None
+    with open(simpoints_file, 'r') as f:
+        simpoints = json.load(f)['simpoints']
+
+    weights = []
+    cpis = []
+    measured_insts = 0
+    for simpoint in simpoints:
+        run_dir = SIMPOINT_DIR / design / workload / f"sp_{simpoint['id']:02d}"
+        window_file = run_dir / "simpoint_window.json"
+        stats_file = gem5stats.compression.resolve(run_dir / "stats.txt")
+        if not window_file.exists() or not stats_file.exists():
+            continue
+        with open(window_file, 'r') as f:
+            window = json.load(f)
+        measurement = measure_window(read_dumps(stats_file), window['start_tick'],
+                                     window.get('end_tick', float('inf')))
+        if measurement is None:
+            continue
+        weights.append(simpoint['weight'])
+        cpis.append(measurement['cpi'])
+        measured_insts += measurement['insts']
+
+    ipc = weighted_ipc(weights, cpis)
+    if ipc is None:
+        return None
+    return {
+        'design': design,
+        'workload': workload,
+        'credits': DESIGNS.get(design),
+        'ipc': ipc,
+        'ipc_per_credit': ipc / DESIGNS[design] if design in DESIGNS else None,
+        'cpi': 1.0 / ipc,
+        'simpoints': len(simpoints),
+        'simpoints_measured': len(weights),
+        'weight_coverage': sum(weights),
+        'measured_insts': measured_insts
+    }
+
+
+def load_full_run_ipc() -> Dict[tuple, float]:
+    """IPC of full detailed runs from part4_metrics.csv, keyed by (design, workload)."""
+    full_ipc = {}
+    if FULL_RUN_CSV.exists():
+        with open(FULL_RUN_CSV, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    full_ipc[(row['design'], row['workload'])] = float(row['ipc'])
+                except (KeyError, ValueError):
+                    continue
+    return full_ipc
+
+
+def parse_all_simpoint_runs():
+    """Rebuild IPC for every simpoint-sampled design x workload and write a CSV."""
+    print("=" * 80)
+    print("Parsing SimPoint-sampled Part 4 simulations")
+    print("=" * 80)
+
+    full_ipc = load_full_run_ipc()
+    all_results = []
+    designs = sorted(p.name for p in SIMPOINT_DIR.glob("design_*") if p.is_dir())
+    for design in designs:
+        print(f"\nProcessing {design}...")
+        for workload in WORKLOADS:
+            result = extract_simpoint_metrics(design, workload)
+            if result is None:
+                continue
+
+            # Compare with the full detailed run where we have one
+            reference = full_ipc.get((design, workload))
+            result['full_run_ipc'] = reference
+            result['ipc_error_pct'] = (result['ipc'] - reference) / reference * 100 if reference else None
+
+            all_results.append(result)
+            line = f"  ✓ {workload}: IPC={result['ipc']:.4f} ({result['simpoints_measured']}/{result['simpoints']} simpoints"
+            if reference:
+                line += f", {result['ipc_error_pct']:+.2f}% vs full run"
+            print(line + ")")
+
+    if not all_results:
+        print("\n✗ No results to write!")
+        return
+
+    output_file = CSV_OUTPUT_DIR / "part4_simpoint_metrics.csv"
+    with open(output_file, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(all_results[0].keys()))
+        writer.writeheader()
+        writer.writerows(all_results)
+
+    print("\n" + "=" * 80)
+    print(f"✓ Successfully parsed {len(all_results)} sampled simulations")
+    print(f"✓ CSV output written to: {output_file}")
+    print("=" * 80)
+
+
+def roi_bounds(dumps: List[Dict[str, float]], script_ticks: List[int]) -> tuple:
+    """
+    (start, end) tick of the workload's ROI. The workload's own dumps are
+    those not made by a3_part4.py at one of script_ticks; its first two
+    bound the ROI. Either bound is None if the run never reached it.
+    """
+    script_ticks = set(script_ticks)
+    own_ticks = sorted(dump['finalTick'] for dump in dumps
+                       if dump.get('finalTick') not in script_ticks)
+    return (own_ticks[0] if own_ticks else None,
+            own_ticks[1] if len(own_ticks) > 1 else None)
+
+
+def sum_stats(dumps: List[Dict[str, float]], start_tick: float, end_tick: float,
+              names: List[str]) -> Dict[str, float]:
+    """
+    Sum stats over the dumps made in (start_tick, end_tick]. Every dump
+    follows a stats reset, so together they cover exactly that span.
+    """
+    inside = [dump for dump in dumps if start_tick < dump.get('finalTick', 0) <= end_tick]
+    return {name: sum(dump.get(name, 0) for dump in inside) for name in names}
+
+
+def window_cpis(dumps: List[Dict[str, float]], windows: List[Dict[str, int]]) -> List[Dict[str, float]]:
+    """
+    Measure each SMARTS window from the dumps made inside it, and tag it
+    with whether it lies in the ROI.
+    """
+    roi_start, roi_end = roi_bounds(dumps, [window['end_tick'] for window in windows])
+
+    measured = []
+    for window in windows:
+        totals = sum_stats(dumps, window['start_tick'], window['end_tick'],
+                           ['system.cpu.numCycles', 'simInsts'])
+        cycles, insts = totals['system.cpu.numCycles'], totals['simInsts']
+        if not cycles or not insts:
+            continue
+        in_roi = ((roi_start is None or window['start_tick'] >= roi_start)
+                  and (roi_end is None or window['end_tick'] <= roi_end))
+        measured.append({'cpi': cycles / insts, 'insts': insts, 'in_roi': in_roi})
+    return measured
+
+
+def smarts_estimate(cpis: List[float], confidence: float = CONFIDENCE,
+                    target_error: float = TARGET_RELATIVE_ERROR) -> Optional[Dict[str, float]]:
+    """
+    IPC and its confidence interval from per-window CPIs. The interval is
+    computed on mean CPI (the quantity windows of equal instruction count
+    average) and inverted. Also returns the CPI coefficient of variation
+    and the windows needed for target_error relative error, as in SMARTS.
+    """
+    cpis = np.asarray(cpis, dtype=float)
+    n = len(cpis)
+    if n == 0:
+        return None
+    mean = float(cpis.mean())
+    if n < 2:
+        return {'ipc': 1.0 / mean, 'ipc_ci_low': None, 'ipc_ci_high': None,
+                'cpi_cov': None, 'relative_error': None, 'recommended_windows': None}
+
+    std = float(cpis.std(ddof=1))
+    half_width = float(stats.t.ppf(0.5 + confidence / 2, n - 1)) * std / np.sqrt(n)
+    z = stats.norm.ppf(0.5 + confidence / 2)
+    cov = std / mean
+    return {
+        'ipc': 1.0 / mean,
+        'ipc_ci_low': 1.0 / (mean + half_width),
+        'ipc_ci_high': 1.0 / (mean - half_width) if mean > half_width else float('inf'),
+        'cpi_cov': cov,
+        'relative_error': half_width / mean,
+        'recommended_windows': int(np.ceil((z * cov / target_error) ** 2))
+    }
+
+
+def extract_smarts_metrics(run_dir: Path) -> Optional[Dict[str, any]]:
+    """IPC with a confidence interval for one SMARTS-sampled run directory."""
+    windows_file = run_dir / "smarts_windows.json"
+    stats_file = gem5stats.compression.resolve(run_dir / "stats.txt")
+    if not windows_file.exists() or not stats_file.exists():
+        return None
+    with open(windows_file, 'r') as f:
+        sampling = json.load(f)
+
+    measured = window_cpis(read_dumps(stats_file), sampling['windows'])
+    roi = [window for window in measured if window['in_roi']]
+    estimate = smarts_estimate([window['cpi'] for window in roi])
+    if estimate is None:
+        return None
+    return {
+        **estimate,
+        'cpi': 1.0 / estimate['ipc'],
+        'windows': len(sampling['windows']),
+        'windows_in_roi': len(roi),
+        'measured_insts': sum(window['insts'] for window in roi),
+        'period_insts': sampling['period_insts'],
+        'warmup_insts': sampling['warmup_insts'],
+        'window_insts': sampling['window_insts']
+    }
+
+
+def parse_all_smarts_runs():
+    """Estimate IPC for every SMARTS-sampled design x workload and write a CSV."""
+    print("=" * 80)
+    print("Parsing SMARTS-sampled Part 4 simulations")
+    print("=" * 80)
+
+    full_ipc = load_full_run_ipc()
+    all_results = []
+    for design in DESIGNS:
+        print(f"\nProcessing {design}...")
+        for workload in WORKLOADS:
+            metrics = extract_smarts_metrics(PART4_DIR / design / workload / SMARTS_SUBDIR)
+            if metrics is None:
+                continue
+            result = {
+                'design': design,
+                'workload': workload,
+                'credits': DESIGNS[design],
+                **metrics,
+                'ipc_per_credit': metrics['ipc'] / DESIGNS[design]
+            }
+            reference = full_ipc.get((design, workload))
+            result['full_run_ipc'] = reference
+            result['ipc_error_pct'] = (result['ipc'] - reference) / reference * 100 if reference else None
+            all_results.append(result)
+
+            line = f"  ✓ {workload}: IPC={result['ipc']:.4f}"
+            if result['ipc_ci_low'] is not None:
+                line += f" [{result['ipc_ci_low']:.4f}, {result['ipc_ci_high']:.4f}]"
+            line += f" ({result['windows_in_roi']} windows"
+            if reference:
+                line += f", {result['ipc_error_pct']:+.2f}% vs full run"
+            print(line + ")")
+
+    if not all_results:
+        print("\n✗ No results to write!")
+        return
+
+    output_file = CSV_OUTPUT_DIR / "part4_smarts_metrics.csv"
+    with open(output_file, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(all_results[0].keys()))
+        writer.writeheader()
+        writer.writerows(all_results)
+
+    print("\n" + "=" * 80)
+    print(f"✓ Successfully parsed {len(all_results)} sampled simulations")
+    print(f"✓ CSV output written to: {output_file}")
+    print("=" * 80)
+
+
+def load_roi_insts() -> Dict[str, float]:
+    """
+    Committed instructions in each workload's ROI, from the full runs in
+    part4_metrics.csv (the program is the same on every design).
+    """
+    roi_insts = {}
+    if FULL_RUN_CSV.exists():
+        with open(FULL_RUN_CSV, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    roi_insts.setdefault(row['workload'], float(row['simInsts']))
+                except (KeyError, ValueError):
+                    continue
+    return roi_insts
+
+
+def extract_truncated_metrics(run_dir: Path, roi_insts: Optional[float]) -> Optional[Dict[str, any]]:
+    """
+    Whole-ROI metrics of one truncated run: measured over the part of the
+    ROI it simulated and scaled by roi_insts / measured instructions.
+    """
+    convergence_file = run_dir / "convergence.json"
+    stats_file = gem5stats.compression.resolve(run_dir / "stats.txt")
+    if not convergence_file.exists() or not stats_file.exists():
+        return None
+    with open(convergence_file, 'r') as f:
+        convergence = json.load(f)
+    intervals = convergence['intervals']
+
+    dumps = read_dumps(stats_file)
+    roi_start, roi_end = roi_bounds(dumps, [interval['end_tick'] for interval in intervals])
+    if roi_start is None:
+        return None
+    complete = roi_end is not None
+    measured_end = roi_end if complete else max(dump['finalTick'] for dump in dumps)
+
+    totals = sum_stats(dumps, roi_start, measured_end, ['simInsts'] + list(EXTRAPOLATED_STATS.values()))
+    measured_insts = totals['simInsts']
+    measured_cycles = totals['system.cpu.numCycles']
+    if not measured_insts or not measured_cycles:
+        return None
+
+    # Interval IPCs act as batch means for the confidence interval
+    interval_cpis = []
+    for interval in intervals:
+        if interval['start_tick'] >= roi_start and interval['end_tick'] <= measured_end:
+            part = sum_stats(dumps, interval['start_tick'], interval['end_tick'],
+                             ['system.cpu.numCycles', 'simInsts'])
+            if part['simInsts']:
+                interval_cpis.append(part['system.cpu.numCycles'] / part['simInsts'])
+    estimate = smarts_estimate(interval_cpis) or {}
+
+    if complete:
+        roi_insts = measured_insts
+        certainty = "complete"
+    elif (roi_insts and convergence['stop_reason'] == 'converged'
+            and estimate.get('relative_error') is not None
+            and estimate['relative_error'] <= TARGET_RELATIVE_ERROR):
+        certainty = "high"
+    else:
+        certainty = "low"
+    scale = roi_insts / measured_insts if roi_insts else None
+
+    ipc = measured_insts / measured_cycles
+    result = {
+        'ipc': ipc,
+        'ipc_ci_low': estimate.get('ipc_ci_low'),
+        'ipc_ci_high': estimate.get('ipc_ci_high'),
+        'relative_error': estimate.get('relative_error'),
+        'cpi': 1.0 / ipc,
+        'certainty': certainty,
+        'stop_reason': convergence['stop_reason'],
+        'intervals': len(intervals),
+        'measured_insts': measured_insts,
+        'roi_insts': roi_insts,
+        'roi_fraction_measured': measured_insts / roi_insts if roi_insts else None
+    }
+    for key, name in EXTRAPOLATED_STATS.items():
+        result[key] = totals[name] * scale if scale else None
+    result['simSeconds'] = result['simTicks'] / dumps[0].get('simFreq', 1e12) if scale else None
+    result['l1d_miss_rate'] = (totals[EXTRAPOLATED_STATS['l1d_misses']] / totals[EXTRAPOLATED_STATS['l1d_accesses']]
+                               if totals[EXTRAPOLATED_STATS['l1d_accesses']] else None)
+    result['l1i_miss_rate'] = (totals[EXTRAPOLATED_STATS['l1i_misses']] / totals[EXTRAPOLATED_STATS['l1i_accesses']]
+                               if totals[EXTRAPOLATED_STATS['l1i_accesses']] else None)
+    result['branch_mispredict_rate'] = totals[EXTRAPOLATED_STATS['branchMispredicts']] / measured_insts * 1000
+    return result
+
+
+def parse_all_truncated_runs():
+    """Extrapolate whole-ROI metrics for every truncated design x workload and write a CSV."""
+    print("=" * 80)
+    print("Parsing truncated Part 4 simulations")
+    print("=" * 80)
+
+    full_ipc = load_full_run_ipc()
+    roi_insts = load_roi_insts()
+    all_results = []
+    for design in DESIGNS:
+        print(f"\nProcessing {design}...")
+        for workload in WORKLOADS:
+            metrics = extract_truncated_metrics(PART4_DIR / design / workload / TRUNCATED_SUBDIR,
+                                                roi_insts.get(workload))
+            if metrics is None:
+                continue
+            result = {
+                'design': design,
+                'workload': workload,
+                'credits': DESIGNS[design],
+                **metrics,
+                'ipc_per_credit': metrics['ipc'] / DESIGNS[design]
+            }
+            reference = full_ipc.get((design, workload))
+            result['full_run_ipc'] = reference
+            result['ipc_error_pct'] = (result['ipc'] - reference) / reference * 100 if reference else None
+            all_results.append(result)
+
+            line = f"  ✓ {workload}: IPC={result['ipc']:.4f} ({result['certainty']} certainty, {result['stop_reason']}"
+            if result['roi_fraction_measured'] is not None:
+                line += f", {result['roi_fraction_measured'] * 100:.1f}% of ROI"
+            if reference:
+                line += f", {result['ipc_error_pct']:+.2f}% vs full run"
+            print(line + ")")
+
+    if not all_results:
+        print("\n✗ No results to write!")
+        return
+
+    output_file = CSV_OUTPUT_DIR / "part4_truncated_metrics.csv"
+    with open(output_file, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(all_results[0].keys()))
+        writer.writeheader()
+        writer.writerows(all_results)
+
+    print("\n" + "=" * 80)
+    print(f"✓ Successfully parsed {len(all_results)} truncated simulations")
+    print(f"✓ CSV output written to: {output_file}")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse sampled Part 4 simulations")
+    parser.add_argument('mode', choices=["simpoint", "smarts", "truncated"], help="sampling method the runs used")
+    args = parser.parse_args()
+
+    if args.mode == "simpoint":
+        parse_all_simpoint_runs()
+    elif args.mode == "smarts":
+        parse_all_smarts_runs()
+    elif args.mode == "truncated":
+        parse_all_truncated_runs()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+stat_timeseries.py
+Time series of gem5 stats from periodic dumps, and phase detection
+
+Runs with periodic stat dumps (run_part4_sim.py --stat-period-ticks or
+--stat-period-insts) live under data/part4/<design>/<workload>/phases/.
+a3_part4.py dumps and resets stats every period on top of the workload's
+own dumps, so each dump covers one stretch of the run. read_timeseries()
+turns the N dumps into one NumPy array per stat (NaN where a dump lacks
+the stat), and roi_timeseries() keeps the dumps inside the workload's ROI
+(between its own first two dumps, told apart from the periodic ones with
+stat_periods.json, as parse_sampled.py does for SMARTS windows).
+
+IPC, L1D miss rate and squash rate (squashed / committed instructions)
+are ratios of count stats, so they are exact over any run of dumps, not
+just per dump. Phases are the segments between change points of the
+three rates, found jointly with PELT (optimal partitioning with pruning)
+on the log of each rate (its noise grows with its level) scaled by its
+dump-to-dump noise, with a BIC-like penalty.
+Phase boundaries are placed by committed instruction, which is the same
+on every design, so the phases of a reference design can be measured on
+every other design to show where in a workload each one wins or loses.
+
+Usage:
+  python3 data/CSV/stat_timeseries.py [--reference design_a] [--penalty 1.0]
+"""
+
+import argparse
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from parse_data import DATA_DIR, DESIGNS, WORKLOADS
+import gem5stats  # on sys.path via parse_data
+
+CSV_OUTPUT_DIR = Path(__file__).parent
+PHASES_SUBDIR = "phases"
+
+# Rates tracked per dump: (numerator, denominator) count stats
+PHASE_METRICS = {
+    'ipc': ('simInsts', 'system.cpu.numCycles'),
+    'l1d_miss_rate': ('system.cpu.l1d.overallMisses::total', 'system.cpu.l1d.overallAccesses::total'),
+    'squash_rate': ('system.cpu.commit.commitSquashedInsts', 'simInsts')
+}
+
+# Every stat the phase analysis reads
+SERIES_STATS = ['finalTick', 'simTicks'] + sorted({name for pair in PHASE_METRICS.values() for name in pair})
+
+# Fewest dumps a phase may span, and the multiplier of the BIC-like
+# change point penalty (higher: fewer, longer phases)
+MIN_PHASE_DUMPS = 3
+PENALTY_SCALE = 1.0
+
+
+def read_timeseries(stats_file_path: Path, names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Every complete dump of a stats.txt file as stat name -> array over
+    dumps (NaN where a dump lacks the stat). names limits the stats parsed.
+    """
+    dumps = list(gem5stats.read_dumps(stats_file_path, 'all', names=names).values())
+    if names is None:
+        names = list(dict.fromkeys(name for dump in dumps for name in dump))
+    return {name: np.array([dump.get(name, np.nan) for dump in dumps], dtype=float) for name in names}
+
+
+def periodic_dumps(final_ticks: np.ndarray, periods: Dict[str, any]) -> np.ndarray:
+    """Which dumps a3_part4.py made periodically (as opposed to the workload's own)."""
+    return np.isin(final_ticks, periods['dump_ticks'])
+
+
+def roi_timeseries(run_dir: Path, names: Iterable[str] = SERIES_STATS) -> Optional[Dict[str, np.ndarray]]:
+    """
+    The time series of the dumps inside the workload's ROI of one periodic
+    run directory, or None if the run has no stats or never finished its
+    ROI. Dumps of zero length (a periodic and a workload dump at the same
+    tick) are dropped.
+    """
+    periods_file = run_dir / "stat_periods.json"
+    stats_file = gem5stats.compression.resolve(run_dir / "stats.txt")
+    if not periods_file.exists() or not stats_file.exists():
+        return None
+    with open(periods_file, 'r') as f:
+        periods = json.load(f)
+    # Tick-period runs made with periodicStatDump (stat_periods.json with a
+    # first_tick) never reset stats, so their dumps are not per period
+    if periods.get('first_tick') is not None:
+        return None
+
+    names = list(dict.fromkeys(['finalTick', 'simTicks', *names]))
+    series = read_timeseries(stats_file, names)
+    final_ticks = series['finalTick']
+    own_ticks = np.sort(final_ticks[~periodic_dumps(final_ticks, periods)])
+    if len(own_ticks) < 2:
+        return None
+    inside = (final_ticks > own_ticks[0]) & (final_ticks <= own_ticks[1]) & (series['simTicks'] > 0)
+    return {name: values[inside] for name, values in series.items()}
+
+
+def rates(series: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """PHASE_METRICS per dump (NaN where the denominator is 0)."""
+    result = {}
+    for metric, (numerator, denominator) in PHASE_METRICS.items():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[metric] = np.where(series[denominator] > 0, series[numerator] / series[denominator], np.nan)
+    return result
+
+
+def noise_scale(column: np.ndarray) -> float:
+    """
+    Dump-to-dump noise of a series: the MAD of its first differences,
+    scaled to a standard deviation, so phase shifts do not inflate it.
+    """
+    diffs = np.diff(column)
+    scale = np.median(np.abs(diffs - np.median(diffs))) / (0.6745 * np.sqrt(2)) if len(diffs) else 0.0
+    if not scale:
+        scale = np.std(column)
+    return scale or 1.0
+
+
+def change_points(signal: np.ndarray, penalty: Optional[float] = None,
+                  min_size: int = MIN_PHASE_DUMPS) -> List[int]:
+    """
+    Change points of a (dumps x series) signal under a piecewise-constant
+    mean model, by PELT with an L2 cost: the start index of every segment
+    but the first. The default penalty is BIC-like, (series + 1) * log(n),
+    for a signal scaled to unit noise.
+    """
+    signal = np.asarray(signal, dtype=float)
+    if signal.ndim == 1:
+        signal = signal[:, None]
+    n, width = signal.shape
+    if n < 2 * min_size:
+        return []
+    if penalty is None:
+        penalty = (width + 1) * np.log(n)
+
+    # Prefix sums give the cost of any segment [start, end) in O(width)
+    sums = np.vstack([np.zeros(width), np.cumsum(signal, axis=0)])
+    squares = np.vstack([np.zeros(width), np.cumsum(signal ** 2, axis=0)])
+
+    def segment_cost(starts: np.ndarray, end: int) -> np.ndarray:
+        total = sums[end] - sums[starts]
+        return ((squares[end] - squares[starts]) - total ** 2 / (end - starts)[:, None]).sum(axis=1)
+
+    best = np.full(n + 1, np.inf)
+    best[0] = -penalty
+    previous = np.zeros(n + 1, dtype=int)
+    candidates = np.zeros(0, dtype=int)
+    for end in range(min_size, n + 1):
+        if np.isfinite(best[end - min_size]):
+            candidates = np.append(candidates, end - min_size)
+        costs = best[candidates] + segment_cost(candidates, end)
+        choice = np.argmin(costs)
+        best[end] = costs[choice] + penalty
+        previous[end] = candidates[choice]
+        # Starts that cannot beat the best one now never will
+        candidates = candidates[costs <= best[end]]
+
+    points = []
+    end = previous[n]
+    while end > 0:
+        points.append(int(end))
+        end = previous[end]
+    return sorted(points)
+
+
+def detect_phases(series: Dict[str, np.ndarray], penalty_scale: float = PENALTY_SCALE,
+                  min_size: int = MIN_PHASE_DUMPS) -> List[int]:
+    """
+    Change points (dump indices) of IPC, L1D miss rate and squash rate
+    together. Each rate is compared in log space, where a phase's noise no
+    longer depends on its level, and scaled by its own noise. Missing rates
+    take the series' median so they never look like a change, and zeros
+    are floored at 1% of it.
+    """
+    columns = []
+    for values in rates(series).values():
+        if not (values > 0).any():
+            continue
+        median = np.nanmedian(values[values > 0])
+        values = np.log(np.maximum(np.where(np.isnan(values), median, values), 0.01 * median))
+        columns.append((values - values.mean()) / noise_scale(values))
+    if not columns:
+        return []
+    signal = np.column_stack(columns)
+    penalty = penalty_scale * (signal.shape[1] + 1) * np.log(max(2, len(signal)))
+    return change_points(signal, penalty, min_size)
+
+
+def cumulative_insts(series: Dict[str, np.ndarray]) -> np.ndarray:
+    """Committed instructions at the end of each dump, from the start of the series."""
+    return np.cumsum(series['simInsts'])
+
+
+def rates_between(series: Dict[str, np.ndarray], fractions: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    PHASE_METRICS over each span between consecutive fractions of the
+    series' instructions. Counts are interpolated linearly within a dump,
+    so spans need not line up with dumps (or with another design's dumps).
+    """
+    insts = np.concatenate([[0.0], cumulative_insts(series)])
+    positions = np.asarray(fractions, dtype=float) * insts[-1]
+    totals = {}
+    for name in {name for pair in PHASE_METRICS.values() for name in pair}:
+        counts = np.concatenate([[0.0], np.cumsum(np.nan_to_num(series[name]))])
+        totals[name] = np.diff(np.interp(positions, insts, counts))
+    result = {}
+    for metric, (numerator, denominator) in PHASE_METRICS.items():
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[metric] = np.where(totals[denominator] > 0, totals[numerator] / totals[denominator], np.nan)
+    return result
+
+
+def phase_bounds(series: Dict[str, np.ndarray], points: List[int]) -> np.ndarray:
+    """Phase boundaries as fractions of the series' instructions, 0 and 1 included."""
+    insts = cumulative_insts(series)
+    inner = [insts[point - 1] / insts[-1] for point in points]
+    return np.array([0.0, *inner, 1.0])
+
+
+def extract_phase_metrics(run_dir: Path, penalty_scale: float = PENALTY_SCALE) -> Optional[Dict[str, any]]:
+    """ROI rates and detected phases of one periodic run directory."""
+    series = roi_timeseries(run_dir)
+    if series is None or not np.nansum(series['simInsts']):
+        return None
+    points = detect_phases(series, penalty_scale)
+    bounds = phase_bounds(series, points)
+    whole = rates_between(series, np.array([0.0, 1.0]))
+    return {
+        **{metric: float(values[0]) for metric, values in whole.items()},
+        'roi_insts': float(np.nansum(series['simInsts'])),
+        'dumps_in_roi': len(series['simInsts']),
+        'phases': len(bounds) - 1,
+        'phase_bounds': [round(float(bound), 6) for bound in bounds]
+    }
+
+
+def fmt(value: float, digits: int = 4) -> str:
+    return "-" if value is None or np.isnan(value) else f"{value:.{digits}f}"
+
+
+def parse_all_phase_runs(reference: str, penalty_scale: float):
+    """
+    Detect phases of every workload on the reference design, measure each
+    design over those phases, print who wins each one and write a CSV.
+    """
+    print("=" * 80)
+    print("Phase analysis of periodic Part 4 simulations")
+    print("=" * 80)
+
+    rows = []
+    for workload in WORKLOADS:
+        runs = {}
+        for design in DESIGNS:
+            series = roi_timeseries(DATA_DIR / design / workload / PHASES_SUBDIR)
+            if series is not None and np.nansum(series['simInsts']):
+                runs[design] = series
+        if not runs:
+            continue
+        base = reference if reference in runs else next(iter(runs))
+        points = detect_phases(runs[base], penalty_scale)
+        bounds = phase_bounds(runs[base], points)
+        measured = {design: rates_between(series, bounds) for design, series in runs.items()}
+
+        print(f"\n{workload}: {len(bounds) - 1} phases on {base} "
+              f"({len(runs[base]['simInsts'])} dumps in ROI)")
+        print("  phase  insts%      " + "".join(design.rjust(12) for design in runs) + "   best IPC")
+        for phase in range(len(bounds) - 1):
+            ipcs = {design: values['ipc'][phase] for design, values in measured.items()}
+            known = {design: ipc for design, ipc in ipcs.items() if not np.isnan(ipc)}
+            winner = max(known, key=known.get) if known else "-"
+            share = (bounds[phase + 1] - bounds[phase]) * 100
+            print(f"  {phase:>5}  {share:6.1f}%     " + "".join(fmt(ipc).rjust(12) for ipc in ipcs.values())
+                  + f"   {winner}")
+            for design, values in measured.items():
+                rows.append({
+                    'workload': workload,
+                    'design': design,
+                    'reference_design': base,
+                    'phase': phase,
+                    'start_fraction': float(bounds[phase]),
+                    'end_fraction': float(bounds[phase + 1]),
+                    **{metric: float(values[metric][phase]) for metric in PHASE_METRICS},
+                    'ipc_per_credit': float(values['ipc'][phase]) / DESIGNS[design],
+                    'best_ipc': design == winner
+                })
+
+    if not rows:
+        print(f"\n✗ No periodic runs found under {DATA_DIR}/<design>/<workload>/{PHASES_SUBDIR}")
+        return
+
+    output_file = CSV_OUTPUT_DIR / "part4_phases.csv"
+    with open(output_file, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print("\n" + "=" * 80)
+    print(f"✓ {len(rows)} design x phase rows written to: {output_file}")
+    print("=" * 80)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detect phases in periodic Part 4 simulations")
+    parser.add_argument('--reference', default="design_a",
+                        help="design whose change points define each workload's phases (default: design_a)")
+    parser.add_argument('--penalty', type=float, default=PENALTY_SCALE,
+                        help="change point penalty multiplier; higher finds fewer phases")
+    args = parser.parse_args()
+    parse_all_phase_runs(args.reference, args.penalty)
+
+
+if __name__ == "__main__":
+    main()
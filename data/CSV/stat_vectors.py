@@ -0,0 +1,268 @@
+"""
+stat_vectors.py
+Structured parsing of gem5 vector and distribution stats
+
+gem5 prints a vector or distribution stat as one line per element,
+name::label, and the scalar parsers keep each line as a separate key
+(system.cpu.numIssuedDist::0, ::1, ...) and drop the percentage and
+cumulative columns. This groups the lines of every such stat into one
+StatVector: bucket labels and values as NumPy arrays, the percentage and
+cumulative columns alongside them, and (for distributions) samples,
+mean, stdev, underflows, overflows, min and max. Every bucket gem5
+prints is kept, so wider designs' numIssuedDist::3.. are not lost.
+
+stack() lines the same stat up across runs as a runs x buckets matrix
+(buckets gem5 omitted count 0), so comparing histograms across designs
+is array arithmetic:
+
+  vectors = read_vectors_runs()
+  labels, counts = stack(vectors, 'system.cpu.numIssuedDist', normalize=True)
+
+Usage:
+  python3 data/CSV/stat_vectors.py system.cpu.numIssuedDist [--dump 1] [--counts]
+"""
+
+import argparse
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from parse_data import DATA_DIR, DESIGNS, WORKLOADS
+from gem5stats import ROI_DUMP, compression, dump_lines
+
+# Element labels gem5 uses for a stat's summary values rather than buckets
+SUMMARY_LABELS = ['samples', 'mean', 'stdev', 'gmean', 'underflows', 'overflows',
+                  'min_value', 'max_value', 'total']
+
+# Bucket labels of a distribution: a value (0) or a range (10-19)
+BUCKET_RANGE = re.compile(r'^(-?\d+(?:\.\d+)?)(?:-(-?\d+(?:\.\d+)?))?$')
+
+
+class StatVector:
+    """One vector or distribution stat of one dump."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.labels = []
+        self.summary = {}
+        self._values = []
+        self._percent = []
+        self._cumulative = []
+        self.values = None
+        self.percent = None
+        self.cumulative = None
+
+    def add(self, label: str, value: float, percent: Optional[float], cumulative: Optional[float]):
+        """Add one name::label line of the stat."""
+        if label in SUMMARY_LABELS:
+            self.summary[label] = value
+            # underflows/overflows carry percentage columns too
+            if percent is not None:
+                self.summary[label + '_pct'] = percent
+            return
+        self.labels.append(label)
+        self._values.append(value)
+        self._percent.append(np.nan if percent is None else percent)
+        self._cumulative.append(np.nan if cumulative is None else cumulative)
+
+    def finish(self) -> "StatVector":
+        """Turn the collected elements into arrays (called once the dump ends)."""
+        self.values = np.array(self._values, dtype=np.float64)
+        self.percent = np.array(self._percent, dtype=np.float64)
+        self.cumulative = np.array(self._cumulative, dtype=np.float64)
+        self._values = self._percent = self._cumulative = None
+        return self
+
+    @property
+    def is_distribution(self) -> bool:
+        return 'samples' in self.summary
+
+    @property
+    def samples(self) -> Optional[float]:
+        return self.summary.get('samples')
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.summary.get('mean')
+
+    @property
+    def stdev(self) -> Optional[float]:
+        return self.summary.get('stdev')
+
+    @property
+    def underflows(self) -> Optional[float]:
+        return self.summary.get('underflows')
+
+    @property
+    def overflows(self) -> Optional[float]:
+        return self.summary.get('overflows')
+
+    @property
+    def total(self) -> Optional[float]:
+        return self.summary.get('total')
+
+    def bucket_bounds(self) -> Optional[np.ndarray]:
+        """(low, high) of each bucket as a buckets x 2 array, or None for a named vector."""
+        bounds = [bucket_bounds(label) for label in self.labels]
+        if not bounds or any(bound is None for bound in bounds):
+            return None
+        return np.array(bounds, dtype=np.float64)
+
+    def as_dict(self) -> Dict[str, float]:
+        """label -> value of the buckets."""
+        return dict(zip(self.labels, self.values.tolist()))
+
+    def __repr__(self):
+        kind = "distribution" if self.is_distribution else "vector"
+        return f"StatVector({self.name!r}, {kind}, {len(self.labels)} buckets)"
+
+
+def bucket_bounds(label: str) -> Optional[Tuple[float, float]]:
+    """(low, high) of a distribution bucket label, or None if it is not numeric."""
+    match = BUCKET_RANGE.match(label)
+    if match is None:
+        return None
+    low = float(match.group(1))
+    return low, float(match.group(2)) if match.group(2) is not None else low
+
+
+def parse_percent(field: str) -> Optional[float]:
+    """12.5% -> 12.5 (None if the field is not a percentage)."""
+    if not field.endswith('%'):
+        return None
+    try:
+        return float(field[:-1])
+    except ValueError:
+        return None
+
+
+def parse_vectors(lines: Iterable[str]) -> Dict[str, StatVector]:
+    """
+    Every vector and distribution stat in the lines of one dump, keyed on
+    the stat name without the ::label part, in the order gem5 printed them.
+    """
+    vectors = {}
+    for line in lines:
+        if '::' not in line:
+            continue
+        # name value [percent cumulative] # description
+        fields = line.split('#', 1)[0].split()
+        if len(fields) < 2 or '::' not in fields[0]:
+            continue
+        try:
+            value = float(fields[1])
+        except ValueError:
+            continue
+        name, label = fields[0].split('::', 1)
+        percent = parse_percent(fields[2]) if len(fields) > 2 else None
+        cumulative = parse_percent(fields[3]) if len(fields) > 3 else None
+        vector = vectors.get(name)
+        if vector is None:
+            vector = vectors[name] = StatVector(name)
+        vector.add(label, value, percent, cumulative)
+    for vector in vectors.values():
+        vector.finish()
+    return vectors
+
+
+def read_vectors(stats_file_path: Path, dump: int = ROI_DUMP,
+                 names: Optional[Iterable[str]] = None) -> Optional[Dict[str, StatVector]]:
+    """
+    The vector and distribution stats of one dump of a stats.txt file
+    (only those in names if given), or None if the dump is missing.
+    """
+    lines = dump_lines(stats_file_path, dump).get(dump)
+    if lines is None:
+        return None
+    if names is not None:
+        prefixes = tuple(name + '::' for name in names)
+        lines = [line for line in lines if line.startswith(prefixes)]
+    return parse_vectors(lines)
+
+
+def read_vectors_runs(names: Optional[Iterable[str]] = None, dump: int = ROI_DUMP,
+                      data_dir: Path = DATA_DIR) -> Dict[str, Dict[str, StatVector]]:
+    """read_vectors() on every design x workload run under data_dir, keyed by design/workload."""
+    names = list(names) if names is not None else None
+    runs = {}
+    for design in DESIGNS:
+        for workload in WORKLOADS:
+            stats_file = compression.resolve(data_dir / design / workload / "stats.txt")
+            if not stats_file.exists():
+                continue
+            vectors = read_vectors(stats_file, dump, names)
+            if vectors is not None:
+                runs[f"{design}/{workload}"] = vectors
+    return runs
+
+
+def union_labels(label_lists: Iterable[List[str]]) -> List[str]:
+    """
+    Every label of label_lists: ordered by bucket when all are numeric
+    buckets, otherwise in order of first appearance.
+    """
+    labels = list(dict.fromkeys(label for labels in label_lists for label in labels))
+    bounds = [bucket_bounds(label) for label in labels]
+    if labels and all(bound is not None for bound in bounds):
+        labels = [label for _, label in sorted(zip(bounds, labels))]
+    return labels
+
+
+def stack(runs: Dict[str, Dict[str, StatVector]], name: str,
+          normalize: bool = False) -> Tuple[List[str], np.ndarray]:
+    """
+    One stat across runs as (labels, runs x buckets matrix), rows in the
+    order of runs. Buckets a run lacks count 0 (gem5 omits empty ranges);
+    runs lacking the stat are all NaN. With normalize, each row is divided
+    by its sum (fractions of samples; NaN for an empty histogram).
+    """
+    vectors = [run.get(name) for run in runs.values()]
+    labels = union_labels(vector.labels for vector in vectors if vector is not None)
+    column = {label: i for i, label in enumerate(labels)}
+    matrix = np.full((len(vectors), len(labels)), np.nan)
+    for row, vector in enumerate(vectors):
+        if vector is None:
+            continue
+        matrix[row] = 0.0
+        matrix[row, [column[label] for label in vector.labels]] = vector.values
+    if normalize:
+        sums = matrix.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix = np.where(sums > 0, matrix / sums, np.nan)
+    return labels, matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a vector or distribution stat across all Part 4 runs")
+    parser.add_argument("stat", help="stat name without ::label, e.g. system.cpu.numIssuedDist")
+    parser.add_argument("--dump", type=int, default=ROI_DUMP, help="dump index (default: the ROI dump)")
+    parser.add_argument("--counts", action="store_true", help="show counts instead of percentages")
+    args = parser.parse_args()
+
+    runs = read_vectors_runs([args.stat], args.dump)
+    labels, matrix = stack(runs, args.stat, normalize=not args.counts)
+    if not labels:
+        print(f"✗ No vector or distribution stat named {args.stat!r}")
+        return
+
+    shown = labels[:12]
+    print("run".ljust(32) + "".join(label[-10:].rjust(12) for label in shown))
+    for run, row in zip(runs, matrix):
+        cells = row[:len(shown)] if args.counts else row[:len(shown)] * 100
+        print(run.ljust(32) + "".join((f"{cell:.0f}" if args.counts else f"{cell:.2f}%").rjust(12)
+                                      for cell in cells))
+    if len(labels) > len(shown):
+        print(f"  ... {len(labels) - len(shown)} more buckets")
+
+    vectors = [run[args.stat] for run in runs.values() if args.stat in run]
+    if vectors[0].is_distribution:
+        means = [vector.mean for vector in vectors]
+        print(f"\n✓ {len(vectors)} runs, {len(labels)} buckets, mean {min(means):.3f}..{max(means):.3f}")
+    else:
+        print(f"\n✓ {len(vectors)} runs, {len(labels)} buckets")
+
+
+if __name__ == "__main__":
+    main()
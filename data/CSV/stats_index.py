@@ -0,0 +1,223 @@
+"""
+stats_index.py
+Byte-offset index and mmap random access for stats.txt lookups
+
+For a few stats from many runs, reading and tokenizing every dump of
+every file is wasted work. The first lookup in a stats.txt builds a
+sidecar index next to it (stats.txt.idx) that records the byte range of
+each complete dump and, per dump, the byte offset of each stat's line.
+Later lookups memory-map the file and parse only the lines they need.
+
+The index records the size and mtime of the file it was built from, and
+is rebuilt automatically when either changes (a re-run, a run still
+being written, outputs restored from the cache), so it never serves
+offsets into a different file.
+
+Sidecar layout, kept compact so loading it costs far less than parsing:
+  one JSON header line  version, size, mtime_ns, dump byte ranges,
+                        number of stat names and their bytes
+  stat names            sorted, newline-separated (UTF-8)
+  offsets               int64 (little-endian) names x dumps matrix,
+                        -1 where a dump lacks the stat
+
+Usage:
+  python3 data/CSV/stats_index.py system.cpu.ipc simInsts system.cpu.l1d.demandMissRate::total
+  python3 data/CSV/stats_index.py --dump 2 simTicks
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from parse_data import DATA_DIR, DESIGNS, WORKLOADS
+from gem5stats import BEGIN_MARK, END_MARK, ROI_DUMP, compression, read_dump
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 2
+
+BEGIN_BYTES = BEGIN_MARK.encode()
+END_BYTES = END_MARK.encode()
+
+
+def index_path(stats_file: Path) -> Path:
+    """The sidecar index of a stats file (stats.txt -> stats.txt.idx)."""
+    stats_file = Path(stats_file)
+    return stats_file.with_name(stats_file.name + INDEX_SUFFIX)
+
+
+def build_index(stats_file: Path) -> Dict[str, any]:
+    """
+    Scan a stats file once and return its index: the [begin, end) byte
+    range of every complete dump, the sorted stat names, and the offset of
+    each name's line in each dump (names x dumps, -1 if missing).
+    """
+    stats_file = Path(stats_file)
+    stat = stats_file.stat()
+    dumps = []
+    offsets = []
+    with open(stats_file, 'rb') as f:
+        current = None
+        begin = 0
+        offset = 0
+        for line in f:
+            if line.startswith(BEGIN_BYTES):
+                current = {}
+                begin = offset
+            elif line.startswith(END_BYTES):
+                if current is not None:
+                    dumps.append([begin, offset + len(line)])
+                    offsets.append(current)
+                current = None
+            elif current is not None and line.endswith(b"\n"):
+                name = line.split(None, 1)[0] if line.strip() else None
+                if name:
+                    current[name.decode()] = offset
+            offset += len(line)
+
+    names = sorted(set().union(*offsets)) if offsets else []
+    matrix = array('q', (dump_offsets.get(name, -1) for name in names for dump_offsets in offsets))
+    return {
+        'version': INDEX_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'dumps': dumps,
+        'names': names,
+        'offsets': matrix
+    }
+
+
+def write_index(sidecar: Path, index: Dict[str, any]):
+    """Write an index in the sidecar layout (atomically)."""
+    names_blob = "\n".join(index['names']).encode()
+    header = {key: index[key] for key in ('version', 'size', 'mtime_ns', 'dumps')}
+    header['count'] = len(index['names'])
+    header['names_bytes'] = len(names_blob)
+    offsets = array('q', index['offsets'])
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+
+    tmp_file = sidecar.with_name(sidecar.name + ".tmp")
+    with open(tmp_file, 'wb') as f:
+        f.write(json.dumps(header).encode() + b"\n")
+        f.write(names_blob)
+        f.write(offsets.tobytes())
+    tmp_file.replace(sidecar)
+
+
+def read_index(sidecar: Path) -> Dict[str, any]:
+    """Read an index written by write_index."""
+    data = sidecar.read_bytes()
+    header_end = data.index(b"\n") + 1
+    index = json.loads(data[:header_end])
+    names_end = header_end + index['names_bytes']
+    index['names'] = data[header_end:names_end].decode().split("\n") if index['count'] else []
+    offsets = array('q')
+    offsets.frombytes(data[names_end:])
+    if sys.byteorder != 'little':
+        offsets.byteswap()
+    if len(offsets) != index['count'] * len(index['dumps']):
+        raise ValueError(f"truncated index {sidecar}")
+    index['offsets'] = offsets
+    return index
+
+
+def load_index(stats_file: Path) -> Dict[str, any]:
+    """
+    The index of a stats file, from its sidecar if that still matches the
+    file's size and mtime, otherwise rebuilt and rewritten.
+    """
+    stats_file = Path(stats_file)
+    sidecar = index_path(stats_file)
+    stat = stats_file.stat()
+    try:
+        index = read_index(sidecar)
+        if (index.get('version') == INDEX_VERSION and index['size'] == stat.st_size
+                and index['mtime_ns'] == stat.st_mtime_ns):
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+
+    index = build_index(stats_file)
+    try:
+        write_index(sidecar, index)
+    except OSError:
+        # Read-only directories still get correct (if slower) lookups
+        pass
+    return index
+
+
+def lookup(stats_file: Path, names: Iterable[str], dump: int = ROI_DUMP) -> Dict[str, Optional[float]]:
+    """
+    Values of names in one dump of a stats file, reading only their lines
+    through mmap. A negative dump counts from the last complete dump, as
+    marker:-N does. Stats the dump lacks (or a dump that does not exist)
+    give None. Compressed stats files cannot be memory-mapped, so they are
+    streamed instead (reading only up to the dump).
+    """
+    names = list(names)
+    stats_file = compression.resolve(stats_file)
+    if compression.codec_of(stats_file) is not None:
+        stats = read_dump(stats_file, dump, names) or {}
+        return {name: stats.get(name) for name in names}
+    index = load_index(stats_file)
+    num_dumps = len(index['dumps'])
+    if dump < 0:
+        dump += num_dumps
+    if not 0 <= dump < num_dumps or index['size'] == 0:
+        return {name: None for name in names}
+
+    values = {}
+    with open(stats_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for name in names:
+            row = bisect.bisect_left(index['names'], name)
+            if row == len(index['names']) or index['names'][row] != name:
+                values[name] = None
+                continue
+            offset = index['offsets'][row * num_dumps + dump]
+            if offset < 0:
+                values[name] = None
+                continue
+            line = mm[offset:mm.find(b"\n", offset)]
+            try:
+                values[name] = float(line.split(None, 2)[1])
+            except (IndexError, ValueError):
+                values[name] = None
+    return values
+
+
+def lookup_runs(names: List[str], dump: int = ROI_DUMP,
+                data_dir: Path = DATA_DIR) -> Dict[str, Dict[str, Optional[float]]]:
+    """lookup() on every design x workload run under data_dir, keyed by design/workload."""
+    results = {}
+    for design in DESIGNS:
+        for workload in WORKLOADS:
+            stats_file = compression.resolve(data_dir / design / workload / "stats.txt")
+            if stats_file.exists():
+                results[f"{design}/{workload}"] = lookup(stats_file, names, dump)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up stats across all Part 4 runs via byte-offset indexes")
+    parser.add_argument("stats", nargs="+", help="stat names, e.g. system.cpu.ipc")
+    parser.add_argument("--dump", type=int, default=ROI_DUMP, help="dump index, negative from the last dump (default: the ROI dump)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = lookup_runs(args.stats, args.dump)
+    elapsed = time.perf_counter() - start
+
+    print("run".ljust(32) + "".join(name[-28:].rjust(30) for name in args.stats))
+    for run, values in results.items():
+        print(run.ljust(32) + "".join(str(values[name]).rjust(30) for name in args.stats))
+    print(f"\n✓ {len(args.stats)} stats from {len(results)} runs in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
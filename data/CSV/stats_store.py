@@ -0,0 +1,182 @@
+"""
+stats_store.py
+Columnar store of every stat in every dump of the Part 4 runs
+
+parse_data.py keeps ~60 hand-picked stats of the ROI dump. This ingests
+all of them instead: one row per (run, dump), one column per stat name
+(distribution buckets such as system.cpu.numIssuedDist::3 included), NaN
+where a dump lacks a stat. The values are stored as one float64 .npy
+matrix, which loads memory-mapped, so pulling a stat across every run
+reads only that column's pages and needs no text parsing:
+
+  store = StatsStore.load()
+  ipc = store.column('system.cpu.ipc', dump=ROI_DUMP)   # one value per run
+  store.to_dataframe(dump=ROI_DUMP)                     # pandas, all stats
+
+Layout (STORE_DIR):
+  values.npy   rows x columns float64 matrix
+  index.json   column names, (design, workload, dump) of each row, and
+               the size and mtime of each stats.txt ingested
+
+With --parquet the same table is also written as part4_stats.parquet
+(needs pandas with pyarrow or fastparquet).
+
+Usage:
+  python3 data/CSV/stats_store.py ingest [--parquet]
+  python3 data/CSV/stats_store.py query system.cpu.ipc [--dump 1]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from parse_data import CSV_OUTPUT_DIR, DATA_DIR, DESIGNS, WORKLOADS
+from gem5stats import ROI_DUMP, compression, read_dumps
+
+# Where the ingested store lives
+STORE_DIR = CSV_OUTPUT_DIR / "part4_stats"
+VALUES_FILE = "values.npy"
+INDEX_FILE = "index.json"
+PARQUET_FILE = CSV_OUTPUT_DIR / "part4_stats.parquet"
+
+
+def ingest(data_dir: Path = DATA_DIR, store_dir: Path = STORE_DIR) -> Dict[str, any]:
+    """
+    Parse every dump of every design x workload stats.txt under data_dir
+    into the columnar store at store_dir. Returns the store's index.
+    """
+    rows = []
+    dumps = []
+    sources = {}
+    for design in DESIGNS:
+        for workload in WORKLOADS:
+            stats_file = compression.resolve(data_dir / design / workload / "stats.txt")
+            if not stats_file.exists():
+                continue
+            run_dumps = read_dumps(stats_file, 'all')
+            for dump_index, dump in run_dumps.items():
+                rows.append({'design': design, 'workload': workload, 'dump': dump_index})
+                dumps.append(dump)
+            stat = stats_file.stat()
+            sources[f"{design}/{workload}"] = {'size': stat.st_size, 'mtime': stat.st_mtime,
+                                               'dumps': len(run_dumps)}
+
+    columns = sorted(set().union(*dumps)) if dumps else []
+    column_index = {name: i for i, name in enumerate(columns)}
+    values = np.full((len(rows), len(columns)), np.nan)
+    for row, dump in enumerate(dumps):
+        cols = np.fromiter((column_index[name] for name in dump), dtype=np.int64, count=len(dump))
+        values[row, cols] = np.fromiter(dump.values(), dtype=np.float64, count=len(dump))
+
+    index = {'columns': columns, 'rows': rows, 'sources': sources}
+    store_dir.mkdir(parents=True, exist_ok=True)
+    # Write under temporary names first so readers never see half a store
+    np.save(store_dir / ("tmp." + VALUES_FILE), values)
+    (store_dir / ("tmp." + INDEX_FILE)).write_text(json.dumps(index))
+    (store_dir / ("tmp." + VALUES_FILE)).replace(store_dir / VALUES_FILE)
+    (store_dir / ("tmp." + INDEX_FILE)).replace(store_dir / INDEX_FILE)
+    return index
+
+
+class StatsStore:
+    """Memory-mapped view of an ingested store."""
+
+    def __init__(self, values: np.ndarray, index: Dict[str, any]):
+        self.values = values
+        self.columns = index['columns']
+        self.rows = index['rows']
+        self.sources = index['sources']
+        self.column_index = {name: i for i, name in enumerate(self.columns)}
+        self.dumps = np.array([row['dump'] for row in self.rows], dtype=np.int64)
+
+    @classmethod
+    def load(cls, store_dir: Path = STORE_DIR) -> "StatsStore":
+        with open(store_dir / INDEX_FILE, 'r') as f:
+            index = json.load(f)
+        return cls(np.load(store_dir / VALUES_FILE, mmap_mode='r'), index)
+
+    def row_mask(self, dump: Optional[int] = None) -> np.ndarray:
+        """Boolean mask of the rows of one dump index (all rows if None)."""
+        if dump is None:
+            return np.ones(len(self.rows), dtype=bool)
+        return self.dumps == dump
+
+    def run_names(self, dump: Optional[int] = None) -> List[str]:
+        """design/workload/dump of each selected row, in row order."""
+        return [f"{row['design']}/{row['workload']}/{row['dump']}"
+                for row, keep in zip(self.rows, self.row_mask(dump)) if keep]
+
+    def column(self, name: str, dump: Optional[int] = None) -> np.ndarray:
+        """One stat for every selected row (NaN where a dump lacks it)."""
+        if name not in self.column_index:
+            raise KeyError(f"no stat named {name!r} in the store")
+        return np.asarray(self.values[:, self.column_index[name]])[self.row_mask(dump)]
+
+    def matching(self, prefix: str) -> List[str]:
+        """Stat names starting with prefix, e.g. every bucket of a distribution."""
+        return [name for name in self.columns if name.startswith(prefix)]
+
+    def to_dataframe(self, dump: Optional[int] = None, stats: Optional[List[str]] = None):
+        """The selected rows as a pandas DataFrame indexed by (design, workload, dump)."""
+        import pandas as pd
+
+        mask = self.row_mask(dump)
+        names = stats if stats is not None else self.columns
+        cols = [self.column_index[name] for name in names]
+        frame = pd.DataFrame(np.asarray(self.values[mask][:, cols]), columns=names)
+        meta = [row for row, keep in zip(self.rows, mask) if keep]
+        frame.index = pd.MultiIndex.from_tuples(
+            [(row['design'], row['workload'], row['dump']) for row in meta],
+            names=['design', 'workload', 'dump'])
+        return frame
+
+
+def write_parquet(store: StatsStore, output_file: Path = PARQUET_FILE) -> bool:
+    """Write the whole store as a Parquet table. Returns False if no engine is installed."""
+    try:
+        store.to_dataframe().reset_index().to_parquet(output_file)
+    except ImportError as e:
+        print(f"✗ Parquet not written ({e})")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar store of all Part 4 stats")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = commands.add_parser("ingest", help="parse every stats.txt into the store")
+    ingest_parser.add_argument("--parquet", action="store_true", help=f"also write {PARQUET_FILE.name}")
+
+    query = commands.add_parser("query", help="print one stat across all runs")
+    query.add_argument("stat")
+    query.add_argument("--dump", type=int, default=ROI_DUMP, help="dump index (default: the ROI dump)")
+
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        start = time.perf_counter()
+        index = ingest()
+        elapsed = time.perf_counter() - start
+        print(f"✓ Ingested {len(index['sources'])} runs: {len(index['rows'])} dumps x "
+              f"{len(index['columns'])} stats in {elapsed:.1f}s")
+        print(f"✓ Store written to: {STORE_DIR}")
+        if args.parquet and write_parquet(StatsStore.load()):
+            print(f"✓ Parquet written to: {PARQUET_FILE}")
+        return
+
+    start = time.perf_counter()
+    store = StatsStore.load()
+    values = store.column(args.stat, dump=args.dump)
+    elapsed = time.perf_counter() - start
+    for name, value in zip(store.run_names(args.dump), values):
+        print(f"  {name:<40} {value}")
+    print(f"✓ {len(values)} values in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+surrogate.py
+Surrogate model of Part 4 IPC, trained on the results catalog
+
+Every full run recorded in the results catalog (scripts/results_catalog.py)
+is a labeled example: a design's parameters on one workload -> its IPC.
+IPCSurrogate fits one Gaussian process per workload to them and predicts
+IPC with an uncertainty for design points that were never simulated:
+- features: log2 of each pipeline width, buffer and queue size, and of
+  the FU pool's functional units (cost_model.FU_POOLS), so one doubling
+  is one unit along every axis
+- target: log IPC, so errors are relative and the geometric mean over
+  workloads is a mean of the per-workload predictions
+- kernel: squared exponential with one length scale per feature (ARD),
+  plus observation noise, fitted by maximizing the log marginal likelihood
+  (scipy L-BFGS-B, analytic gradient). Features no training design
+  varies keep a length scale of one doubling, so moving along them still
+  adds uncertainty instead of being ignored.
+
+select_for_simulation() is the policy scripts/surrogate_search.py feeds
+the runner with: simulate a point only if its optimistic IPC could reach
+the Pareto front of the designs simulated so far, or if the model is too
+unsure of it; points confidently below the front are pruned.
+
+Run directly, this fits the model and reports its leave-one-design-out
+error and calibration on every workload.
+
+Usage:
+  python3 data/CSV/surrogate.py [--catalog PATH]
+"""
+
+import argparse
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, optimize
+
+from parse_data import WORKLOADS
+from cost_model import FU_POOLS, PART4_COST_MODEL, WIDTH_PARAMS
+
+# Design parameters the model sees (the FU pool enters as its unit count)
+SIZE_PARAMS = WIDTH_PARAMS + list(PART4_COST_MODEL.entry_credits)
+FEATURE_NAMES = SIZE_PARAMS + ["fu_units"]
+
+# Hyperparameter search space, in log space: length scales (in doublings),
+# signal and noise variance (of the standardized log IPC)
+LENGTH_SCALE_BOUNDS = (0.1, 100.0)
+SIGNAL_BOUNDS = (1e-3, 100.0)
+NOISE_BOUNDS = (1e-6, 1.0)
+RESTARTS = 3
+SEED = 368
+
+# Policy defaults
+DEFAULT_KAPPA = 2.0       # optimism, in standard deviations
+DEFAULT_BAND = 0.02       # within 2% of the front counts as near it
+DEFAULT_MAX_STD = 0.10    # log-IPC standard deviation counted as too unsure
+
+
+def design_features(params: Dict[str, any]) -> np.ndarray:
+    """A design's feature vector (see FEATURE_NAMES)."""
+    units = sum(FU_POOLS[params["fu_pool"]].values())
+    return np.log2([float(params[name]) for name in SIZE_PARAMS] + [float(units)])
+
+
+class GaussianProcess:
+    """GP regression with an ARD squared-exponential kernel and a constant mean."""
+
+    def __init__(self, seed: int = SEED):
+        self.rng = np.random.default_rng(seed)
+        self.X = None
+        self.alpha = None
+        self.chol = None
+
+    def _kernel(self, A: np.ndarray, B: np.ndarray, length_scales: np.ndarray, signal: float) -> np.ndarray:
+        d = (A[:, None, :] - B[None, :, :]) / length_scales
+        return signal * np.exp(-0.5 * np.einsum('ijk,ijk->ij', d, d))
+
+    def _neg_log_likelihood(self, theta: np.ndarray, sq_diffs: np.ndarray,
+                            y: np.ndarray) -> Tuple[float, np.ndarray]:
+        """Negative log marginal likelihood and its gradient in theta (log hyperparameters)."""
+        length_scales, signal, noise = np.exp(theta[:-2]), np.exp(theta[-2]), np.exp(theta[-1])
+        scaled = sq_diffs / length_scales ** 2
+        K_signal = signal * np.exp(-0.5 * scaled.sum(axis=2))
+        K = K_signal + noise * np.eye(len(y))
+        try:
+            chol = linalg.cho_factor(K, lower=True)
+        except linalg.LinAlgError:
+            return 1e10, np.zeros_like(theta)
+        alpha = linalg.cho_solve(chol, y)
+        value = 0.5 * y @ alpha + np.log(np.diag(chol[0])).sum() + 0.5 * len(y) * math.log(2 * math.pi)
+        # d/dtheta = 0.5 tr((K^-1 - alpha alpha^T) dK/dtheta)
+        W = linalg.cho_solve(chol, np.eye(len(y))) - np.outer(alpha, alpha)
+        gradient = np.empty_like(theta)
+        gradient[:-2] = 0.5 * np.einsum('ij,ijk->k', W * K_signal, scaled)
+        gradient[-2] = 0.5 * np.sum(W * K_signal)
+        gradient[-1] = 0.5 * noise * np.trace(W)
+        return value, gradient
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> 'GaussianProcess':
+        self.X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.y_mean = y.mean()
+        self.y_scale = y.std() if len(y) > 1 and y.std() > 0 else 1.0
+        target = (y - self.y_mean) / self.y_scale
+
+        # Features the training points do not vary leave the likelihood
+        # unchanged: they keep a length scale of one doubling
+        varied = self.X.std(axis=0) > 0
+        dims = int(varied.sum())
+        bounds = [tuple(np.log(LENGTH_SCALE_BOUNDS))] * dims + [tuple(np.log(SIGNAL_BOUNDS)),
+                                                               tuple(np.log(NOISE_BOUNDS))]
+        starts = [np.r_[np.zeros(dims), 0.0, math.log(1e-2)]]
+        starts += [np.array([self.rng.uniform(low, high) for low, high in bounds]) for _ in range(RESTARTS - 1)]
+        sq_diffs = (self.X[:, None, varied] - self.X[None, :, varied]) ** 2
+        best = min((optimize.minimize(self._neg_log_likelihood, start, args=(sq_diffs, target),
+                                      jac=True, method='L-BFGS-B', bounds=bounds) for start in starts),
+                   key=lambda result: result.fun)
+        self.length_scales = np.ones(self.X.shape[1])
+        self.length_scales[varied] = np.exp(best.x[:-2])
+        self.signal, self.noise = np.exp(best.x[-2]), np.exp(best.x[-1])
+        K = self._kernel(self.X, self.X, self.length_scales, self.signal) + self.noise * np.eye(len(self.X))
+        self.chol = linalg.cho_factor(K, lower=True)
+        self.alpha = linalg.cho_solve(self.chol, target)
+        return self
+
+    def predict(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Posterior mean and standard deviation (of the noise-free function) at X."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        K_star = self._kernel(X, self.X, self.length_scales, self.signal)
+        mean = K_star @ self.alpha
+        v = linalg.solve_triangular(self.chol[0], K_star.T, lower=True)
+        variance = np.maximum(self.signal - np.einsum('ij,ij->j', v, v), 0.0)
+        return self.y_mean + self.y_scale * mean, self.y_scale * np.sqrt(variance)
+
+
+class IPCSurrogate:
+    """One Gaussian process per workload over log IPC."""
+
+    def __init__(self, seed: int = SEED):
+        self.seed = seed
+        self.models = {}
+
+    def fit(self, training: pd.DataFrame) -> 'IPCSurrogate':
+        """Fit from rows of design, workload, ipc and the FEATURE_NAMES columns."""
+        for workload, rows in training.groupby('workload'):
+            self.models[workload] = GaussianProcess(self.seed).fit(
+                rows[FEATURE_NAMES].to_numpy(), np.log(rows['ipc'].to_numpy()))
+        return self
+
+    @property
+    def workloads(self) -> List[str]:
+        return list(self.models)
+
+    def predict(self, features: np.ndarray, workloads: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean and standard deviation of log IPC, points x workloads."""
+        predictions = [self.models[workload].predict(features) for workload in workloads]
+        return (np.column_stack([mean for mean, _ in predictions]),
+                np.column_stack([std for _, std in predictions]))
+
+    def predict_geomean(self, features: np.ndarray, workloads: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mean and standard deviation of the log geometric mean IPC over
+        workloads (the mean of the per-workload predictions, whose errors
+        are taken as independent).
+        """
+        mean, std = self.predict(features, workloads)
+        return mean.mean(axis=1), np.sqrt((std ** 2).sum(axis=1)) / len(workloads)
+
+
+def load_training(catalog_path: Optional[Path] = None) -> pd.DataFrame:
+    """design, workload, ipc and the features of every full run in the results catalog."""
+    from results_catalog import CATALOG_FILE, ResultsCatalog
+    catalog = ResultsCatalog(catalog_path or CATALOG_FILE)
+    try:
+        rows = catalog.query(show=SIZE_PARAMS + ['fu_pool', 'ipc'])
+    finally:
+        catalog.close()
+    rows = [row for row in rows if row['mode'] == 'full' and row['workload'] in WORKLOADS
+            and row['ipc'] and all(row[name] is not None for name in SIZE_PARAMS + ['fu_pool'])]
+    if not rows:
+        return pd.DataFrame(columns=['design', 'workload', 'ipc'] + FEATURE_NAMES)
+    features = np.array([design_features(row) for row in rows])
+    training = pd.DataFrame(features, columns=FEATURE_NAMES)
+    training.insert(0, 'design', [row['design'] for row in rows])
+    training.insert(1, 'workload', [row['workload'] for row in rows])
+    training.insert(2, 'ipc', [float(row['ipc']) for row in rows])
+    return training
+
+
+def front_ipc(credits: np.ndarray, front_credits: np.ndarray, front_ipc_values: np.ndarray) -> np.ndarray:
+    """The best IPC the simulated designs reach for at most each of credits (0 below the cheapest)."""
+    order = np.argsort(front_credits, kind='stable')
+    best = np.maximum.accumulate(front_ipc_values[order])
+    index = np.searchsorted(front_credits[order], credits, side='right') - 1
+    return np.where(index >= 0, best[np.maximum(index, 0)], 0.0)
+
+
+def select_for_simulation(credits: np.ndarray, mean: np.ndarray, std: np.ndarray,
+                          simulated_credits: np.ndarray, simulated_ipc: np.ndarray,
+                          kappa: float = DEFAULT_KAPPA, band: float = DEFAULT_BAND,
+                          max_std: float = DEFAULT_MAX_STD, budget: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the candidate points worth simulating, most promising first.
+    A point (credits, predicted log IPC mean +- std) is kept if its
+    optimistic IPC, exp(mean + kappa * std), is within band of the best
+    IPC simulated for its credits or less, or if std exceeds max_std.
+    Ranked by optimistic IPC relative to that front, then by std.
+    """
+    optimistic = np.exp(mean + kappa * std)
+    front = front_ipc(credits, simulated_credits, simulated_ipc)
+    potential = np.where(front > 0, optimistic / np.where(front > 0, front, 1.0), np.inf)
+    keep = (potential >= 1.0 - band) | (std > max_std)
+    order = np.lexsort((-std, -potential))
+    selected = order[keep[order]]
+    return selected if budget is None else selected[:budget]
+
+
+def leave_one_out(training: pd.DataFrame, seed: int = SEED) -> pd.DataFrame:
+    """Per workload: error of predicting each design's IPC from the other designs."""
+    results = []
+    for workload, rows in training.groupby('workload'):
+        if rows['design'].nunique() < 3:
+            continue
+        errors, z_scores = [], []
+        for design in rows['design'].unique():
+            train, test = rows[rows['design'] != design], rows[rows['design'] == design]
+            model = GaussianProcess(seed).fit(train[FEATURE_NAMES].to_numpy(), np.log(train['ipc'].to_numpy()))
+            mean, std = model.predict(test[FEATURE_NAMES].to_numpy())
+            actual = np.log(test['ipc'].to_numpy())
+            errors.extend(np.abs(np.exp(mean - actual) - 1))
+            z_scores.extend(np.abs(mean - actual) / np.maximum(std, 1e-9))
+        results.append({'workload': workload, 'designs': rows['design'].nunique(),
+                        'mean_abs_error_pct': 100 * float(np.mean(errors)),
+                        'max_abs_error_pct': 100 * float(np.max(errors)),
+                        'within_2_std_pct': 100 * float(np.mean(np.array(z_scores) <= 2))})
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit and validate the Part 4 IPC surrogate model")
+    parser.add_argument('--catalog', default=None, help="results catalog (default: data/part4/catalog.sqlite)")
+    args = parser.parse_args()
+
+    training = load_training(Path(args.catalog) if args.catalog else None)
+    if training.empty:
+        print("✗ No full runs with IPC in the results catalog "
+              "(run scripts/results_catalog.py ingest, or the runner with --parse-on-complete)")
+        return
+    print(f"Training data: {len(training)} runs of {training['design'].nunique()} designs "
+          f"on {training['workload'].nunique()} workloads")
+
+    validation = leave_one_out(training)
+    if validation.empty:
+        print("✗ Leave-one-out validation needs at least 3 designs per workload")
+        return
+    print("\nLeave-one-design-out validation:")
+    print(f"  {'workload':<16} {'designs':>7} {'mean err':>9} {'max err':>9} {'within 2σ':>10}")
+    for row in validation.itertuples(index=False):
+        print(f"  {row.workload:<16} {row.designs:>7} {row.mean_abs_error_pct:>8.2f}% "
+              f"{row.max_abs_error_pct:>8.2f}% {row.within_2_std_pct:>9.0f}%")
+    print(f"\n✓ Mean error {validation['mean_abs_error_pct'].mean():.2f}% over "
+          f"{len(validation)} workloads")
+
+
+if __name__ == "__main__":
+    main()
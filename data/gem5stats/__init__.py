@@ -0,0 +1,31 @@
+"""
+gem5stats
+Shared gem5 stats.txt parsing for every analysis script
+
+One streaming parser (parser.py), explicit dump-selection policies
+(selection.py: roi, last, all, marker:N) and the stat name schemas of the
+Part 2 atomic and Part 4 O3 runs (schemas.py). Compressed outputs
+(stats.txt.gz/.zst) are read transparently (compression.py).
+data/parseStats.py and data/CSV/parse_data.py are front ends over it:
+
+  import gem5stats
+  roi = gem5stats.read_dump("data/part4/design_a/qsort/stats.txt", "roi")
+  every = gem5stats.read_dumps(path, "all")          # dump index -> stats
+  row = gem5stats.PART2_ATOMIC.read("data/part2/qsort/stats.txt")
+
+Scripts outside data/ put data/ on sys.path first.
+"""
+
+from . import compression
+from .compression import compress_file, open_text
+from .parser import (BEGIN_MARK, END_MARK, dump_lines, iter_lines, iter_stats, parse_lines,
+                     read_dump, read_dumps)
+from .schemas import PART2_ATOMIC, PART4_O3, SCHEMAS, Schema, detect_schema
+from .selection import POLICIES, ROI_DUMP, DumpSelection
+
+__all__ = [
+    'compression', 'compress_file', 'open_text',
+    'BEGIN_MARK', 'END_MARK', 'ROI_DUMP', 'POLICIES', 'DumpSelection',
+    'iter_lines', 'iter_stats', 'read_dump', 'read_dumps', 'dump_lines', 'parse_lines',
+    'Schema', 'SCHEMAS', 'PART2_ATOMIC', 'PART4_O3', 'detect_schema'
+]
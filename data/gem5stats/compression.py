@@ -0,0 +1,167 @@
+"""
+compression.py
+Transparent compressed storage of gem5 run outputs
+
+A run's stats.txt, config.ini/config.json and simulation.log can be
+stored compressed next to where the raw file would be (stats.txt.gz or
+stats.txt.zst). Readers ask for the raw name: resolve() finds whichever
+variant exists and open_text() streams it through the matching
+decompressor, so parsers read line by line without inflating whole files
+in memory or on disk.
+
+gzip is always available; zstd needs the zstandard package (optional:
+without it, .zst files cannot be read or written).
+"""
+
+import gzip
+import io
+import os
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Compressed variants, in the order resolve() looks for them
+SUFFIXES = {
+    "zstd": ".zst",
+    "gzip": ".gz"
+}
+
+# Compression levels used when compressing run outputs
+LEVELS = {
+    "zstd": 10,
+    "gzip": 6
+}
+
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def available_codecs():
+    """Codecs that can be written here (zstd only with zstandard installed)."""
+    return [codec for codec in SUFFIXES if codec != "zstd" or zstandard is not None]
+
+
+def codec_of(path: Path) -> Optional[str]:
+    """The codec a file name says it is compressed with, or None."""
+    for codec, suffix in SUFFIXES.items():
+        if str(path).endswith(suffix):
+            return codec
+    return None
+
+
+def resolve(path: Path) -> Path:
+    """
+    path if it exists, otherwise its existing compressed variant, otherwise
+    path itself (so callers can still test .exists() on the result).
+    """
+    path = Path(path)
+    if path.exists() or codec_of(path) is not None:
+        return path
+    for suffix in SUFFIXES.values():
+        candidate = path.with_name(path.name + suffix)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def raw_path(path: Path) -> Path:
+    """path without its compression suffix."""
+    path = Path(path)
+    codec = codec_of(path)
+    return path if codec is None else path.with_name(path.name[:-len(SUFFIXES[codec])])
+
+
+def variants(path: Path) -> List[Path]:
+    """The raw file and every compressed variant of path (existing or not)."""
+    path = raw_path(path)
+    return [path] + [path.with_name(path.name + suffix) for suffix in SUFFIXES.values()]
+
+
+def glob(root: Path, pattern: str) -> List[Path]:
+    """
+    Path.glob for raw file names that also matches their compressed
+    variants, one resolved path per file, sorted by raw path.
+    """
+    found = set()
+    for suffix in [""] + list(SUFFIXES.values()):
+        found.update(raw_path(path) for path in Path(root).glob(pattern + suffix))
+    return [resolve(path) for path in sorted(found)]
+
+
+def exists(path: Path) -> bool:
+    """Whether path or a compressed variant of it exists."""
+    return resolve(path).exists()
+
+
+def open_binary(path: Path):
+    """Decompressed binary stream of path (or of its compressed variant)."""
+    path = resolve(path)
+    codec = codec_of(path)
+    if codec == "gzip":
+        return gzip.open(path, 'rb')
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError(f"reading {path} needs the zstandard package")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def open_text(path: Path, errors: Optional[str] = None) -> TextIO:
+    """Decompressed text stream of path (or of its compressed variant)."""
+    path = resolve(path)
+    if codec_of(path) is None:
+        return open(path, 'r', errors=errors)
+    return io.TextIOWrapper(open_binary(path), errors=errors)
+
+
+def read_text(path: Path, errors: Optional[str] = None) -> str:
+    """Whole decompressed content of path (or of its compressed variant)."""
+    with open_text(path, errors=errors) as f:
+        return f.read()
+
+
+def compress_file(path: Path, codec: str = "gzip", level: Optional[int] = None) -> Path:
+    """
+    Replace path by path + the codec's suffix, streaming in chunks. The
+    compressed file is written under a temporary name and renamed into
+    place before the original is removed, so one of the two always exists.
+    Returns the compressed file.
+    """
+    path = Path(path)
+    if codec not in SUFFIXES:
+        raise ValueError(f"unknown codec {codec!r} (expected one of {', '.join(SUFFIXES)})")
+    level = LEVELS[codec] if level is None else level
+    target = path.with_name(path.name + SUFFIXES[codec])
+    tmp_file = target.with_name(f".{target.name}.tmp")
+
+    with open(path, 'rb') as source, open(tmp_file, 'wb') as raw:
+        if codec == "gzip":
+            # mtime=0 keeps the output identical for identical input
+            with gzip.GzipFile(filename=path.name, mode='wb', fileobj=raw,
+                               compresslevel=level, mtime=0) as out:
+                for chunk in iter(lambda: source.read(COPY_CHUNK_BYTES), b''):
+                    out.write(chunk)
+        else:
+            if zstandard is None:
+                raise ImportError("zstd compression needs the zstandard package")
+            zstandard.ZstdCompressor(level=level).copy_stream(source, raw)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_file, target)
+    path.unlink()
+    return target
+
+
+def compress_outputs(output_dir: Path, names, codec: str = "gzip",
+                     level: Optional[int] = None) -> int:
+    """compress_file() each of names present uncompressed in output_dir. Returns bytes saved."""
+    saved = 0
+    for name in names:
+        path = Path(output_dir) / name
+        if path.exists():
+            size = path.stat().st_size
+            saved += size - compress_file(path, codec, level).stat().st_size
+    return saved
@@ -0,0 +1,181 @@
+"""
+parser.py
+Streaming parser for gem5 stats.txt files
+
+stats.txt files are streamed line by line: each value is parsed once,
+only the stats asked for are converted when a names filter is given, and
+reading stops as soon as the last dump the selection needs ends. Only
+complete lines and complete dumps are used, so files of runs still in
+progress can be read (or followed, like tail -f) as gem5 writes them.
+Compressed files (stats.txt.gz, stats.txt.zst) are decompressed on the
+fly when the raw stats.txt is asked for; see compression.py.
+"""
+
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .compression import open_text
+from .selection import DumpSelection
+
+# Lines delimiting each stat dump in stats.txt
+BEGIN_MARK = "---------- Begin Simulation Statistics ----------"
+END_MARK = "---------- End Simulation Statistics"
+
+
+def iter_lines(stats_file_path: Path, last_dump: Optional[int] = None, follow: bool = False,
+               poll_seconds: float = 1.0, timeout: Optional[float] = None) -> Iterator[Tuple[int, str]]:
+    """
+    Stream a stats.txt file, yielding (dump_index, line) for every complete
+    line inside a dump, dumps numbered from 0. Stops once dump last_dump
+    ends.
+
+    Without follow, iteration stops at the end of what has been written;
+    with follow, it waits (polling every poll_seconds, for at most timeout
+    seconds) for the rest.
+
+    The generator's return value is the number of complete dumps read.
+    """
+    dump_index = -1
+    in_dump = False
+    complete_dumps = 0
+    pending = ""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with open_text(stats_file_path) as f:
+        while True:
+            line = f.readline()
+            if not line.endswith("\n"):
+                # End of the file so far; keep any half-written line
+                pending += line
+                if not follow or (deadline is not None and time.monotonic() >= deadline):
+                    return complete_dumps
+                time.sleep(poll_seconds)
+                continue
+            if pending:
+                line, pending = pending + line, ""
+
+            if line.startswith(BEGIN_MARK):
+                dump_index += 1
+                in_dump = True
+            elif line.startswith(END_MARK):
+                in_dump = False
+                complete_dumps += 1
+                if last_dump is not None and dump_index >= last_dump:
+                    return complete_dumps
+            elif in_dump:
+                yield dump_index, line
+
+
+def iter_stats(stats_file_path: Path, last_dump: Optional[int] = None, follow: bool = False,
+               poll_seconds: float = 1.0, timeout: Optional[float] = None,
+               names: Optional[Iterable[str]] = None) -> Iterator[Tuple[int, str, float]]:
+    """
+    Stream a stats.txt file, yielding (dump_index, name, value) for every
+    numeric stat (only those in names if given), dumps numbered from 0.
+    Stops once dump last_dump ends; see iter_lines for follow.
+
+    The generator's return value is the number of complete dumps read.
+    """
+    wanted = None if names is None else frozenset(names)
+    dump_index = -1
+    in_dump = False
+    complete_dumps = 0
+    pending = ""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    # Same loop as iter_lines, inlined: this is the hot path of every parse
+    with open_text(stats_file_path) as f:
+        while True:
+            line = f.readline()
+            if not line.endswith("\n"):
+                pending += line
+                if not follow or (deadline is not None and time.monotonic() >= deadline):
+                    return complete_dumps
+                time.sleep(poll_seconds)
+                continue
+            if pending:
+                line, pending = pending + line, ""
+
+            if line.startswith(BEGIN_MARK):
+                dump_index += 1
+                in_dump = True
+            elif line.startswith(END_MARK):
+                in_dump = False
+                complete_dumps += 1
+                if last_dump is not None and dump_index >= last_dump:
+                    return complete_dumps
+            elif in_dump:
+                # name, value, rest of the line (unit and description)
+                parts = line.split(None, 2)
+                if len(parts) >= 2 and (wanted is None or parts[0] in wanted):
+                    try:
+                        yield dump_index, parts[0], float(parts[1])
+                    except ValueError:
+                        pass
+
+
+def read_dumps(stats_file_path: Path, selection: Union[str, int, DumpSelection] = 'all',
+               names: Optional[Iterable[str]] = None, **stream_options) -> Dict[int, Dict[str, float]]:
+    """
+    The selected complete dumps of a stats.txt file, as dump index ->
+    (stat name -> value), in dump order. names limits the stats parsed.
+    Raises OSError if the file cannot be read.
+    """
+    selection = DumpSelection.parse(selection)
+    last_dump = selection.stop_after()
+    dumps = []
+    stream = iter_stats(stats_file_path, last_dump=last_dump, names=names, **stream_options)
+    while True:
+        try:
+            dump_index, name, value = next(stream)
+        except StopIteration as stop:
+            complete_dumps = stop.value
+            break
+        while len(dumps) <= dump_index:
+            dumps.append({})
+        dumps[dump_index][name] = value
+    # Dumps without any wanted stat were never created
+    while len(dumps) < complete_dumps:
+        dumps.append({})
+    return {index: dumps[index] for index in selection.select(complete_dumps)}
+
+
+def read_dump(stats_file_path: Path, selection: Union[str, int, DumpSelection] = 'roi',
+              names: Optional[Iterable[str]] = None, **stream_options) -> Optional[Dict[str, float]]:
+    """
+    One selected dump (the first, for multi-dump selections) as stat name
+    -> value, or None if the file has no such complete dump.
+    """
+    dumps = read_dumps(stats_file_path, selection, names, **stream_options)
+    return next(iter(dumps.values()), None)
+
+
+def dump_lines(stats_file_path: Path, selection: Union[str, int, DumpSelection] = 'roi') -> Dict[int, List[str]]:
+    """The raw lines of the selected complete dumps, as dump index -> lines."""
+    selection = DumpSelection.parse(selection)
+    dumps = []
+    stream = iter_lines(stats_file_path, last_dump=selection.stop_after())
+    while True:
+        try:
+            dump_index, line = next(stream)
+        except StopIteration as stop:
+            complete_dumps = stop.value
+            break
+        while len(dumps) <= dump_index:
+            dumps.append([])
+        dumps[dump_index].append(line)
+    while len(dumps) < complete_dumps:
+        dumps.append([])
+    return {index: dumps[index] for index in selection.select(complete_dumps)}
+
+
+def parse_lines(lines: Iterable[str]) -> Dict[str, float]:
+    """Stat name -> value for the lines of one dump (non-numeric values skipped)."""
+    stats = {}
+    for line in lines:
+        parts = line.split(None, 2)
+        if len(parts) >= 2 and not parts[0].startswith(('#', '-')):
+            try:
+                stats[parts[0]] = float(parts[1])
+            except ValueError:
+                pass
+    return stats
@@ -0,0 +1,144 @@
+"""
+schemas.py
+Stat name schemas of the assignment's CPU models
+
+The same quantity has different stat names depending on the CPU model:
+Part 2 runs the atomic CPU, whose commit stats are under
+system.cpu.commitStats0, while Part 4's O3 CPU also has the commit stage
+stats under system.cpu.commit. A Schema maps short column names to stat
+paths for one model; detect_schema() tells the models apart by stats only
+the O3 CPU has.
+"""
+
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from .parser import read_dump
+from .selection import DumpSelection
+
+
+class Schema:
+    """Short names -> stat paths for one CPU model's stats.txt."""
+
+    def __init__(self, name: str, stats: "OrderedDict[str, str]", selection: str = 'roi'):
+        self.name = name
+        self.stats = stats
+        self.selection = DumpSelection.parse(selection)
+
+    def paths(self):
+        """Every stat path of the schema, in column order."""
+        return list(self.stats.values())
+
+    def extract(self, stats: Dict[str, float]) -> "OrderedDict[str, Optional[float]]":
+        """Short name -> value of one parsed dump (None where it lacks the stat)."""
+        return OrderedDict((short, stats.get(path)) for short, path in self.stats.items())
+
+    def read(self, stats_file_path, selection=None) -> Optional["OrderedDict[str, Optional[float]]"]:
+        """extract() of one dump of a stats file (default: the schema's selection)."""
+        dump = read_dump(stats_file_path, selection if selection is not None else self.selection,
+                         names=self.paths())
+        return None if dump is None else self.extract(dump)
+
+    def __repr__(self):
+        return f"Schema({self.name!r}, {len(self.stats)} stats)"
+
+
+# Part 2: AtomicSimpleCPU characterization (data/p2Stats.txt)
+PART2_ATOMIC = Schema('part2_atomic', OrderedDict([
+    # Fetch stats
+    ("fetch_numInsts",      "system.cpu.fetchStats0.numInsts"),
+    ("fetch_numOps",        "system.cpu.fetchStats0.numOps"),
+    ("fetch_numBranches",   "system.cpu.fetchStats0.numBranches"),
+
+    # Execute stats
+    ("exec_numIntAluAcc",   "system.cpu.executeStats0.numIntAluAccesses"),
+    ("exec_numFpAluAcc",    "system.cpu.executeStats0.numFpAluAccesses"),
+
+    # Commit stats
+    ("commit_numInsts",     "system.cpu.commitStats0.numInsts"),
+    ("commit_numIntInsts",  "system.cpu.commitStats0.numIntInsts"),
+    ("commit_numFpInsts",   "system.cpu.commitStats0.numFpInsts"),
+    ("commit_numLoads",     "system.cpu.commitStats0.numLoadInsts"),
+    ("commit_numStores",    "system.cpu.commitStats0.numStoreInsts"),
+    ("commit_numBranches",  "system.cpu.commitStats0.committedControl::IsControl"),
+]))
+
+# Part 4: O3CPU design comparison (data/CSV/part4_metrics.csv raw stats)
+PART4_O3 = Schema('part4_o3', OrderedDict([
+    # 1. Core Performance Metrics
+    ('simSeconds', 'simSeconds'),
+    ('simTicks', 'simTicks'),
+    ('simInsts', 'simInsts'),  # Total instructions simulated
+    ('simOps', 'simOps'),  # Total ops (including micro-ops)
+    ('numCycles', 'system.cpu.numCycles'),
+    ('ipc', 'system.cpu.ipc'),
+    ('cpi', 'system.cpu.cpi'),
+
+    # 2. Pipeline Utilization
+    ('instsIssued', 'system.cpu.instsIssued'),
+    ('instsAdded', 'system.cpu.instsAdded'),
+    ('numIssuedDist_mean', 'system.cpu.numIssuedDist::mean'),
+    ('numIssuedDist_0', 'system.cpu.numIssuedDist::0'),
+    ('numIssuedDist_1', 'system.cpu.numIssuedDist::1'),
+    ('numIssuedDist_2', 'system.cpu.numIssuedDist::2'),
+    ('numIssuedDist_total', 'system.cpu.numIssuedDist::total'),
+
+    # 3. Commit Stage Stats
+    ('commitSquashedInsts', 'system.cpu.commit.commitSquashedInsts'),
+    ('branchMispredicts', 'system.cpu.commit.branchMispredicts'),
+    ('numCommittedDist_mean', 'system.cpu.commit.numCommittedDist::mean'),
+    ('numCommittedDist_0', 'system.cpu.commit.numCommittedDist::0'),
+    ('numCommittedDist_1', 'system.cpu.commit.numCommittedDist::1'),
+    ('numCommittedDist_2', 'system.cpu.commit.numCommittedDist::2'),
+
+    # 4. Speculation Stats
+    ('squashedInstsIssued', 'system.cpu.squashedInstsIssued'),
+    ('squashedInstsExamined', 'system.cpu.squashedInstsExamined'),
+
+    # 5. Functional Unit Busy Rates
+    ('fuBusy_IntAlu', 'system.cpu.statFuBusy::IntAlu'),
+    ('fuBusy_IntMult', 'system.cpu.statFuBusy::IntMult'),
+    ('fuBusy_IntDiv', 'system.cpu.statFuBusy::IntDiv'),
+    ('fuBusy_FloatAdd', 'system.cpu.statFuBusy::FloatAdd'),
+    ('fuBusy_FloatMult', 'system.cpu.statFuBusy::FloatMult'),
+    ('fuBusy_FloatDiv', 'system.cpu.statFuBusy::FloatDiv'),
+    ('fuBusy_MemRead', 'system.cpu.statFuBusy::MemRead'),
+    ('fuBusy_MemWrite', 'system.cpu.statFuBusy::MemWrite'),
+    ('fuBusy_SimdAlu', 'system.cpu.statFuBusy::SimdAlu'),
+    ('fuBusy_SimdCvt', 'system.cpu.statFuBusy::SimdCvt'),
+    ('fuBusy_SimdMisc', 'system.cpu.statFuBusy::SimdMisc'),
+
+    # 6. L1 Instruction Cache Performance
+    ('l1i_hits', 'system.cpu.l1i.demandHits::total'),
+    ('l1i_misses', 'system.cpu.l1i.demandMisses::total'),
+    ('l1i_miss_rate', 'system.cpu.l1i.demandMissRate::total'),
+    ('l1i_accesses', 'system.cpu.l1i.demandAccesses::total'),
+
+    # 7. L1 Data Cache Performance
+    ('l1d_hits', 'system.cpu.l1d.demandHits::total'),
+    ('l1d_misses', 'system.cpu.l1d.demandMisses::total'),
+    ('l1d_miss_rate', 'system.cpu.l1d.demandMissRate::total'),
+    ('l1d_accesses', 'system.cpu.l1d.demandAccesses::total'),
+    ('l1d_avg_miss_latency', 'system.cpu.l1d.demandAvgMissLatency::total'),
+
+    # 8. Instruction Type Breakdown (from commit stage)
+    ('committed_IntAlu', 'system.cpu.commit.committedInstType_0::IntAlu'),
+    ('committed_IntMult', 'system.cpu.commit.committedInstType_0::IntMult'),
+    ('committed_IntDiv', 'system.cpu.commit.committedInstType_0::IntDiv'),
+    ('committed_FloatAdd', 'system.cpu.commit.committedInstType_0::FloatAdd'),
+    ('committed_MemRead', 'system.cpu.commit.committedInstType_0::MemRead'),
+    ('committed_MemWrite', 'system.cpu.commit.committedInstType_0::MemWrite'),
+]))
+
+SCHEMAS = {schema.name: schema for schema in (PART2_ATOMIC, PART4_O3)}
+
+# Stats only the O3 CPU reports
+O3_ONLY_STATS = ('system.cpu.numIssuedDist::mean', 'system.cpu.commit.commitSquashedInsts')
+
+
+def detect_schema(stat_names: Iterable[str]) -> Schema:
+    """PART4_O3 if the parsed stat names include O3-only stats, else PART2_ATOMIC."""
+    names = stat_names if isinstance(stat_names, (set, frozenset, dict)) else set(stat_names)
+    if any(name in names for name in O3_ONLY_STATS):
+        return PART4_O3
+    return PART2_ATOMIC
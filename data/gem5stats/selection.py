@@ -0,0 +1,75 @@
+"""
+selection.py
+Which dumps of a stats.txt file to read
+
+A stats.txt holds one dump per m5 stats dump, each opened by a
+"Begin Simulation Statistics" marker. The workloads call
+m5_dump_reset_stats() around their region of interest, so a run has an
+initialization dump, the ROI dump and the exit dump. Policies:
+
+  roi       the ROI dump (marker 1), or the only dump of a one-dump file
+  last      the last complete dump
+  all       every complete dump
+  marker:N  the dump opened by the Nth Begin marker (from 0; negative
+            counts back from the last complete dump)
+
+Policies that only need the first dumps tell the parser where it may
+stop reading (stop_after), so the exit dump is never tokenized for roi.
+"""
+
+from typing import List, Optional, Union
+
+# Index of the ROI dump (after the initialization dump)
+ROI_DUMP = 1
+
+POLICIES = ['roi', 'last', 'all', 'marker:N']
+
+
+class DumpSelection:
+    """A parsed dump-selection policy."""
+
+    def __init__(self, policy: str, marker: Optional[int] = None):
+        self.policy = policy
+        self.marker = marker
+
+    @classmethod
+    def parse(cls, spec: Union[str, int, "DumpSelection"]) -> "DumpSelection":
+        """roi, last, all, marker:N, or a dump index."""
+        if isinstance(spec, DumpSelection):
+            return spec
+        if isinstance(spec, int):
+            return cls('marker', spec)
+        spec = spec.strip().lower()
+        if spec in ('roi', 'last', 'all'):
+            return cls(spec)
+        if spec.startswith('marker:'):
+            spec = spec[len('marker:'):]
+        try:
+            return cls('marker', int(spec))
+        except ValueError:
+            raise ValueError(f"unknown dump selection {spec!r} (expected one of {', '.join(POLICIES)})")
+
+    def stop_after(self) -> Optional[int]:
+        """The last dump index this policy can need, or None if it needs the whole file."""
+        if self.policy == 'roi':
+            return ROI_DUMP
+        if self.policy == 'marker' and self.marker >= 0:
+            return self.marker
+        return None
+
+    def select(self, complete_dumps: int) -> List[int]:
+        """Indices of the selected dumps, given how many complete dumps were read."""
+        if self.policy == 'all':
+            return list(range(complete_dumps))
+        if self.policy == 'last':
+            return [complete_dumps - 1] if complete_dumps else []
+        if self.policy == 'roi':
+            if complete_dumps > ROI_DUMP:
+                return [ROI_DUMP]
+            # Runs without ROI markers have a single dump
+            return [0] if complete_dumps == 1 else []
+        index = self.marker if self.marker >= 0 else complete_dumps + self.marker
+        return [index] if 0 <= index < complete_dumps else []
+
+    def __repr__(self):
+        return f"marker:{self.marker}" if self.policy == 'marker' else self.policy
@@ -5,6 +5,10 @@ import m5
 from m5.objects import *
 
 import argparse
+import json
+import os
+import re
+import shutil
 
 
 CSC368H1_DIR = '/root/CSC368-simulate-out-of-order-processors'
@@ -35,11 +39,69 @@ parser.add_argument('--lq_entries', type=int, default=4)
 parser.add_argument('--sq_entries', type=int, default=4)
 
 # options are: basic, extended, aggressive
-parser.add_argument('--fu_pool', type=str, default='basic')
+parser.add_argument('--fu_pool', type=str, default='basic',
+                    choices=['basic', 'extended', 'aggressive'])
+
+# Periodic checkpoints (0 disables), so a failed run can be restarted
+# from the latest one instead of from tick 0
+parser.add_argument('--checkpoint_ticks', type=int, default=0)
+parser.add_argument('--checkpoint_insts', type=int, default=0)
+parser.add_argument('--checkpoint_keep', type=int, default=2)
+parser.add_argument('--checkpoint_dir', type=str, default=None)
+parser.add_argument('--restore_from', type=str, default=None)
+
+# SimPoint sampling (see scripts/simpoint.py):
+# 1. --simpoint_profile: collect basic block vectors (simpoint.bb.gz)
+# 2. --simpoint_checkpoints FILE: checkpoint the start (minus warmup) of
+#    each representative interval listed in FILE (simpoints.json)
+# 3. --restore_simpoint DIR: restore one of those checkpoints, warm up,
+#    then measure one interval in detail
+parser.add_argument('--simpoint_profile', action='store_true')
+parser.add_argument('--simpoint_checkpoints', type=str, default=None)
+parser.add_argument('--restore_simpoint', type=str, default=None)
+parser.add_argument('--simpoint_interval', type=int, default=10_000_000)
+parser.add_argument('--simpoint_warmup', type=int, default=0)
+
+# SMARTS sampling (--smarts_period 0 disables): every --smarts_period
+# instructions, fast-forward on an atomic CPU (which keeps the caches warm),
+# then switch to the O3 core for --smarts_warmup instructions of detailed
+# warmup and a measured window of --smarts_window instructions
+parser.add_argument('--smarts_period', type=int, default=0)
+parser.add_argument('--smarts_warmup', type=int, default=2000)
+parser.add_argument('--smarts_window', type=int, default=1000)
+
+# Truncated runs: dump stats every --converge_interval committed
+# instructions and stop after --max_insts (0: no limit) or, with
+# --converge, once the rate of the last --converge_window intervals is
+# within --converge_tol (relative spread) of their mean
+parser.add_argument('--max_insts', type=int, default=0)
+parser.add_argument('--converge', action='store_true')
+parser.add_argument('--converge_interval', type=int, default=10_000_000)
+parser.add_argument('--converge_window', type=int, default=5)
+parser.add_argument('--converge_tol', type=float, default=0.02)
+
+# Periodic stat dumps for phase analysis (0 disables): dump and reset stats
+# every --stat_period_ticks ticks or every --stat_period_insts committed
+# instructions, on top of the workload's own dumps. stat_periods.json
+# records when they happen
+parser.add_argument('--stat_period_ticks', type=int, default=0)
+parser.add_argument('--stat_period_insts', type=int, default=0)
 
 ## Parse command-line arguments
 args = parser.parse_args()
 
+## Modes that only run the program functionally, on an atomic CPU
+FUNCTIONAL_MODE = args.simpoint_profile or args.simpoint_checkpoints is not None
+
+## Modes that switch between an atomic CPU and the O3 core
+SAMPLING_MODE = args.smarts_period > 0
+
+## Modes that may stop before the program exits
+TRUNCATED_MODE = args.max_insts > 0 or args.converge
+
+## Modes that dump stats periodically for the whole run
+PERIODIC_MODE = args.stat_period_ticks > 0 or args.stat_period_insts > 0
+
 
 ##############################################################################
 # MIBench workloads
@@ -284,76 +346,96 @@ system.system_port = system.membus.cpu_side_ports
 ##############################################################################
 # CPU
 ##############################################################################
-system.cpu = X86O3CPU(
-    cacheStorePorts=1,
-    cacheLoadPorts=2,   # EDIT: Fixed on November 13th, 8:36 AM (was 1)
-    fetchBufferSize=args.fetch_buffer_size,
-    fetchQueueSize=args.fetch_queue_size,
-    fetchWidth=args.fetch_width,
-    decodeWidth=args.decode_width,
-    renameWidth=args.rename_width,
-    dispatchWidth=args.dispatch_width,
-    issueWidth=args.issue_width,
-    commitWidth=args.commit_width,
-    numIQEntries=args.num_iq_entries,
-    numROBEntries=args.num_rob_entries,
-    LQEntries=args.lq_entries,
-    SQEntries=args.sq_entries
-)
+if FUNCTIONAL_MODE:
+    ## SimPoint profiling and checkpointing only need the functional
+    ## behaviour of the program, so they run on the much faster atomic CPU
+    system.mem_mode = 'atomic'
+    system.cpu = X86AtomicSimpleCPU()
+    if args.simpoint_profile:
+        system.cpu.addSimPointProbe(args.simpoint_interval)
+else:
+    system.cpu = X86O3CPU(
+        cacheStorePorts=1,
+        cacheLoadPorts=2,   # EDIT: Fixed on November 13th, 8:36 AM (was 1)
+        fetchBufferSize=args.fetch_buffer_size,
+        fetchQueueSize=args.fetch_queue_size,
+        fetchWidth=args.fetch_width,
+        decodeWidth=args.decode_width,
+        renameWidth=args.rename_width,
+        dispatchWidth=args.dispatch_width,
+        issueWidth=args.issue_width,
+        commitWidth=args.commit_width,
+        numIQEntries=args.num_iq_entries,
+        numROBEntries=args.num_rob_entries,
+        LQEntries=args.lq_entries,
+        SQEntries=args.sq_entries
+    )
+
+## The CPU that starts running owns the cache and interrupt connections;
+## in sampling modes that is an atomic CPU, and the O3 core (still
+## system.cpu, so its stats keep their names) takes them over when switched in
+if SAMPLING_MODE:
+    system.mem_mode = 'atomic'
+    system.cpu.switched_out = True
+    system.atomic_cpu = X86AtomicSimpleCPU()
+    front_cpu = system.atomic_cpu
+else:
+    front_cpu = system.cpu
 
 ## This is needed when we use x86 CPUs
-system.cpu.createInterruptController()
-system.cpu.interrupts[0].pio = system.membus.mem_side_ports
-system.cpu.interrupts[0].int_requestor = system.membus.cpu_side_ports
-system.cpu.interrupts[0].int_responder = system.membus.mem_side_ports
-
-if args.fu_pool == 'basic':
-    system.cpu.fuPool = FUPool(
-        FUList = [
-            IntALU(count=1),
-            IntMultDiv(count=1),
-            FP_ALU(count=1),
-            FP_MultDiv(count=1),
-            SIMD_Unit(count=1),
-            ReadPort(count=1),
-            WritePort(count=1),
-            ]
-        )
-elif args.fu_pool == 'extended':
-     system.cpu.fuPool = FUPool(
-        FUList = [
-            IntALU(count=2),
-            IntMultDiv(count=1),
-            FP_ALU(count=2),
-            FP_MultDiv(count=1),
-            SIMD_Unit(count=1),
-            ReadPort(count=2),
-            WritePort(count=2),
-            ]
-        )   
-elif args.fu_pool == 'aggressive':
-     system.cpu.fuPool = FUPool(
-        FUList = [
-            IntALU(count=4),
-            IntMultDiv(count=2),
-            FP_ALU(count=4),
-            FP_MultDiv(count=2),
-            SIMD_Unit(count=2),
-            ReadPort(count=4),
-            WritePort(count=4),
-            ]
-        )
+front_cpu.createInterruptController()
+front_cpu.interrupts[0].pio = system.membus.mem_side_ports
+front_cpu.interrupts[0].int_requestor = system.membus.cpu_side_ports
+front_cpu.interrupts[0].int_responder = system.membus.mem_side_ports
+
+if not FUNCTIONAL_MODE:
+    if args.fu_pool == 'basic':
+        system.cpu.fuPool = FUPool(
+            FUList = [
+                IntALU(count=1),
+                IntMultDiv(count=1),
+                FP_ALU(count=1),
+                FP_MultDiv(count=1),
+                SIMD_Unit(count=1),
+                ReadPort(count=1),
+                WritePort(count=1),
+                ]
+            )
+    elif args.fu_pool == 'extended':
+         system.cpu.fuPool = FUPool(
+            FUList = [
+                IntALU(count=2),
+                IntMultDiv(count=1),
+                FP_ALU(count=2),
+                FP_MultDiv(count=1),
+                SIMD_Unit(count=1),
+                ReadPort(count=2),
+                WritePort(count=2),
+                ]
+            )   
+    elif args.fu_pool == 'aggressive':
+         system.cpu.fuPool = FUPool(
+            FUList = [
+                IntALU(count=4),
+                IntMultDiv(count=2),
+                FP_ALU(count=4),
+                FP_MultDiv(count=2),
+                SIMD_Unit(count=2),
+                ReadPort(count=4),
+                WritePort(count=4),
+                ]
+            )
 
 ##############################################################################
 # Cache
 ##############################################################################
 system.cpu.l1i = InstructionCache()
 system.cpu.l1i.mem_side = system.membus.cpu_side_ports
-system.cpu.l1i.cpu_side = system.cpu.icache_port
+system.cpu.l1i.cpu_side = front_cpu.icache_port
 
 system.cpu.l1d = DataCache()
 system.cpu.l1d.mem_side = system.membus.cpu_side_ports
-system.cpu.l1d.cpu_side = system.cpu.dcache_port
+system.cpu.l1d.cpu_side = front_cpu.dcache_port
 
 # NOTE: Changing this will change the block_size of your caches, assuming you
 #   don't override them above (we recommend just using the parameter below)
@@ -378,13 +460,229 @@ process = MIBenchWorkloads[args.benchmark]
 system.workload = SEWorkload.init_compatible(process.executable)
 system.cpu.workload = process
 system.cpu.createThreads()
+if SAMPLING_MODE:
+    system.atomic_cpu.workload = process
+    system.atomic_cpu.createThreads()
 
 ##############################################################################
 # Start the simulation
 ##############################################################################
 root = Root(full_system=False, system=system) # must assign a root
 
-m5.instantiate() # must be called before m5.simulate
-m5.simulate()
-
-print('End of simulation')
+CHECKPOINT_CAUSE = 'checkpoint instruction interval'
+SIMPOINT_START_CAUSE = 'simpoint starting point found'
+SIMPOINT_WARMUP_CAUSE = 'simpoint warmup done'
+SIMPOINT_INTERVAL_CAUSE = 'simpoint interval done'
+SMARTS_CAUSE = 'smarts phase done'
+INTERVAL_CAUSE = 'stat interval done'
+PERIOD_CAUSE = 'stat period done'
+checkpoint_dir = args.checkpoint_dir or os.path.join(args.out_dir, 'checkpoints')
+
+## SimPoint checkpoints: the CPU stops at each representative interval's
+## start (minus its warmup); a start at instruction 0 is checkpointed
+## before simulating at all
+simpoints = []
+if args.simpoint_checkpoints:
+    with open(args.simpoint_checkpoints, 'r') as f:
+        simpoints = sorted(json.load(f)['simpoints'], key=lambda sp: sp['start_insts'])
+    system.cpu.simpoint_start_insts = [sp['start_insts'] for sp in simpoints if sp['start_insts'] > 0]
+
+## must be called before m5.simulate
+if args.restore_from or args.restore_simpoint:
+    print(f'Restoring from checkpoint {args.restore_from or args.restore_simpoint}')
+    m5.instantiate(args.restore_from or args.restore_simpoint)
+else:
+    m5.instantiate()
+
+
+def take_checkpoint():
+    """
+    Write cpt.<tick> (via a temporary name, so a run killed mid-write never
+    leaves a partial checkpoint behind) and keep only the newest
+    --checkpoint_keep checkpoints.
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    name = f'cpt.{m5.curTick()}'
+    tmp_dir = os.path.join(checkpoint_dir, f'.{name}.tmp')
+    m5.checkpoint(tmp_dir)
+    os.replace(tmp_dir, os.path.join(checkpoint_dir, name))
+    print(f'Checkpoint {name} written')
+
+    ticks = sorted(int(m.group(1)) for m in
+                   (re.match(r'cpt\.(\d+)$', d) for d in os.listdir(checkpoint_dir)) if m)
+    for tick in ticks[:-args.checkpoint_keep]:
+        shutil.rmtree(os.path.join(checkpoint_dir, f'cpt.{tick}'))
+
+
+def take_simpoint_checkpoint(simpoint):
+    """Write cpt.simpoint_<id> for one representative interval."""
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    name = f'cpt.simpoint_{simpoint["id"]:02d}'
+    tmp_dir = os.path.join(checkpoint_dir, f'.{name}.tmp')
+    m5.checkpoint(tmp_dir)
+    shutil.rmtree(os.path.join(checkpoint_dir, name), ignore_errors=True)
+    os.replace(tmp_dir, os.path.join(checkpoint_dir, name))
+    print(f'Checkpoint {name} written @ instruction {simpoint["start_insts"]}')
+
+
+if args.simpoint_checkpoints:
+    cause = 'all simpoint checkpoints taken'
+    for simpoint in simpoints:
+        if simpoint['start_insts'] > 0:
+            exit_event = m5.simulate()
+            if exit_event.getCause() != SIMPOINT_START_CAUSE:
+                cause = exit_event.getCause()
+                break
+        take_simpoint_checkpoint(simpoint)
+
+elif args.restore_simpoint:
+    ## Warm up caches and predictors in detail, then measure one interval.
+    ## simpoint_window.json records where the measurement starts so the
+    ## parser can ignore dumps made during warmup.
+    if args.simpoint_warmup:
+        system.cpu.scheduleInstStop(0, args.simpoint_warmup, SIMPOINT_WARMUP_CAUSE)
+        cause = m5.simulate().getCause()
+    else:
+        cause = SIMPOINT_WARMUP_CAUSE
+    window = {'checkpoint': args.restore_simpoint, 'warmup_insts': args.simpoint_warmup,
+              'interval_insts': args.simpoint_interval, 'start_tick': m5.curTick()}
+    if cause == SIMPOINT_WARMUP_CAUSE:
+        m5.stats.reset()
+        system.cpu.scheduleInstStop(0, args.simpoint_interval, SIMPOINT_INTERVAL_CAUSE)
+        cause = m5.simulate().getCause()
+        if cause == SIMPOINT_INTERVAL_CAUSE:
+            ## Reset so gem5's exit dump does not repeat the interval
+            m5.stats.dump()
+            m5.stats.reset()
+    window.update({'end_tick': m5.curTick(), 'cause': cause})
+    with open(os.path.join(args.out_dir, 'simpoint_window.json'), 'w') as f:
+        json.dump(window, f, indent=2)
+
+elif SAMPLING_MODE:
+    ## Each period: fast-forward, then detailed warmup and measurement on
+    ## the O3 core. Stats are reset after the warmup and dumped after the
+    ## window; smarts_windows.json records each window's ticks so the
+    ## parser can tell them apart from the workload's own stat dumps.
+    fast_forward = args.smarts_period - args.smarts_warmup - args.smarts_window
+    windows = []
+
+    def run_insts(cpu, insts):
+        """Simulate insts instructions on cpu; False if the program ended first."""
+        global cause
+        if insts <= 0:
+            return True
+        cpu.scheduleInstStop(0, insts, SMARTS_CAUSE)
+        cause = m5.simulate().getCause()
+        return cause == SMARTS_CAUSE
+
+    while run_insts(system.atomic_cpu, fast_forward):
+        m5.switchCpus(system, [(system.atomic_cpu, system.cpu)])
+        if not run_insts(system.cpu, args.smarts_warmup):
+            break
+        m5.stats.reset()
+        start_tick = m5.curTick()
+        if not run_insts(system.cpu, args.smarts_window):
+            break
+        m5.stats.dump()
+        windows.append({'start_tick': start_tick, 'end_tick': m5.curTick()})
+        with open(os.path.join(args.out_dir, 'smarts_windows.json'), 'w') as f:
+            json.dump({'period_insts': args.smarts_period, 'warmup_insts': args.smarts_warmup,
+                       'window_insts': args.smarts_window, 'windows': windows}, f, indent=2)
+        m5.switchCpus(system, [(system.cpu, system.atomic_cpu)])
+    print(f'Measured {len(windows)} SMARTS windows')
+
+elif TRUNCATED_MODE:
+    ## Dump (and reset) stats every interval; convergence.json records each
+    ## interval's ticks so the parser can rebuild the ROI from the dumps
+    ## and extrapolate it. Instructions per tick stands in for IPC (the
+    ## clock is fixed), so no stats need to be read back here.
+    intervals = []
+    stop_reason = None
+    executed = 0
+
+    def write_convergence():
+        with open(os.path.join(args.out_dir, 'convergence.json'), 'w') as f:
+            json.dump({'interval_insts': args.converge_interval, 'window': args.converge_window,
+                       'tolerance': args.converge_tol, 'max_insts': args.max_insts,
+                       'converge': args.converge, 'stop_reason': stop_reason,
+                       'intervals': intervals}, f, indent=2)
+
+    while stop_reason is None:
+        insts = args.converge_interval
+        if args.max_insts:
+            insts = min(insts, args.max_insts - executed)
+        start_tick = m5.curTick()
+        system.cpu.scheduleInstStop(0, insts, INTERVAL_CAUSE)
+        cause = m5.simulate().getCause()
+        if cause != INTERVAL_CAUSE:
+            stop_reason = 'program exited'
+            break
+        m5.stats.dump()
+        m5.stats.reset()
+        executed += insts
+        intervals.append({'start_tick': start_tick, 'end_tick': m5.curTick(), 'insts': insts})
+
+        rates = [i['insts'] / (i['end_tick'] - i['start_tick'])
+                 for i in intervals[-args.converge_window:]]
+        if (args.converge and len(rates) == args.converge_window
+                and (max(rates) - min(rates)) <= args.converge_tol * sum(rates) / len(rates)):
+            stop_reason = 'converged'
+        elif args.max_insts and executed >= args.max_insts:
+            stop_reason = 'max_insts'
+        write_convergence()
+
+    write_convergence()
+    if stop_reason != 'program exited':
+        cause = f'{stop_reason} after {executed} instructions'
+
+elif PERIODIC_MODE:
+    ## Every period ends with a dump and a reset, so each dump covers one
+    ## period (or the part of it after a workload dump). periodicStatDump
+    ## is not used: its dumps do not reset stats, so they would hold the
+    ## counts since the last reset. stat_periods.json lists the ticks of
+    ## the periodic dumps so the parser can tell them from the workload's
+    ## own, which bound its ROI.
+    periods = {'period_ticks': args.stat_period_ticks, 'period_insts': args.stat_period_insts,
+               'dump_ticks': []}
+
+    def write_periods():
+        with open(os.path.join(args.out_dir, 'stat_periods.json'), 'w') as f:
+            json.dump(periods, f, indent=2)
+
+    while True:
+        if args.stat_period_ticks:
+            cause = m5.simulate(args.stat_period_ticks).getCause()
+            if cause != 'simulate() limit reached':
+                break
+        else:
+            system.cpu.scheduleInstStop(0, args.stat_period_insts, PERIOD_CAUSE)
+            cause = m5.simulate().getCause()
+            if cause != PERIOD_CAUSE:
+                break
+        m5.stats.dump()
+        m5.stats.reset()
+        periods['dump_ticks'].append(m5.curTick())
+        write_periods()
+    write_periods()
+
+else:
+    if args.checkpoint_insts:
+        system.cpu.scheduleInstStop(0, args.checkpoint_insts, CHECKPOINT_CAUSE)
+
+    while True:
+        if args.checkpoint_ticks:
+            exit_event = m5.simulate(args.checkpoint_ticks)
+        else:
+            exit_event = m5.simulate()
+        cause = exit_event.getCause()
+
+        if cause == 'simulate() limit reached' and args.checkpoint_ticks:
+            take_checkpoint()
+        elif cause == CHECKPOINT_CAUSE:
+            take_checkpoint()
+            system.cpu.scheduleInstStop(0, args.checkpoint_insts, CHECKPOINT_CAUSE)
+        else:
+            break
+
+print(f'Exiting @ tick {m5.curTick()} because {cause}')
+print('End of simulation')
\ No newline at end of file
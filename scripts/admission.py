@@ -0,0 +1,212 @@
+"""
+admission.py
+Memory- and core-aware admission control for gem5 simulations
+
+Instead of a fixed number of parallel simulations, the runner asks an
+AdmissionController before starting each gem5 process. A job is admitted
+only if a core is free and its expected memory footprint fits in what the
+host has left, after setting aside a reserve and the memory that already
+running simulations are still expected to grow into.
+
+Per-workload footprints are learned from past runs:
+1. Peak RSS measured by the runner (os.wait4) and saved to footprints.json
+2. hostMemory from previous stats.txt files. On our gem5 build this is the
+   process VmSize in KiB, which includes the 8 GiB of simulated memory that
+   gem5 reserves but never touches, so that reservation is subtracted.
+3. DEFAULT_FOOTPRINT_BYTES
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+# The shared stats parser (and its compressed-file readers) lives in data/gem5stats
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+from gem5stats import compression
+
+
+GIB = 1024 ** 3
+
+# Footprint assumed for a workload with no history at all
+DEFAULT_FOOTPRINT_BYTES = 1 * GIB
+
+# Simulated memory size reserved (but not resident) by a3_part4.py
+SIMULATED_MEMORY_BYTES = 8 * GIB
+
+# Headroom applied to footprints derived from hostMemory
+HOST_MEMORY_HEADROOM = 1.5
+
+# Smallest footprint we will ever assume for a gem5 process
+MIN_FOOTPRINT_BYTES = 256 * 1024 ** 2
+
+# Memory kept free for the OS and the coordinator: the larger of these two
+RESERVE_BYTES = 1 * GIB
+RESERVE_FRACTION = 0.05
+
+
+def read_meminfo(path="/proc/meminfo"):
+    """Return /proc/meminfo as a dict of field -> bytes."""
+    info = {}
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2:
+                    value = int(parts[1])
+                    if len(parts) >= 3 and parts[2] == "kB":
+                        value *= 1024
+                    info[parts[0].rstrip(':')] = value
+    except OSError:
+        pass
+    return info
+
+
+def available_cores():
+    """Number of cores this process may run on (respects taskset/cgroups)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _proc_status_bytes(pid, field):
+    """Read a kB field from /proc/<pid>/status as bytes (0 if the process is gone)."""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_rss(pid):
+    """Current resident set size of a process in bytes (0 if it is gone)."""
+    return _proc_status_bytes(pid, "VmRSS:")
+
+
+def process_peak_rss(pid):
+    """Peak resident set size of a running process in bytes (0 if it is gone)."""
+    return _proc_status_bytes(pid, "VmHWM:")
+
+
+def footprint_from_host_memory(host_memory_kib):
+    """Estimate resident memory from a stats.txt hostMemory value (VmSize, KiB)."""
+    resident = host_memory_kib * 1024 - SIMULATED_MEMORY_BYTES
+    return max(MIN_FOOTPRINT_BYTES, int(resident * HOST_MEMORY_HEADROOM))
+
+
+def load_footprints(data_dir, footprints_file):
+    """
+    Learn a per-workload memory footprint (bytes) from past runs.
+    Measured peak RSS takes precedence over hostMemory from stats.txt.
+    """
+    footprints = {}
+
+    for stats_file in compression.glob(data_dir, "*/*/stats.txt"):
+        workload = stats_file.parent.name
+        peak = 0
+        try:
+            with compression.open_text(stats_file) as f:
+                for line in f:
+                    if line.startswith("hostMemory"):
+                        peak = max(peak, int(float(line.split()[1])))
+        except (OSError, ValueError, IndexError):
+            continue
+        if peak:
+            estimate = footprint_from_host_memory(peak)
+            footprints[workload] = max(footprints.get(workload, 0), estimate)
+
+    if Path(footprints_file).exists():
+        try:
+            with open(footprints_file, 'r') as f:
+                footprints.update(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    return footprints
+
+
+class AdmissionController:
+    """Decides when another gem5 process can start without over-committing."""
+
+    def __init__(self, footprints, max_slots=None, reserve_bytes=None):
+        self.footprints = dict(footprints)
+        self.measured = {}
+        self.max_slots = max_slots or available_cores()
+
+        meminfo = read_meminfo()
+        if reserve_bytes is None:
+            reserve_bytes = max(RESERVE_BYTES, int(meminfo.get("MemTotal", 0) * RESERVE_FRACTION))
+        self.reserve_bytes = reserve_bytes
+
+    def footprint(self, workload):
+        return self.footprints.get(workload, DEFAULT_FOOTPRINT_BYTES)
+
+    def free_memory(self):
+        """Memory available for new simulations, after the reserve."""
+        return read_meminfo().get("MemAvailable", 0) - self.reserve_bytes
+
+    def admit(self, pending, running):
+        """
+        Pick jobs from pending (already in priority order) that can start now.
+
+        running maps job name -> job dict; jobs whose gem5 process has
+        started carry a 'pid'. Their remaining growth (footprint minus
+        current RSS) is treated as already committed. Jobs that do not fit
+        are skipped so smaller ones behind them can backfill. If nothing is
+        running, the first pending job is always admitted so the sweep
+        makes progress even on a host smaller than one footprint.
+        """
+        admitted = []
+        slots = self.max_slots - len(running)
+        if slots <= 0 or not pending:
+            return admitted
+
+        committed = 0
+        for job in running.values():
+            rss = process_rss(job['pid']) if 'pid' in job else 0
+            committed += max(0, self.footprint(job['workload']) - rss)
+        budget = self.free_memory() - committed
+
+        for job in pending:
+            if len(admitted) >= slots:
+                break
+            need = self.footprint(job['workload'])
+            if need <= budget or (not running and not admitted):
+                admitted.append(job)
+                budget -= need
+        return admitted
+
+    def record(self, workload, peak_rss_bytes):
+        """Learn from a finished run's measured peak RSS."""
+        if peak_rss_bytes:
+            self.measured[workload] = max(self.measured.get(workload, 0), peak_rss_bytes)
+            self.footprints[workload] = self.measured[workload]
+
+    def save(self, footprints_file):
+        """Merge measured peaks into footprints.json."""
+        saved = {}
+        if Path(footprints_file).exists():
+            try:
+                with open(footprints_file, 'r') as f:
+                    saved = json.load(f)
+            except (OSError, ValueError):
+                pass
+        for workload, peak in self.measured.items():
+            saved[workload] = max(saved.get(workload, 0), peak)
+
+        tmp_file = Path(footprints_file).with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(saved, f, indent=2)
+        os.replace(tmp_file, footprints_file)
+
+    def concurrency_estimate(self, workloads):
+        """How many of these workloads could run at once on this host right now."""
+        if not workloads:
+            return 1
+        largest = max(self.footprint(w) for w in workloads)
+        by_memory = max(1, self.free_memory() // largest)
+        return int(max(1, min(self.max_slots, by_memory, len(workloads))))
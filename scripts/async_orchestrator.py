@@ -0,0 +1,177 @@
+"""
+async_orchestrator.py
+asyncio engine for running gem5 simulations
+
+The multiprocessing engine in run_part4_sim.py keeps a whole Python worker
+process per slot whose only job is to block on gem5. This engine runs every
+gem5 process as a direct child of a single coordinator, started with
+asyncio.create_subprocess_exec, so the only per-simulation cost is gem5
+itself. It supports:
+- A concurrency semaphore (hard cap on running children) on top of the
+  memory/core checks of the AdmissionController
+- Per-job timeouts (the child is terminated, then killed)
+- Restarting failed or killed runs from their latest checkpoint
+- Cancellation: Ctrl-C or SIGTERM stops every running gem5 cleanly
+- Live progress through an on_poll callback
+"""
+
+import asyncio
+import signal
+import time
+from pathlib import Path
+
+from admission import process_peak_rss
+from checkpoints import finish_restored_run, prepare_restart
+from sweep_status import job_name
+
+
+# Time a child gets to exit after SIGTERM before it is SIGKILLed
+TERMINATE_GRACE_SECONDS = 10
+
+
+class AsyncOrchestrator:
+    """Runs simulation jobs as asyncio subprocesses from one coordinator."""
+
+    def __init__(self, admission, build_command, make_result, log_message,
+                 timeout=None, poll_seconds=5, on_start=None, on_complete=None, on_poll=None):
+        self.admission = admission
+        self.build_command = build_command
+        self.make_result = make_result
+        self.log_message = log_message
+        self.timeout = timeout
+        self.poll_seconds = poll_seconds
+        self.on_start = on_start
+        self.on_complete = on_complete
+        self.on_poll = on_poll
+        self.results = []
+
+    def run_sync(self, jobs):
+        """Run jobs to completion from synchronous code. Returns the results."""
+        return asyncio.run(self._main(jobs))
+
+    async def _main(self, jobs):
+        # asyncio.run turns Ctrl-C into cancellation; do the same for SIGTERM
+        main_task = asyncio.current_task()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+        return await self.run(jobs)
+
+    async def run(self, jobs):
+        """
+        Start jobs (in the given priority order) as the admission controller
+        allows, and wait for all of them. Cancelling this coroutine stops
+        every running simulation.
+        """
+        self.semaphore = asyncio.Semaphore(self.admission.max_slots)
+        self.wakeup = asyncio.Event()
+        pending = list(jobs)
+        running = {}
+        tasks = set()
+
+        try:
+            while pending or running:
+                for job in self.admission.admit(pending, running):
+                    pending.remove(job)
+                    running[job_name(job)] = job
+                    tasks.add(asyncio.create_task(self._run_job(job, running)))
+
+                # Sleep until a job finishes or it is time to re-check memory
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+
+                for job in running.values():
+                    if 'pid' in job:
+                        job['peak_rss_bytes'] = max(job.get('peak_rss_bytes', 0), process_peak_rss(job['pid']))
+                if self.on_poll:
+                    self.on_poll()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return self.results
+
+    async def _stop(self, process):
+        """Terminate a child, escalating to SIGKILL if it ignores SIGTERM."""
+        try:
+            process.terminate()
+            await asyncio.wait_for(process.wait(), TERMINATE_GRACE_SECONDS)
+        except ProcessLookupError:
+            pass
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def _run_job(self, job, running):
+        name = job_name(job)
+        output_dir = Path(job['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        log_file = output_dir / "simulation.log"
+
+        async with self.semaphore:
+            self.log_message(f"STARTING: {name}")
+            start_time = time.time()
+            try:
+                # A failed or killed run is restarted from its latest
+                # checkpoint, appending to the same log
+                log_mode = 'a' if job.get('restore_from') else 'w'
+                while True:
+                    with open(log_file, log_mode) as log:
+                        process = await asyncio.create_subprocess_exec(
+                            *self.build_command(job), stdout=log, stderr=log
+                        )
+                        job['pid'] = process.pid
+                        if self.on_start:
+                            self.on_start(name, start_time, process.pid)
+
+                        try:
+                            await asyncio.wait_for(process.wait(), self.timeout)
+                            timed_out = False
+                        except asyncio.TimeoutError:
+                            await self._stop(process)
+                            timed_out = True
+                        except asyncio.CancelledError:
+                            await self._stop(process)
+                            self.log_message(f"CANCELLED: {name}")
+                            raise
+
+                    if timed_out or process.returncode == 0:
+                        break
+                    tick = prepare_restart(job)
+                    if tick is None:
+                        break
+                    self.log_message(f"RESTARTING: {name} (returncode: {process.returncode}) "
+                                     f"from checkpoint at tick {tick}")
+                    log_mode = 'a'
+
+                elapsed_time = time.time() - start_time
+                peak_rss = job.get('peak_rss_bytes') or None
+                if timed_out:
+                    self.log_message(f"TIMED OUT: {name} after {elapsed_time:.1f}s")
+                    result = self.make_result(job, False, elapsed_time, process.returncode,
+                                              peak_rss_bytes=peak_rss,
+                                              error=f"timed out after {self.timeout}s")
+                elif process.returncode == 0:
+                    if job.get('restore_from'):
+                        finish_restored_run(job)
+                    self.log_message(f"COMPLETED: {name} in {elapsed_time:.1f}s")
+                    result = self.make_result(job, True, elapsed_time, 0, peak_rss_bytes=peak_rss)
+                else:
+                    self.log_message(f"FAILED: {name} (returncode: {process.returncode})")
+                    result = self.make_result(job, False, elapsed_time, process.returncode,
+                                              peak_rss_bytes=peak_rss)
+
+            except FileNotFoundError:
+                result = self.make_result(job, False, time.time() - start_time, -1,
+                                          error=f"gem5 executable not found at {job['gem5_exec']}")
+            except OSError as e:
+                result = self.make_result(job, False, time.time() - start_time, -1, error=str(e))
+
+        running.pop(name, None)
+        self.results.append(result)
+        if self.on_complete:
+            self.on_complete(result, job)
+        self.wakeup.set()
+        return result
@@ -38,7 +38,7 @@ ssh -p $SSH_PORT ${VM_USER}@${VM_HOST} "tail -10 ~/CSC368-simulate-out-of-order-
 
 echo ""
 echo -e "${BLUE}=== Stats Files Created ===${NC}"
-ssh -p $SSH_PORT ${VM_USER}@${VM_HOST} "find ~/CSC368-simulate-out-of-order-processors/data/part4 -name 'stats.txt' 2>/dev/null | wc -l | xargs echo 'Stats files:' || echo '0'"
+ssh -p $SSH_PORT ${VM_USER}@${VM_HOST} "find ~/CSC368-simulate-out-of-order-processors/data/part4 \\( -name 'stats.txt' -o -name 'stats.txt.gz' -o -name 'stats.txt.zst' \\) 2>/dev/null | wc -l | xargs echo 'Stats files:' || echo '0'"
 
 echo ""
 echo -e "${GREEN}To view full log:${NC}"
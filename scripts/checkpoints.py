@@ -0,0 +1,202 @@
+"""
+checkpoints.py
+Restarting failed gem5 runs from their latest checkpoint
+
+With --checkpoint-ticks or --checkpoint-insts, a3_part4.py writes
+m5.checkpoint snapshots to <output_dir>/checkpoints/cpt.<tick>, keeping
+only the newest few. When a run fails or is killed, the runner restarts it
+with --restore_from the latest checkpoint instead of from tick 0.
+
+gem5 does not checkpoint statistics, so a restored run's stats.txt only
+covers the ticks after the checkpoint. Before each restart the failed
+attempt's stats.txt is set aside; once the restored run finishes, the dumps
+earlier attempts completed before the checkpoint tick are put back in
+front of the restored run's dumps, so stats.txt keeps its init/ROI/exit
+layout. If the checkpoint fell inside the ROI, the ROI dump only covers the
+part after the checkpoint; restore.json records every restore, and
+restored_inside_roi() tells such runs apart from uninterrupted ones so the
+parsers do not report them as full runs.
+"""
+
+import json
+import re
+import shutil
+import sys
+from pathlib import Path
+
+# The shared stats parser (and its compressed-file readers) lives in data/gem5stats
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+from gem5stats import compression, read_dumps
+
+
+CHECKPOINT_DIRNAME = "checkpoints"
+CHECKPOINT_PATTERN = re.compile(r"^cpt\.(\d+)$")
+RESTORE_FILENAME = "restore.json"
+ATTEMPT_STATS_GLOB = "stats.attempt*.txt"
+
+BEGIN_MARK = "---------- Begin Simulation Statistics ----------"
+END_MARK = "---------- End Simulation Statistics   ----------"
+
+
+def list_checkpoints(output_dir):
+    """Completed checkpoints of a run as [(tick, path)], oldest first."""
+    checkpoint_dir = Path(output_dir) / CHECKPOINT_DIRNAME
+    if not checkpoint_dir.is_dir():
+        return []
+    checkpoints = []
+    for path in checkpoint_dir.iterdir():
+        match = CHECKPOINT_PATTERN.match(path.name)
+        if match and path.is_dir():
+            checkpoints.append((int(match.group(1)), path))
+    return sorted(checkpoints)
+
+
+def latest_checkpoint(output_dir):
+    """(tick, path) of the newest completed checkpoint, or None."""
+    checkpoints = list_checkpoints(output_dir)
+    return checkpoints[-1] if checkpoints else None
+
+
+def remove_checkpoints(output_dir):
+    """Delete a run's checkpoints once they are no longer needed."""
+    shutil.rmtree(Path(output_dir) / CHECKPOINT_DIRNAME, ignore_errors=True)
+
+
+def clear_restart_state(output_dir):
+    """
+    Before a run starts from tick 0, drop checkpoints and restore records
+    left by an earlier run in the same directory, so a later failure never
+    restores someone else's checkpoint.
+    """
+    output_dir = Path(output_dir)
+    remove_checkpoints(output_dir)
+    (output_dir / RESTORE_FILENAME).unlink(missing_ok=True)
+    for attempt_file in output_dir.glob(ATTEMPT_STATS_GLOB):
+        attempt_file.unlink()
+
+
+def checkpoint_args(job):
+    """Extra a3_part4.py arguments for a job's checkpoint settings."""
+    args = []
+    if job.get('checkpoint_ticks'):
+        args += ["--checkpoint_ticks", str(job['checkpoint_ticks'])]
+    if job.get('checkpoint_insts'):
+        args += ["--checkpoint_insts", str(job['checkpoint_insts'])]
+    if job.get('checkpoint_ticks') or job.get('checkpoint_insts'):
+        args += ["--checkpoint_keep", str(job.get('checkpoint_keep', 2))]
+    if job.get('restore_from'):
+        args += ["--restore_from", job['restore_from']]
+    return args
+
+
+def restore_latest(job):
+    """
+    Point job['restore_from'] at the run's latest checkpoint and set the
+    interrupted attempt's stats.txt aside. Returns the checkpoint tick, or
+    None if the run has no checkpoint.
+    """
+    checkpoint = latest_checkpoint(job['output_dir'])
+    if checkpoint is None:
+        return None
+
+    tick, path = checkpoint
+    job['restarts'] = job.get('restarts', 0) + 1
+    stats_file = Path(job['output_dir']) / "stats.txt"
+    if stats_file.exists():
+        stats_file.replace(stats_file.with_name(f"stats.attempt{job['restarts']}.txt"))
+    job['restore_from'] = str(path)
+    job['restore_tick'] = tick
+    return tick
+
+
+def prepare_restart(job):
+    """
+    Decide whether a failed or killed attempt can be restarted from a
+    checkpoint; if so, set it up with restore_latest and return the
+    checkpoint tick, otherwise return None. Callers do not restart
+    timed-out runs.
+    """
+    if job.get('restarts', 0) >= job.get('max_restarts', 0):
+        return None
+    return restore_latest(job)
+
+
+def split_dumps(text):
+    """Split stats.txt content into complete dumps (marker lines included)."""
+    dumps = []
+    start = text.find(BEGIN_MARK)
+    while start != -1:
+        end = text.find(END_MARK, start)
+        if end == -1:
+            break
+        end += len(END_MARK)
+        dumps.append(text[start:end])
+        start = text.find(BEGIN_MARK, end)
+    return dumps
+
+
+def dump_final_tick(dump):
+    """The finalTick of one dump (ticks since tick 0, preserved across restores)."""
+    match = re.search(r"^finalTick\s+(\d+)", dump, re.MULTILINE)
+    return int(match.group(1)) if match else None
+
+
+def finish_restored_run(job):
+    """
+    After a restored run succeeds, rebuild stats.txt from the dumps earlier
+    attempts completed before the checkpoint plus the restored run's own
+    dumps, and record the restore in restore.json.
+    """
+    output_dir = Path(job['output_dir'])
+    stats_file = output_dir / "stats.txt"
+    tick = job['restore_tick']
+
+    # A run may have been restarted more than once; take each pre-checkpoint
+    # dump from whichever attempt wrote it
+    earlier = {}
+    attempt_files = sorted(output_dir.glob(ATTEMPT_STATS_GLOB))
+    for attempt_file in attempt_files:
+        for dump in split_dumps(attempt_file.read_text()):
+            final_tick = dump_final_tick(dump)
+            if final_tick is not None and final_tick <= tick:
+                earlier.setdefault(final_tick, dump)
+    earlier = [earlier[t] for t in sorted(earlier)]
+    restored = split_dumps(stats_file.read_text()) if stats_file.exists() else []
+
+    # Same layout gem5 writes: each dump preceded by a blank line
+    tmp_file = stats_file.with_suffix(".tmp")
+    with open(tmp_file, 'w') as f:
+        for dump in earlier + restored:
+            f.write("\n" + dump + "\n")
+    tmp_file.replace(stats_file)
+    for attempt_file in attempt_files:
+        attempt_file.unlink()
+
+    restore_file = output_dir / RESTORE_FILENAME
+    history = json.loads(restore_file.read_text()) if restore_file.exists() else []
+    history.append({
+        "checkpoint": Path(job['restore_from']).name,
+        "tick": tick,
+        "attempt": job['restarts'],
+        "dumps_kept_from_earlier_attempts": len(earlier)
+    })
+    restore_file.write_text(json.dumps(history, indent=2))
+
+
+def restored_inside_roi(output_dir):
+    """
+    True if restore.json records a restore strictly inside the run's ROI
+    (between its first two complete dumps, or before the only one), so
+    the ROI dump only covers the part after the checkpoint.
+    """
+    output_dir = Path(output_dir)
+    restore_file = output_dir / RESTORE_FILENAME
+    stats_file = compression.resolve(output_dir / "stats.txt")
+    if not restore_file.exists() or not stats_file.exists():
+        return False
+    ticks = [entry["tick"] for entry in json.loads(restore_file.read_text())]
+    bounds = [dump["finalTick"] for dump in read_dumps(stats_file, 'all', names=["finalTick"]).values()
+              if "finalTick" in dump][:2]
+    if len(bounds) == 1:
+        bounds = [0] + bounds
+    return len(bounds) == 2 and any(bounds[0] < tick < bounds[1] for tick in ticks)
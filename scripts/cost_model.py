@@ -0,0 +1,81 @@
+"""
+cost_model.py
+Credit cost of a Part 4 processor design, computed from its parameters
+
+A design's credits are the sum of what each of its structures costs:
+- pipeline width: credits per unit of width, per stage
+- buffers and queues (fetch buffer, fetch queue, IQ, ROB, LQ, SQ):
+  credits per entry (per byte for the fetch buffer)
+- the FU pool: credits per functional unit and memory port, over the
+  pool's composition (FU_POOLS mirrors the pools a3_part4.py builds)
+
+The Part 4 model's rates reproduce the assignment's costs of designs A-D
+(820/960/900/1000 credits), and give every sweep point a cost on the same
+scale. Other models can be registered in COST_MODELS and picked by name:
+
+  from cost_model import design_credits
+  design_credits(params)                   # the default model
+  design_credits(params, "my_model")
+"""
+
+
+# Functional units of each --fu_pool option of a3_part4.py
+FU_POOLS = {
+    "basic": {"IntALU": 1, "IntMultDiv": 1, "FP_ALU": 1, "FP_MultDiv": 1, "SIMD_Unit": 1,
+              "ReadPort": 1, "WritePort": 1},
+    "extended": {"IntALU": 2, "IntMultDiv": 1, "FP_ALU": 2, "FP_MultDiv": 1, "SIMD_Unit": 1,
+                 "ReadPort": 2, "WritePort": 2},
+    "aggressive": {"IntALU": 4, "IntMultDiv": 2, "FP_ALU": 4, "FP_MultDiv": 2, "SIMD_Unit": 2,
+                   "ReadPort": 4, "WritePort": 4}
+}
+
+WIDTH_PARAMS = ["fetch_width", "decode_width", "rename_width", "dispatch_width", "issue_width", "commit_width"]
+
+
+class CostModel:
+    """Credits as a linear function of a design's widths, entries and functional units."""
+
+    def __init__(self, name, width_credits, entry_credits, unit_credits):
+        self.name = name
+        self.width_credits = width_credits      # per unit of width, per stage
+        self.entry_credits = entry_credits      # parameter -> credits per entry
+        self.unit_credits = unit_credits        # functional unit -> credits each
+
+    def breakdown(self, params):
+        """Credits of each part of the design (widths, each buffer, the FU pool)."""
+        costs = {"widths": self.width_credits * sum(params[name] for name in WIDTH_PARAMS)}
+        for name, credits in self.entry_credits.items():
+            costs[name] = credits * params[name]
+        pool = FU_POOLS[params["fu_pool"]]
+        costs["fu_pool"] = sum(self.unit_credits[unit] * count for unit, count in pool.items())
+        return costs
+
+    def credits(self, params):
+        """Total credits of a design, rounded to a whole credit."""
+        return round(sum(self.breakdown(params).values()))
+
+
+PART4_COST_MODEL = CostModel(
+    "part4",
+    width_credits=25,
+    entry_credits={
+        "fetch_buffer_size": 1 / 8,
+        "fetch_queue_size": 1,
+        "num_iq_entries": 3,
+        "num_rob_entries": 35 / 16,
+        "lq_entries": 5,
+        "sq_entries": 5
+    },
+    unit_credits={"IntALU": 15, "IntMultDiv": 30, "FP_ALU": 15, "FP_MultDiv": 30, "SIMD_Unit": 20,
+                  "ReadPort": 10, "WritePort": 10}
+)
+
+COST_MODELS = {model.name: model for model in [PART4_COST_MODEL]}
+DEFAULT_COST_MODEL = "part4"
+
+
+def design_credits(params, model=DEFAULT_COST_MODEL):
+    """Credits of a design's params under a cost model (by name or instance)."""
+    if isinstance(model, str):
+        model = COST_MODELS[model]
+    return model.credits(params)
@@ -0,0 +1,66 @@
+"""
+designs.py
+The Part 4 processor designs
+
+Shared by the runner (run_part4_sim.py passes each design's params to
+a3_part4.py) and the analysis code (data/CSV/parse_data.py reads the
+credit cost and configuration each run was simulated with from here).
+Credit costs are computed from each design's parameters (see
+cost_model.py). Sweeps over many more design points are declared as specs
+instead (see sweep.py).
+"""
+
+from cost_model import design_credits
+
+
+# Parameters every design shares
+FIXED_PARAMS = {
+    "fetch_width": 2,
+    "decode_width": 2,
+    "rename_width": 2,
+    "dispatch_width": 2,
+    "issue_width": 2,
+    "commit_width": 2,
+    "fetch_buffer_size": 64,
+    "fetch_queue_size": 16,
+    "num_iq_entries": 32
+}
+
+
+def design(name, params):
+    """A design's configuration: its parameters, credit cost, and name with the cost."""
+    credits = design_credits(params)
+    return {"name": f"{name} ({credits} credits)", "credits": credits, "params": params}
+
+
+# Processor Configurations
+PROCESSOR_CONFIGS = {
+    "design_a": design("Design A - Conservative", {
+        **FIXED_PARAMS,
+        "fu_pool": "extended",
+        "num_rob_entries": 64,
+        "lq_entries": 8,
+        "sq_entries": 8
+    }),
+    "design_b": design("Design B - ROB-Focused", {
+        **FIXED_PARAMS,
+        "fu_pool": "extended",
+        "num_rob_entries": 128,  # DOUBLED from Design A
+        "lq_entries": 8,
+        "sq_entries": 8
+    }),
+    "design_c": design("Design C - LSQ-Focused", {
+        **FIXED_PARAMS,
+        "fu_pool": "extended",
+        "num_rob_entries": 64,
+        "lq_entries": 16,  # DOUBLED from Design A
+        "sq_entries": 16   # DOUBLED from Design A
+    }),
+    "design_d": design("Design D - FU-Focused", {
+        **FIXED_PARAMS,
+        "fu_pool": "aggressive",  # UPGRADED from Extended
+        "num_rob_entries": 64,
+        "lq_entries": 8,
+        "sq_entries": 8
+    })
+}
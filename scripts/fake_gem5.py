@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+fake_gem5.py
+Stand-in for gem5.opt to exercise the runner without simulating anything
+
+Run the sweep with: python3 scripts/run_part4_sim.py --gem5 scripts/fake_gem5.py
+
+Accepts the same command line as gem5.opt a3_part4.py and replays a
+recorded stats.txt into the output directory, writing each dump once the
+simulated clock passes its finalTick.
+The clock advances in --checkpoint_ticks steps, writing and rotating
+cpt.<tick> directories like a3_part4.py does, and --restore_from continues
+from a checkpoint's tick.
+
+SimPoint modes are mimicked too: --simpoint_profile writes a synthetic
+simpoint.bb.gz, --simpoint_checkpoints creates the cpt.simpoint_<id>
+directories, and --restore_simpoint writes the recorded ROI dump as the
+measured interval, followed by an empty exit dump.
+With --smarts_period, the recorded dumps are interleaved with one dump per
+SMARTS window (CPI scattered around the recorded dump's) and
+smarts_windows.json lists the windows.
+With --max_insts/--converge, stats are dumped every --converge_interval
+instructions (the recorded dumps' rates spread evenly over their span)
+until the run converges, hits its budget or ends, as in convergence.json.
+With --stat_period_ticks/--stat_period_insts, stats are also dumped every
+period, the ROI split into a few synthetic phases of different IPC, L1D
+miss rate and squash rate, and stat_periods.json is written.
+The design options (ROB/IQ/LQ/SQ entries, issue width, FU pool) scale the
+recorded IPC by a synthetic, workload-dependent speedup over design_a, so
+design searches have something to rank; *_small inputs add a little
+per-design noise on top.
+
+Environment knobs:
+  FAKE_GEM5_STATS          recorded stats.txt to replay, or its compressed
+                           variant (default: data/part4/design_a/susan_corners)
+  FAKE_GEM5_SECONDS        wall-clock seconds a full run takes (default: 1)
+  FAKE_GEM5_CRASH_AT_TICK  abort (SIGABRT) once the clock passes this tick,
+                           unless restoring from a checkpoint
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from checkpoints import CHECKPOINT_DIRNAME, dump_final_tick, list_checkpoints, split_dumps
+from simpoint import synthetic_bbv, write_bbv
+
+# Recorded stats may have been compressed by the runner (see gem5stats.compression)
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+from gem5stats import compression
+
+
+DEFAULT_STATS = Path(__file__).parent.parent / "data" / "part4" / "design_a" / "susan_corners" / "stats.txt"
+
+# Design option -> (design_a's value, IPC gained per doubling as an exponent)
+DESIGN_SENSITIVITY = {
+    "num_rob_entries": (64, 0.06),
+    "num_iq_entries": (32, 0.04),
+    "lq_entries": (8, 0.03),
+    "sq_entries": (8, 0.02),
+    "issue_width": (2, 0.10)
+}
+FU_POOL_SPEEDUP = {"basic": 0.94, "extended": 1.0, "aggressive": 1.03}
+
+
+def set_stat(dump, name, value):
+    """Replace one stat's value in a dump's text."""
+    return re.sub(rf"^({re.escape(name)}\s+)\S+", lambda m: m.group(1) + str(value),
+                  dump, count=1, flags=re.MULTILINE)
+
+
+def dump_stat(dump, name):
+    """One stat's value from a dump's text."""
+    return float(re.search(rf"^{re.escape(name)}\s+(\S+)", dump, re.MULTILINE).group(1))
+
+
+def write_smarts_run(out_dir, dumps, args):
+    """
+    Write stats.txt as a SMARTS run would: the recorded dumps plus one
+    dump per measured window, each window's CPI scattered around that of
+    the recorded dump covering it.
+    """
+    rng = random.Random(sum(map(ord, args.benchmark)))
+    total_insts = sum(dump_stat(dump, "simInsts") for dump in dumps)
+    num_windows = max(1, min(500, int(total_insts // args.smarts_period)))
+    final_tick = dump_final_tick(dumps[-1])
+
+    entries = [(dump_final_tick(dump), dump) for dump in dumps]
+    windows = []
+    for i in range(num_windows):
+        start_tick = final_tick * (i + 1) // (num_windows + 1)
+        covering = next(dump for tick, dump in entries if tick >= start_tick)
+        cpi = dump_stat(covering, "system.cpu.numCycles") / dump_stat(covering, "simInsts")
+        cycles = int(args.smarts_window * cpi * max(0.2, rng.gauss(1.0, 0.1)))
+        end_tick = start_tick + cycles * 1000
+        window = covering
+        for name, value in (("finalTick", end_tick), ("simTicks", cycles * 1000),
+                            ("simInsts", args.smarts_window), ("system.cpu.numCycles", cycles)):
+            window = set_stat(window, name, value)
+        windows.append({"start_tick": start_tick, "end_tick": end_tick})
+        entries.append((end_tick, window))
+
+    with open(out_dir / "stats.txt", 'w') as stats:
+        for _, dump in sorted(entries, key=lambda entry: entry[0]):
+            stats.write("\n" + dump + "\n")
+    (out_dir / "smarts_windows.json").write_text(json.dumps({
+        "period_insts": args.smarts_period, "warmup_insts": args.smarts_warmup,
+        "window_insts": args.smarts_window, "windows": windows}, indent=2))
+
+
+def design_speedup(args):
+    """
+    Synthetic IPC speedup of the design on the command line over design_a.
+    Each workload weighs the options differently; *_small inputs add ~1%
+    noise per design.
+    """
+    workload = args.benchmark.removesuffix("_small")
+    rng = random.Random(sum(map(ord, workload)))
+    speedup = FU_POOL_SPEEDUP[args.fu_pool] ** rng.uniform(0.5, 1.5)
+    for name, (reference, sensitivity) in DESIGN_SENSITIVITY.items():
+        speedup *= (getattr(args, name) / reference) ** (sensitivity * rng.uniform(0.5, 1.5))
+    if args.benchmark.endswith("_small"):
+        speedup *= random.Random(f"{args.benchmark} {speedup}").gauss(1.0, 0.01)
+    return speedup
+
+
+def scale_ipc(dump, speedup):
+    """A dump with its cycles divided, and so its IPC multiplied, by speedup."""
+    if speedup == 1.0:
+        return dump
+    for name in ("system.cpu.numCycles", "system.cpu.cpi", "system.cpu.commitStats0.cpi"):
+        if re.search(rf"^{re.escape(name)}\s", dump, re.MULTILINE):
+            value = dump_stat(dump, name) / speedup
+            dump = set_stat(dump, name, int(value) if name.endswith("numCycles") else round(value, 6))
+    for name in ("system.cpu.ipc", "system.cpu.commitStats0.ipc"):
+        if re.search(rf"^{re.escape(name)}\s", dump, re.MULTILINE):
+            dump = set_stat(dump, name, round(dump_stat(dump, name) * speedup, 6))
+    return dump
+
+
+def partial_dump(dump, fraction, start_tick, end_tick):
+    """A recorded dump's counts scaled to the fraction of it in (start_tick, end_tick]."""
+    for name in ("simInsts", "system.cpu.numCycles", "system.cpu.commit.branchMispredicts",
+                 "system.cpu.commit.commitSquashedInsts",
+                 "system.cpu.l1d.overallAccesses::total", "system.cpu.l1d.overallMisses::total",
+                 "system.cpu.l1i.overallAccesses::total", "system.cpu.l1i.overallMisses::total"):
+        if re.search(rf"^{re.escape(name)}\s", dump, re.MULTILINE):
+            dump = set_stat(dump, name, int(dump_stat(dump, name) * fraction))
+    dump = set_stat(dump, "simTicks", end_tick - start_tick)
+    return set_stat(dump, "finalTick", end_tick)
+
+
+def instruction_spans(dumps):
+    """
+    (first_inst, last_inst, start_tick, end_tick, dump) of each recorded
+    dump, and a function mapping an instruction position to its tick
+    (linear within each recorded dump).
+    """
+    spans = []
+    start_tick, start_inst = 0, 0
+    for dump in dumps:
+        insts = dump_stat(dump, "simInsts")
+        spans.append((start_inst, start_inst + insts, start_tick, dump_final_tick(dump), dump))
+        start_tick, start_inst = dump_final_tick(dump), start_inst + insts
+
+    def tick_at(inst):
+        for first, last, t0, t1, _ in spans:
+            if inst <= last:
+                return t0 + int((t1 - t0) * (inst - first) / (last - first))
+        return spans[-1][3]
+    return spans, tick_at
+
+
+def stretch_dumps(spans, ends, stop_tick):
+    """One dump per stretch between consecutive dump ticks (stats reset at each)."""
+    previous = 0
+    written = []
+    for end in ends:
+        if end > stop_tick:
+            break
+        _, _, t0, t1, dump = next(span for span in spans if span[3] >= end)
+        fraction = (end - max(previous, t0)) / (t1 - t0) if t1 > t0 else 1.0
+        written.append(partial_dump(dump, fraction, previous, end))
+        previous = end
+    return written
+
+
+def write_truncated_run(out_dir, dumps, args):
+    """
+    Write stats.txt and convergence.json as a truncated run would, stopping
+    where a3_part4.py would. Returns the tick the run stopped at.
+    """
+    spans, tick_at = instruction_spans(dumps)
+    total_insts = spans[-1][1]
+
+    intervals = []
+    stop_reason = 'program exited'
+    executed = 0
+    while executed + args.converge_interval <= total_insts:
+        insts = args.converge_interval
+        if args.max_insts:
+            insts = min(insts, args.max_insts - executed)
+        intervals.append({'start_tick': tick_at(executed), 'end_tick': tick_at(executed + insts),
+                          'insts': insts})
+        executed += insts
+        rates = [i['insts'] / max(1, i['end_tick'] - i['start_tick'])
+                 for i in intervals[-args.converge_window:]]
+        if (args.converge and len(rates) == args.converge_window
+                and max(rates) - min(rates) <= args.converge_tol * sum(rates) / len(rates)):
+            stop_reason = 'converged'
+            break
+        if args.max_insts and executed >= args.max_insts:
+            stop_reason = 'max_insts'
+            break
+    stop_tick = intervals[-1]['end_tick'] if stop_reason != 'program exited' else spans[-1][3]
+
+    ends = sorted({i['end_tick'] for i in intervals} | {span[3] for span in spans})
+    with open(out_dir / "stats.txt", 'w') as stats:
+        for dump in stretch_dumps(spans, ends, stop_tick):
+            stats.write("\n" + dump + "\n")
+
+    (out_dir / "convergence.json").write_text(json.dumps({
+        'interval_insts': args.converge_interval, 'window': args.converge_window,
+        'tolerance': args.converge_tol, 'max_insts': args.max_insts, 'converge': args.converge,
+        'stop_reason': stop_reason, 'intervals': intervals}, indent=2))
+    return stop_tick
+
+
+# (IPC, L1D miss rate, squash rate) multipliers of the synthetic ROI phases
+# of a periodic run, each covering an equal share of the ROI
+PERIODIC_PHASES = [(1.0, 1.0, 1.0), (0.6, 2.5, 1.8), (1.3, 0.5, 0.7), (0.8, 1.5, 1.2)]
+
+
+def write_periodic_run(out_dir, dumps, args):
+    """
+    Write stats.txt and stat_periods.json as a run with periodic dumps
+    would: the recorded dumps split at every period, with the ROI's
+    periods scaled into PERIODIC_PHASES (plus a little noise).
+    """
+    rng = random.Random(sum(map(ord, args.benchmark)))
+    spans, tick_at = instruction_spans(dumps)
+    final_tick = spans[-1][3]
+    if args.stat_period_ticks:
+        period_ends = list(range(args.stat_period_ticks, final_tick, args.stat_period_ticks))
+    else:
+        period_ends = [tick_at(inst) for inst in range(args.stat_period_insts, int(spans[-1][1]),
+                                                       args.stat_period_insts)]
+    periods = {'period_ticks': args.stat_period_ticks, 'period_insts': args.stat_period_insts,
+               'dump_ticks': period_ends}
+
+    roi_start, roi_end = spans[0][3], spans[1][3]
+    ends = sorted(set(period_ends) | {span[3] for span in spans})
+    with open(out_dir / "stats.txt", 'w') as stats:
+        for dump in stretch_dumps(spans, ends, final_tick):
+            tick = dump_final_tick(dump)
+            if roi_start < tick <= roi_end:
+                phase = min(len(PERIODIC_PHASES) - 1,
+                            int((tick - roi_start) / (roi_end - roi_start) * len(PERIODIC_PHASES)))
+                ipc, miss, squash = (factor * rng.gauss(1.0, 0.03) for factor in PERIODIC_PHASES[phase])
+                for name, factor in (("system.cpu.numCycles", 1 / ipc),
+                                     ("system.cpu.l1d.overallMisses::total", miss),
+                                     ("system.cpu.commit.commitSquashedInsts", squash)):
+                    if re.search(rf"^{re.escape(name)}\s", dump, re.MULTILINE):
+                        dump = set_stat(dump, name, int(dump_stat(dump, name) * factor))
+            stats.write("\n" + dump + "\n")
+    (out_dir / "stat_periods.json").write_text(json.dumps(periods, indent=2))
+
+
+def main():
+    # gem5.opt <script> <benchmark> [options]
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--outdir', default=None)
+    parser.add_argument('script')
+    parser.add_argument('benchmark')
+    parser.add_argument('-o', '--out_dir', default='m5out')
+    parser.add_argument('--checkpoint_ticks', type=int, default=0)
+    parser.add_argument('--checkpoint_insts', type=int, default=0)
+    parser.add_argument('--checkpoint_keep', type=int, default=2)
+    parser.add_argument('--restore_from', default=None)
+    parser.add_argument('--simpoint_profile', action='store_true')
+    parser.add_argument('--simpoint_checkpoints', default=None)
+    parser.add_argument('--restore_simpoint', default=None)
+    parser.add_argument('--checkpoint_dir', default=None)
+    parser.add_argument('--smarts_period', type=int, default=0)
+    parser.add_argument('--smarts_warmup', type=int, default=2000)
+    parser.add_argument('--smarts_window', type=int, default=1000)
+    parser.add_argument('--max_insts', type=int, default=0)
+    parser.add_argument('--converge', action='store_true')
+    parser.add_argument('--converge_interval', type=int, default=10_000_000)
+    parser.add_argument('--converge_window', type=int, default=5)
+    parser.add_argument('--converge_tol', type=float, default=0.02)
+    parser.add_argument('--stat_period_ticks', type=int, default=0)
+    parser.add_argument('--stat_period_insts', type=int, default=0)
+    parser.add_argument('--num_rob_entries', type=int, default=64)
+    parser.add_argument('--num_iq_entries', type=int, default=32)
+    parser.add_argument('--lq_entries', type=int, default=8)
+    parser.add_argument('--sq_entries', type=int, default=8)
+    parser.add_argument('--issue_width', type=int, default=2)
+    parser.add_argument('--fu_pool', default='extended')
+    args, _ = parser.parse_known_args()
+
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    dumps = split_dumps(compression.read_text(Path(os.environ.get('FAKE_GEM5_STATS', DEFAULT_STATS))))
+    speedup = design_speedup(args)
+    dumps = [scale_ipc(dump, speedup) for dump in dumps]
+    final_tick = dump_final_tick(dumps[-1])
+    seconds_per_tick = float(os.environ.get('FAKE_GEM5_SECONDS', '1')) / final_tick
+    crash_at = int(os.environ.get('FAKE_GEM5_CRASH_AT_TICK', '0'))
+
+    if args.simpoint_profile:
+        matrix, _ = synthetic_bbv([12, 8, 10], seed=sum(map(ord, args.benchmark)))
+        write_bbv(Path(args.outdir or out_dir) / "simpoint.bb.gz", matrix)
+        print("End of simulation")
+        return
+    if args.simpoint_checkpoints:
+        checkpoint_dir = Path(args.checkpoint_dir or out_dir / CHECKPOINT_DIRNAME)
+        for simpoint in json.loads(Path(args.simpoint_checkpoints).read_text())['simpoints']:
+            (checkpoint_dir / f"cpt.simpoint_{simpoint['id']:02d}").mkdir(parents=True, exist_ok=True)
+        print("End of simulation")
+        return
+    if args.restore_simpoint:
+        # The measured interval, then gem5's exit dump at the same tick
+        # (empty, as stats were reset after the interval's dump)
+        end_tick = dump_final_tick(dumps[1])
+        exit_dump = dumps[1]
+        for name in ("simTicks", "simInsts", "system.cpu.numCycles"):
+            exit_dump = set_stat(exit_dump, name, 0)
+        (out_dir / "stats.txt").write_text("\n" + dumps[1] + "\n\n" + exit_dump + "\n")
+        (out_dir / "simpoint_window.json").write_text(json.dumps({
+            "start_tick": end_tick - int(dump_stat(dumps[1], "simTicks")), "end_tick": end_tick}))
+        print("End of simulation")
+        return
+
+    if args.smarts_period:
+        write_smarts_run(out_dir, dumps, args)
+        print(f"Exiting @ tick {final_tick} because exiting with last active thread context")
+        print("End of simulation")
+        return
+
+    if args.max_insts or args.converge:
+        tick = write_truncated_run(out_dir, dumps, args)
+        print(f"Exiting @ tick {tick}")
+        print("End of simulation")
+        return
+
+    if args.stat_period_ticks or args.stat_period_insts:
+        write_periodic_run(out_dir, dumps, args)
+        print(f"Exiting @ tick {final_tick} because exiting with last active thread context")
+        print("End of simulation")
+        return
+
+    tick = 0
+    if args.restore_from:
+        print(f"Restoring from checkpoint {args.restore_from}")
+        tick = int(re.match(r"cpt\.(\d+)$", Path(args.restore_from).name).group(1))
+        crash_at = 0
+    (out_dir / "config.json").write_text("{}")
+
+    # Instruction-based checkpoints are approximated by tick steps
+    step = args.checkpoint_ticks or args.checkpoint_insts or final_tick
+    pending = [dump for dump in dumps if dump_final_tick(dump) > tick]
+    with open(out_dir / "stats.txt", 'w') as stats:
+        while True:
+            next_tick = min(tick + step, final_tick)
+            time.sleep((next_tick - tick) * seconds_per_tick)
+            tick = next_tick
+            while pending and dump_final_tick(pending[0]) <= tick:
+                stats.write("\n" + pending.pop(0) + "\n")
+                stats.flush()
+
+            if crash_at and tick >= crash_at:
+                print(f"Crashing at tick {tick}", flush=True)
+                os.kill(os.getpid(), signal.SIGABRT)
+            if tick >= final_tick:
+                break
+            if args.checkpoint_ticks or args.checkpoint_insts:
+                checkpoint_dir = out_dir / CHECKPOINT_DIRNAME
+                checkpoint_dir.mkdir(exist_ok=True)
+                (checkpoint_dir / f"cpt.{tick}").mkdir(exist_ok=True)
+                (checkpoint_dir / f"cpt.{tick}" / "m5.cpt").write_text(f"[Globals]\ncurTick={tick}\n")
+                print(f"Checkpoint cpt.{tick} written")
+                for _, old in list_checkpoints(out_dir)[:-args.checkpoint_keep]:
+                    shutil.rmtree(old)
+
+    print(f"Exiting @ tick {tick} because exiting with last active thread context")
+    print("End of simulation")
+
+
+if __name__ == "__main__":
+    main()
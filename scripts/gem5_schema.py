@@ -0,0 +1,122 @@
+"""
+gem5_schema.py
+Command-line schema of a gem5 config script, read from its argparse calls
+
+gem5 config scripts such as a3_part4.py import m5 and cannot be imported
+outside gem5, so this reads their parser.add_argument(...) calls with ast
+instead: each option's flag, type, default and choices. The runner builds
+a3_part4.py command lines from that schema rather than listing every
+--flag by hand, so a new a3_part4.py option can be swept without touching
+the runner, and parameter names, types and choices are checked before
+anything is queued.
+"""
+
+import ast
+from pathlib import Path
+
+# argparse type= callables the schema understands
+TYPES = {"int": int, "float": float, "str": str}
+
+_schemas = {}
+
+
+class Option:
+    """One optional argument of a gem5 config script."""
+
+    def __init__(self, dest, flag, type=str, default=None, choices=None, action=None):
+        self.dest = dest
+        self.flag = flag
+        self.type = type
+        self.default = default
+        self.choices = choices
+        self.action = action
+
+    @property
+    def is_switch(self):
+        return self.action in ("store_true", "store_false")
+
+    def normalize(self, value):
+        """value converted to the option's type; raises ValueError if it is not valid."""
+        if self.is_switch:
+            if not isinstance(value, bool):
+                raise ValueError(f"{self.dest} is a switch and takes true/false, not {value!r}")
+            return value
+        try:
+            converted = self.type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.dest} takes {self.type.__name__} values, not {value!r}")
+        if self.type is int and isinstance(value, float) and value != converted:
+            raise ValueError(f"{self.dest} takes int values, not {value!r}")
+        if self.choices is not None and converted not in self.choices:
+            raise ValueError(f"{self.dest} must be one of {', '.join(map(str, self.choices))}, not {value!r}")
+        return converted
+
+    def args(self, value):
+        """Command-line arguments setting the option to value."""
+        value = self.normalize(value)
+        if self.is_switch:
+            return [self.flag] if value != (self.action == "store_false") else []
+        return [self.flag, str(value)]
+
+    def __repr__(self):
+        return f"Option({self.flag}, {self.type.__name__}, default={self.default!r})"
+
+
+def literal(node):
+    """A keyword argument's value if it is a literal (or a known type), else None."""
+    if isinstance(node, ast.Name) and node.id in TYPES:
+        return TYPES[node.id]
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        return None
+
+
+def parse_schema(source):
+    """dest -> Option for every --option added to an argparse parser in source."""
+    schema = {}
+    for node in ast.walk(ast.parse(source)):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "add_argument"):
+            continue
+        flags = [arg.value for arg in node.args
+                 if isinstance(arg, ast.Constant) and isinstance(arg.value, str)]
+        long_flags = [flag for flag in flags if flag.startswith("--")]
+        if not long_flags:
+            continue  # positional argument (e.g. the benchmark)
+        keywords = {keyword.arg: literal(keyword.value) for keyword in node.keywords}
+        dest = keywords.get("dest") or long_flags[0][2:].replace("-", "_")
+        action = keywords.get("action")
+        default = keywords.get("default")
+        if action in ("store_true", "store_false"):
+            default = action == "store_false"
+        option_type = bool if action in ("store_true", "store_false") else keywords.get("type") or str
+        schema[dest] = Option(dest, long_flags[0], option_type, default, keywords.get("choices"), action)
+    return schema
+
+
+def load_schema(script_path):
+    """The (memoized) schema of a gem5 config script."""
+    script_path = Path(script_path).resolve()
+    if script_path not in _schemas:
+        _schemas[script_path] = parse_schema(script_path.read_text())
+    return _schemas[script_path]
+
+
+def normalize_params(params, schema):
+    """
+    params with every value converted to its option's type.
+    Raises ValueError for unknown parameters and invalid values.
+    """
+    unknown = [name for name in params if name not in schema]
+    if unknown:
+        raise ValueError(f"unknown gem5 script option(s): {', '.join(unknown)}")
+    return {name: schema[name].normalize(value) for name, value in params.items()}
+
+
+def option_args(params, schema):
+    """Command-line arguments for params, in params order."""
+    args = []
+    for name, value in normalize_params(params, schema).items():
+        args += schema[name].args(value)
+    return args
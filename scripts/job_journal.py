@@ -0,0 +1,142 @@
+"""
+job_journal.py
+Append-only journal of simulation job state transitions
+
+Every sweep writes a 'sweep' record (which designs and workloads it covers)
+followed by one record per job state transition (queued, started,
+completed, failed, cached). Each record is a single JSON line that is
+fsync'ed before the runner moves on, so the journal survives the
+coordinator being killed (SSH drop, OOM, reboot) at any point.
+
+run_part4_sim.py --resume replays the journal to rebuild the last sweep's
+queue, re-running only jobs that never finished or whose outputs are
+incomplete.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# The shared stats parser (and its compressed-file readers) lives in data/gem5stats
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+from gem5stats import compression
+
+
+BEGIN_MARK = "Begin Simulation Statistics"
+END_MARK = "End Simulation Statistics"
+
+# a3_part4.py runs produce an init, ROI and exit dump
+MIN_COMPLETE_DUMPS = 3
+
+# Printed by the gem5 scripts once m5.simulate() returns
+SIMULATION_DONE_MARK = "End of simulation"
+
+# States after which a job needs no further work
+FINISHED_STATES = ("completed", "cached", "resumed")
+
+
+class JobJournal:
+    """Durable, append-only log of job state transitions."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def append(self, record):
+        """Append one record and fsync it to disk before returning."""
+        record = dict(record)
+        record.setdefault("time", datetime.now().isoformat())
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def begin_sweep(self, designs, workloads, job_names):
+        self.append({"event": "sweep", "designs": designs, "workloads": workloads, "jobs": job_names})
+
+    def record(self, name, state, **details):
+        self.append({"event": "job", "job": name, "state": state, **details})
+
+
+def read_journal(path):
+    """
+    Yield the records of a journal file. A torn last line (the coordinator
+    died mid-write) is ignored.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def last_sweep(path):
+    """
+    Return (sweep_record, job_states) for the most recent sweep in the
+    journal, where job_states maps job name -> its last job record.
+    Returns (None, {}) if the journal has no sweep.
+    """
+    sweep = None
+    states = {}
+    for record in read_journal(path):
+        if record.get("event") == "sweep":
+            sweep = record
+            states = {}
+        elif record.get("event") == "job" and sweep is not None:
+            states[record["job"]] = record
+    return sweep, states
+
+
+def run_is_complete(output_dir):
+    """
+    Check the outputs of a run: stats.txt must end with a fully written dump,
+    and either simulation.log records that gem5 finished or (for runs without
+    a log) stats.txt holds all MIN_COMPLETE_DUMPS dumps.
+    """
+    output_dir = Path(output_dir)
+    try:
+        content = compression.read_text(output_dir / "stats.txt", errors='replace')
+    except (OSError, EOFError):
+        return False
+
+    if END_MARK not in content[-200:]:
+        return False
+
+    log_file = compression.resolve(output_dir / "simulation.log")
+    if log_file.exists():
+        if SIMULATION_DONE_MARK in compression.read_text(log_file, errors='replace'):
+            return True
+    return content.count(BEGIN_MARK) >= MIN_COMPLETE_DUMPS
+
+
+def gem5_is_running(pid):
+    """Whether pid is still alive and is a gem5 process (not a reused pid)."""
+    try:
+        with open(f"/proc/{pid}/cmdline", 'rb') as f:
+            return b"gem5" in f.read()
+    except OSError:
+        return False
+
+
+def classify_for_resume(name, output_dir, record):
+    """
+    Decide what --resume should do with one job, given its last journal
+    record (or None). Returns one of:
+      'done'    - its outputs check out: finished, or its gem5 process
+                  completed after the coordinator died
+      'running' - its gem5 process from the dead sweep is still alive
+      'rerun'   - never started, interrupted, failed, or outputs corrupt
+    """
+    state = record["state"] if record else None
+
+    if state == "started" and record.get("pid") and gem5_is_running(record["pid"]):
+        return "running"
+    if state != "failed" and run_is_complete(output_dir):
+        return "done"
+    return "rerun"
@@ -0,0 +1,289 @@
+"""
+result_cache.py
+Content-addressed cache of Part 4 simulation results
+
+A gem5 run is fully determined by the gem5 binary, the gem5 config script,
+the workload binary and its input files, and the processor parameters.
+This module hashes all of those into a cache key and keeps the stats.txt,
+config.ini and config.json of finished runs under that key (compressed, if
+the run's outputs were), so a sweep can reuse them instead of re-simulating.
+
+Cache layout:
+    <cache_dir>/index.json            - key -> label, size, last_used
+    <cache_dir>/<key[:2]>/<key>/      - cached output files + manifest.json
+
+Entries are evicted least-recently-used first once the cache grows past
+its size limit. An entry is considered stale (and dropped) when its files
+no longer match the checksums in its manifest, or when a newer entry has
+been stored under the same label (the run's output directory, so full and
+sampled runs of one design/workload do not replace each other).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+# The shared stats parser (and its compressed-file readers) lives in data/gem5stats
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+from gem5stats import compression
+
+
+# Files copied into / restored from the cache for every run, including the
+# sidecar files the parsers of SMARTS, truncated and periodic runs need
+CACHED_FILES = ["stats.txt", "config.ini", "config.json",
+                "smarts_windows.json", "convergence.json", "stat_periods.json"]
+
+# Workload binaries and input files (relative to the workloads directory),
+# mirroring the paths used by the MIBenchWorkloads registry in a3_part4.py
+WORKLOAD_INPUTS = {
+    "basicmath": ["basicmath/basicmath_large"],
+    "bitcounts": ["bitcount/bitcnts"],
+    "qsort": ["qsort/qsort_large", "qsort/input_large.dat"],
+    "susan_edges": ["susan/susan", "susan/input_large.pgm"],
+    "susan_corners": ["susan/susan", "susan/input_large.pgm"],
+    "susan_smoothing": ["susan/susan", "susan/input_large.pgm"],
+    "jpeg_encode": ["jpeg/jpeg-6a/cjpeg", "jpeg/input_large.ppm"],
+    "jpeg_decode": ["jpeg/jpeg-6a/djpeg", "jpeg/input_large.jpg"],
+    "dijkstra": ["dijkstra_large", "network/dijkstra/input.dat"],
+    # Small-input proxies (see successive_halving.py)
+    "basicmath_small": ["basicmath/basicmath_small"],
+    "bitcounts_small": ["bitcount/bitcnts"],
+    "qsort_small": ["qsort/qsort_small", "qsort/input_small.dat"],
+    "susan_edges_small": ["susan/susan", "susan/input_small.pgm"],
+    "susan_corners_small": ["susan/susan", "susan/input_small.pgm"],
+    "susan_smoothing_small": ["susan/susan", "susan/input_small.pgm"],
+    "jpeg_encode_small": ["jpeg/jpeg-6a/cjpeg", "jpeg/input_small.ppm"],
+    "jpeg_decode_small": ["jpeg/jpeg-6a/djpeg", "jpeg/input_small.jpg"],
+    "dijkstra_small": ["dijkstra_small", "network/dijkstra/input.dat"]
+}
+
+INDEX_FILENAME = "index.json"
+MANIFEST_FILENAME = "manifest.json"
+END_MARK = "End Simulation Statistics"
+
+# sha256 digests memoized on (path, size, mtime) for the life of the process
+_digest_memo = {}
+
+
+def hash_file(path):
+    """
+    Return the sha256 of a file, or '<missing>' if it does not exist.
+    Digests are memoized on (path, size, mtime) so large binaries such as
+    gem5.opt are only read once per sweep.
+    """
+    path = Path(path)
+    try:
+        st = path.stat()
+    except OSError:
+        return "<missing>"
+
+    memo_key = (str(path.resolve()), st.st_size, st.st_mtime_ns)
+    if memo_key not in _digest_memo:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _digest_memo[memo_key] = digest.hexdigest()
+    return _digest_memo[memo_key]
+
+
+def ends_with_complete_dump(stats_file):
+    """Check that a stats.txt (or its compressed variant) exists and its last dump was fully written."""
+    stats_file = compression.resolve(stats_file)
+    try:
+        if compression.codec_of(stats_file) is None:
+            with open(stats_file, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                f.seek(max(0, f.tell() - 200))
+                tail = f.read()
+        else:
+            # Compressed streams cannot seek to the end; keep the last block
+            tail = b''
+            with compression.open_binary(stats_file) as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    tail = (tail + block)[-200:]
+        return END_MARK in tail.decode(errors='replace')
+    except (OSError, EOFError):
+        return False
+
+
+def resolve_executable(executable):
+    """Resolve a bare executable name (e.g. 'gem5.opt') through PATH."""
+    found = shutil.which(str(executable))
+    return Path(found) if found else Path(executable)
+
+
+def compute_cache_key(job, workloads_dir):
+    """
+    Hash everything that determines the outcome of a simulation job.
+    Returns (key, inputs) where inputs describes what went into the key.
+    """
+    workloads_dir = Path(workloads_dir)
+    workload_files = WORKLOAD_INPUTS.get(job['workload'], [])
+
+    inputs = {
+        "workload": job['workload'],
+        "params": job['params'],
+        "gem5_exec": hash_file(resolve_executable(job['gem5_exec'])),
+        "gem5_script": hash_file(job['gem5_script']),
+        "workload_files": {rel: hash_file(workloads_dir / rel) for rel in workload_files}
+    }
+    # Sampled, truncated and periodic runs measure something else than
+    # full runs of the same design
+    if job.get('sampling'):
+        inputs["sampling"] = job['sampling']
+    if job.get('truncation'):
+        inputs["truncation"] = job['truncation']
+    if job.get('periodic'):
+        inputs["periodic"] = job['periodic']
+
+    encoded = json.dumps(inputs, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest(), inputs
+
+
+class ResultCache:
+    """Size-bounded, LRU-evicted store of simulation outputs."""
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.index = self._load_index()
+
+    def _load_index(self):
+        index_file = self.cache_dir / INDEX_FILENAME
+        if index_file.exists():
+            try:
+                with open(index_file, 'r') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                pass
+        return {}
+
+    def _save_index(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index_file = self.cache_dir / INDEX_FILENAME
+        tmp_file = index_file.with_suffix(".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_file, index_file)
+
+    def _entry_dir(self, key):
+        return self.cache_dir / key[:2] / key
+
+    def _drop(self, key):
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+        self.index.pop(key, None)
+
+    def _is_valid(self, key):
+        """Check that a cached entry is complete and matches its manifest."""
+        entry_dir = self._entry_dir(key)
+        manifest_file = entry_dir / MANIFEST_FILENAME
+        if not manifest_file.exists():
+            return False
+        try:
+            with open(manifest_file, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        names = manifest.get("files", {})
+        if not any(compression.raw_path(name) == Path("stats.txt") for name in names):
+            return False
+        for name, digest in manifest["files"].items():
+            if hash_file(entry_dir / name) != digest:
+                return False
+        return True
+
+    def lookup(self, key):
+        """
+        Return the cache directory holding the outputs for key, or None.
+        Entries that fail validation are removed and counted as stale.
+        """
+        if key not in self.index:
+            self.misses += 1
+            return None
+
+        if not self._is_valid(key):
+            self._drop(key)
+            self._save_index()
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        self.index[key]["last_used"] = time.time()
+        self._save_index()
+        self.hits += 1
+        return self._entry_dir(key)
+
+    def restore(self, key, output_dir):
+        """Copy cached outputs for key into output_dir. Returns True on a hit."""
+        entry_dir = self.lookup(key)
+        if entry_dir is None:
+            return False
+
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name in CACHED_FILES:
+            cached = compression.resolve(entry_dir / name)
+            if cached.exists():
+                # Drop other variants so readers pick up the restored file
+                for stale in compression.variants(output_dir / name):
+                    if stale.exists():
+                        stale.unlink()
+                shutil.copy2(cached, output_dir / cached.name)
+        return True
+
+    def store(self, key, label, inputs, output_dir):
+        """
+        Copy the outputs of a finished run into the cache under key.
+        Only runs whose stats.txt ends with a complete dump are stored.
+        """
+        output_dir = Path(output_dir)
+        if not ends_with_complete_dump(output_dir / "stats.txt"):
+            return False
+
+        entry_dir = self._entry_dir(key)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        entry_dir.mkdir(parents=True)
+
+        files = {}
+        for name in CACHED_FILES:
+            source = compression.resolve(output_dir / name)
+            if source.exists():
+                shutil.copy2(source, entry_dir / source.name)
+                files[source.name] = hash_file(entry_dir / source.name)
+
+        manifest = {"key": key, "label": label, "inputs": inputs, "files": files}
+        with open(entry_dir / MANIFEST_FILENAME, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Older entries for the same output directory can never be hit again
+        for old_key in [k for k, e in self.index.items() if e["label"] == label and k != key]:
+            self._drop(old_key)
+            self.stale += 1
+
+        size = sum((entry_dir / name).stat().st_size for name in files)
+        self.index[key] = {"label": label, "size": size, "last_used": time.time()}
+        self.evict()
+        self._save_index()
+        return True
+
+    def evict(self):
+        """Remove least-recently-used entries until the cache fits max_bytes."""
+        total = sum(entry["size"] for entry in self.index.values())
+        for key in sorted(self.index, key=lambda k: self.index[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.index[key]["size"]
+            self._drop(key)
+
+    def summary(self):
+        """One-line hit/miss summary for the current sweep."""
+        return f"cache hits: {self.hits}, misses: {self.misses}, stale entries dropped: {self.stale}"
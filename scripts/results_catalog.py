@@ -0,0 +1,398 @@
+"""
+results_catalog.py
+SQLite catalog of Part 4 simulation results
+
+Results are otherwise spread over status.json, master_log.txt, the
+per-run directories and part4_metrics.csv. The catalog keeps them in one
+local SQLite database with indexed tables:
+
+    runs          one row per run output directory (design, workload, mode,
+                  outcome, when it was recorded)
+    params        the processor parameters of each run, from its gem5
+                  config.json when there is one and otherwise from its
+                  design in designs.py, plus its credit cost
+    host_metrics  host-side cost of each run (wall time, peak RSS, restarts,
+                  gem5's host stats)
+    stats         the selected stats and derived metrics of each run
+
+params and stats are indexed on (name, value), so a question such as
+"runs with num_rob_entries=128 and lq_entries>=16, by IPC/credit" is a
+few index lookups instead of a directory walk:
+
+    python3 scripts/results_catalog.py query num_rob_entries=128 "lq_entries>=16" --sort ipc_per_credit
+
+The runner records each job as it completes (one transaction per run, so
+readers never see half a run); `ingest` backfills the catalog from the
+run directories already under data/part4.
+
+Usage:
+    python3 scripts/results_catalog.py ingest
+    python3 scripts/results_catalog.py query [CONDITION ...] [--sort STAT] [--ascending] [--show STAT ...]
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from checkpoints import restored_inside_roi
+from scheduler import read_host_seconds
+from sweep import all_designs
+
+# The shared stats parser lives in data/gem5stats
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+from gem5stats import compression, read_dump
+
+PROJECT_ROOT = Path(__file__).parent.parent
+DATA_DIR = PROJECT_ROOT / "data" / "part4"
+CATALOG_FILE = DATA_DIR / "catalog.sqlite"
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    design TEXT NOT NULL,
+    workload TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    output_dir TEXT NOT NULL UNIQUE,
+    success INTEGER NOT NULL,
+    returncode INTEGER,
+    cached INTEGER NOT NULL DEFAULT 0,
+    recorded_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_design ON runs (design, workload);
+CREATE INDEX IF NOT EXISTS runs_by_workload ON runs (workload);
+
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    text TEXT,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS params_by_value ON params (name, value, run_id);
+CREATE INDEX IF NOT EXISTS params_by_text ON params (name, text, run_id);
+
+CREATE TABLE IF NOT EXISTS host_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS stats (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS stats_by_value ON stats (name, value, run_id);
+"""
+
+# Design parameters and the system.cpu entries of gem5's config.json they set
+CONFIG_JSON_KEYS = {
+    "fetch_width": "fetchWidth",
+    "decode_width": "decodeWidth",
+    "rename_width": "renameWidth",
+    "dispatch_width": "dispatchWidth",
+    "issue_width": "issueWidth",
+    "commit_width": "commitWidth",
+    "fetch_buffer_size": "fetchBufferSize",
+    "fetch_queue_size": "fetchQueueSize",
+    "num_iq_entries": "numIQEntries",
+    "num_rob_entries": "numROBEntries",
+    "lq_entries": "LQEntries",
+    "sq_entries": "SQEntries"
+}
+
+# Host stats gem5 reports for the last dump of a run
+HOST_STATS = {
+    "hostMemory": "host_memory_bytes",
+    "hostInstRate": "host_inst_rate",
+    "hostTickRate": "host_tick_rate"
+}
+
+# CONDITION syntax of the query command
+CONDITION_PATTERN = re.compile(r"^\s*([\w.:]+)\s*(<=|>=|==|!=|=|<|>)\s*(.+?)\s*$")
+OPERATORS = {"=": "=", "==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def run_mode(result):
+    """
+    full, smarts, truncated or periodic: how a run was simulated.
+    partial_roi: a full run restored from a checkpoint inside its ROI,
+    whose ROI stats only cover the part after the checkpoint.
+    """
+    if result.get('sampling'):
+        return "smarts"
+    if result.get('truncation'):
+        return "truncated"
+    if result.get('periodic'):
+        return "periodic"
+    if restored_inside_roi(result['output_dir']):
+        return "partial_roi"
+    return "full"
+
+
+def read_run_params(output_dir, design_id):
+    """
+    Processor parameters of a run: the design's parameters and credits,
+    overridden by the values gem5 actually used where the run directory
+    has a config.json.
+    """
+    config = all_designs().get(design_id, {})
+    params = dict(config.get('params', {}))
+    if config.get('credits') is not None:
+        params['credits'] = config['credits']
+
+    config_json = compression.resolve(Path(output_dir) / "config.json")
+    if config_json.exists():
+        try:
+            with compression.open_text(config_json) as f:
+                cpu = json.load(f)['system']['cpu']
+            cpu = cpu[0] if isinstance(cpu, list) else cpu
+            for name, key in CONFIG_JSON_KEYS.items():
+                if key in cpu:
+                    params[name] = cpu[key]
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            pass
+    return params
+
+
+def read_host_metrics(result):
+    """Host-side cost of a run, from its result and gem5's host stats."""
+    metrics = {
+        "elapsed_seconds": result.get('elapsed_time'),
+        "peak_rss_bytes": result.get('peak_rss_bytes'),
+        "restarts": result.get('restarts', 0)
+    }
+    stats_file = compression.resolve(Path(result['output_dir']) / "stats.txt")
+    if stats_file.exists():
+        metrics["host_seconds"] = read_host_seconds(stats_file)
+        try:
+            last = read_dump(stats_file, 'last', names=HOST_STATS) or {}
+        except OSError:
+            last = {}
+        for stat, name in HOST_STATS.items():
+            metrics[name] = last.get(stat)
+    return metrics
+
+
+def numeric_items(values):
+    """(name, float) pairs of the numeric entries of a dict."""
+    for name, value in (values or {}).items():
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, (int, float)) and value == value:
+            yield name, float(value)
+
+
+def parse_condition(condition):
+    """'lq_entries>=16' -> ('lq_entries', '>=', 16.0); non-numeric values stay strings."""
+    match = CONDITION_PATTERN.match(condition)
+    if match is None:
+        raise ValueError(f"bad condition {condition!r} (expected e.g. lq_entries>=16)")
+    name, operator, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        pass
+    return name, OPERATORS[operator], value
+
+
+class ResultsCatalog:
+    """The SQLite results catalog."""
+
+    def __init__(self, path=CATALOG_FILE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        # WAL lets analysis read the catalog while the runner writes it
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def close(self):
+        self.conn.close()
+
+    def record_run(self, result, metrics=None):
+        """Record one finished run in a single transaction."""
+        self.record_runs([(result, metrics)])
+
+    def record_runs(self, runs):
+        """
+        Record (result, metrics) pairs in a single transaction, replacing
+        any earlier record of the same output directory. A run recorded
+        with metrics=None (cached, resumed or not parsed) keeps the stats
+        already in the catalog, unless it failed or only partly measured
+        its ROI (partial_roi).
+        """
+        recorded_at = datetime.now().isoformat()
+        with self.conn:
+            for result, metrics in runs:
+                output_dir = str(Path(result['output_dir']).resolve())
+                mode = run_mode(result)
+                row = (result['name'], result['design_id'], result['workload'], mode,
+                       int(bool(result['success'])), result.get('returncode'),
+                       int(bool(result.get('cached') or result.get('resumed'))), recorded_at, output_dir)
+                existing = self.conn.execute("SELECT run_id FROM runs WHERE output_dir = ?",
+                                             (output_dir,)).fetchone()
+                if existing is None:
+                    run_id = self.conn.execute(
+                        "INSERT INTO runs (name, design, workload, mode, success, returncode, cached, "
+                        "recorded_at, output_dir) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row).lastrowid
+                else:
+                    run_id = existing[0]
+                    self.conn.execute(
+                        "UPDATE runs SET name = ?, design = ?, workload = ?, mode = ?, success = ?, "
+                        "returncode = ?, cached = ?, recorded_at = ? WHERE output_dir = ?", row)
+                    self.conn.execute("DELETE FROM params WHERE run_id = ?", (run_id,))
+                    self.conn.execute("DELETE FROM host_metrics WHERE run_id = ?", (run_id,))
+                    if metrics is not None or not result['success'] or mode == "partial_roi":
+                        self.conn.execute("DELETE FROM stats WHERE run_id = ?", (run_id,))
+
+                params = read_run_params(result['output_dir'], result['design_id'])
+                self.conn.executemany(
+                    "INSERT INTO params (run_id, name, value, text) VALUES (?, ?, ?, ?)",
+                    [(run_id, name, float(value), None) if isinstance(value, (int, float))
+                     else (run_id, name, None, str(value)) for name, value in params.items()])
+                self.conn.executemany(
+                    "INSERT INTO host_metrics (run_id, name, value) VALUES (?, ?, ?)",
+                    [(run_id, name, value) for name, value in numeric_items(read_host_metrics(result))])
+                self.conn.executemany(
+                    "INSERT INTO stats (run_id, name, value) VALUES (?, ?, ?)",
+                    [(run_id, name, value) for name, value in numeric_items(metrics)])
+
+    def table_of(self, names):
+        """name -> table holding it: params first, then host_metrics, else stats."""
+        tables = {}
+        for table in ("host_metrics", "params"):
+            placeholders = ", ".join("?" * len(names))
+            for (name,) in self.conn.execute(
+                    f"SELECT DISTINCT name FROM {table} WHERE name IN ({placeholders})", list(names)):
+                tables[name] = table
+        return {name: tables.get(name, "stats") for name in names}
+
+    def query(self, conditions=(), sort_by=None, descending=True, show=(), limit=None):
+        """
+        Runs matching every (name, operator, value) condition, as dicts of
+        name, design, workload, mode and the show/sort_by values. A
+        name is looked up among the parameters, then the host metrics, then
+        the stats. Each condition is one indexed join.
+        """
+        columns = list(dict.fromkeys(list(show) + ([sort_by] if sort_by else [])))
+        tables = self.table_of(list(dict.fromkeys([c[0] for c in conditions] + columns)))
+        joins = []
+        args = []
+        for i, (name, operator, value) in enumerate(conditions):
+            table = tables[name]
+            column = "text" if table == "params" and not isinstance(value, float) else "value"
+            joins.append(f"JOIN {table} c{i} ON c{i}.run_id = r.run_id AND c{i}.name = ? "
+                         f"AND c{i}.{column} {operator} ?")
+            args += [name, value]
+
+        selects = []
+        for j, name in enumerate(columns):
+            table = tables[name]
+            value = "COALESCE(value, text)" if table == "params" else "value"
+            selects.append(f"(SELECT {value} FROM {table} WHERE run_id = r.run_id AND name = ?) AS v{j}")
+        sql = ("SELECT r.name, r.design, r.workload, r.mode"
+               + "".join(", " + select for select in selects)
+               + " FROM runs r " + " ".join(joins) + " WHERE r.success = 1")
+        args = columns + args
+        if sort_by:
+            sql += f" ORDER BY v{columns.index(sort_by)} IS NULL, v{columns.index(sort_by)} " \
+                   + ("DESC" if descending else "ASC")
+        else:
+            sql += " ORDER BY r.design, r.workload, r.mode"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        rows = []
+        for row in self.conn.execute(sql, args):
+            entry = {"name": row[0], "design": row[1], "workload": row[2], "mode": row[3]}
+            entry.update(zip(columns, row[4:]))
+            rows.append(entry)
+        return rows
+
+
+def ingest(catalog, data_dir=DATA_DIR):
+    """Record every full run under data_dir with its part4_metrics.csv metrics."""
+    # parse_data.py lives with the CSV output it produces
+    sys.path.insert(0, str(PROJECT_ROOT / "data" / "CSV"))
+    from parse_data import DESIGNS, WORKLOADS, compute_metrics, parse_run
+
+    present = []
+    for design_id, credits in DESIGNS.items():
+        for workload in WORKLOADS:
+            stats_file = compression.resolve(Path(data_dir) / design_id / workload / "stats.txt")
+            # Runs restored inside their ROI are left out, as in part4_metrics.csv
+            if stats_file.exists() and not restored_inside_roi(stats_file.parent):
+                stats = parse_run(stats_file)
+                if stats is not None:
+                    present.append((design_id, workload, credits, stats))
+
+    runs = []
+    for row in compute_metrics(present):
+        result = {
+            'name': f"{row['design']}/{row['workload']}",
+            'design_id': row['design'],
+            'workload': row['workload'],
+            'output_dir': str(Path(data_dir) / row['design'] / row['workload']),
+            'success': True,
+            'returncode': 0
+        }
+        runs.append((result, row))
+    catalog.record_runs(runs)
+    return len(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite catalog of Part 4 results")
+    parser.add_argument('--catalog', default=CATALOG_FILE, help="catalog database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("ingest", help="record every run under data/part4")
+
+    query = commands.add_parser("query", help="find runs by parameter and stat values")
+    query.add_argument("conditions", nargs="*", help="e.g. num_rob_entries=128 'lq_entries>=16' fu_pool=extended")
+    query.add_argument("--sort", default="ipc_per_credit", help="stat or parameter to sort by")
+    query.add_argument("--ascending", action="store_true", help="smallest first")
+    query.add_argument("--show", nargs="*", default=["ipc"], help="extra columns to print")
+    query.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    catalog = ResultsCatalog(args.catalog)
+    try:
+        if args.command == "ingest":
+            count = ingest(catalog)
+            print(f"✓ Recorded {count} runs in {catalog.path}")
+            return
+
+        try:
+            conditions = [parse_condition(condition) for condition in args.conditions]
+        except ValueError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        rows = catalog.query(conditions, args.sort, not args.ascending, args.show, args.limit)
+        columns = list(dict.fromkeys(args.show + [args.sort]))
+        print("run".ljust(40) + "mode".ljust(10) + "".join(name[-18:].rjust(20) for name in columns))
+        for row in rows:
+            cells = [row[name] for name in columns]
+            print(row['name'].ljust(40) + row['mode'].ljust(10)
+                  + "".join((f"{cell:.6g}" if isinstance(cell, float) else str(cell)).rjust(20)
+                            for cell in cells))
+        print(f"\n✓ {len(rows)} runs")
+    finally:
+        catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -59,7 +59,7 @@ if $SCP_CMD "$REMOTE_PATH" "$LOCAL_DATA_DIR/" 2>&1; then
     echo -e "${GREEN}✓ Data retrieval successful!${NC}"
 
     # Count stats files
-    STATS_COUNT=$(find "$LOCAL_DATA_DIR" -name "stats.txt" 2>/dev/null | wc -l | tr -d ' ')
+    STATS_COUNT=$(find "$LOCAL_DATA_DIR" \( -name "stats.txt" -o -name "stats.txt.gz" -o -name "stats.txt.zst" \) 2>/dev/null | wc -l | tr -d ' ')
     echo -e "${GREEN}✓ Retrieved $STATS_COUNT stats.txt files${NC}"
 
     # Check for logs
@@ -2,7 +2,22 @@
 run_part4_sim.py
 Runs all Part 4 simulations for CSC368H1 Assignment 3
 Tests 4 different processor configurations across all workloads
-Uses multiprocessing to run up to 6 simulations in parallel
+Runs simulations in parallel, as many as the host's cores and memory allow
+(see admission.py), either as asyncio subprocesses of this coordinator
+(default, see async_orchestrator.py) or from a multiprocessing Pool
+Every job state change is journaled; after a crash, run with --resume to
+re-run only the jobs that did not finish (see job_journal.py)
+With --checkpoint-ticks/--checkpoint-insts, failed or killed runs restart
+from their latest gem5 checkpoint (see checkpoints.py)
+With --smarts-period, each run is SMARTS-sampled instead of simulated in
+detail end to end (see a3_part4.py and data/CSV/parse_sampled.py)
+With --max-insts and/or --converge, runs stop early once enough of the ROI
+has been simulated and its metrics are extrapolated (same files)
+With --stat-period-ticks/--stat-period-insts, runs also dump stats
+periodically for phase analysis (see data/CSV/stat_timeseries.py)
+With --sweep SPEC, the design points of a declarative sweep spec are run
+instead of the hand-written designs (see sweep.py), on the large inputs
+or their *_small variants (see successive_halving.py)
 
 Priority Management:
 - Run this script with: nice -n -10 python3 scripts/run_part4_sim.py
@@ -14,23 +29,91 @@ Priority Management:
 import subprocess
 import os
 import sys
+import argparse
+import asyncio
 from pathlib import Path
 import time
 from datetime import datetime
-from multiprocessing import Pool, cpu_count
+from multiprocessing import Pool, Queue, cpu_count
 import json
+import queue
+import sqlite3
 import threading
 
+from admission import AdmissionController, load_footprints
+from async_orchestrator import AsyncOrchestrator
+from checkpoints import (checkpoint_args, clear_restart_state, finish_restored_run,
+                         prepare_restart, remove_checkpoints, restore_latest, restored_inside_roi)
+from cost_model import DEFAULT_COST_MODEL
+from designs import FIXED_PARAMS, PROCESSOR_CONFIGS
+from gem5_schema import load_schema, option_args
+from job_journal import JobJournal, classify_for_resume, last_sweep
+from scheduler import load_runtime_history, order_longest_first, predict_makespan
+from result_cache import ResultCache, compute_cache_key
+from results_catalog import CATALOG_FILE, ResultsCatalog
+from sweep import all_designs, expand, load_spec, save_sweep
+from sweep_status import SweepStatus, job_name, write_json_atomic
+
+# parse_data.py lives with the CSV output it produces
+sys.path.insert(0, str(Path(__file__).parent.parent / "data" / "CSV"))
+from parse_data import compute_metrics, extract_middle_stats
+from metric_registry import stat_paths
+from parse_sampled import (SMARTS_SUBDIR, TRUNCATED_SUBDIR, extract_smarts_metrics,
+                           extract_truncated_metrics, load_roi_insts)
+from stat_timeseries import PHASES_SUBDIR, extract_phase_metrics
+from gem5stats import compression
+
 # Define project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 GEM5_SCRIPT = PROJECT_ROOT / "gem5scripts" / "a3_part4.py"
 DATA_DIR = PROJECT_ROOT / "data" / "part4"
 MASTER_LOG_FILE = DATA_DIR / "master_log.txt"
 STATUS_FILE = DATA_DIR / "status.json"
+WORKLOADS_DIR = PROJECT_ROOT / "workloads"
+
+# Content-addressed cache of finished runs (see result_cache.py)
+RESULT_CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+RESULT_CACHE_MAX_BYTES = 2 * 1024 ** 3  # 2 GiB
+
+# Append-only record of every job state transition, replayed by --resume
+# (see job_journal.py)
+JOURNAL_FILE = DATA_DIR / "journal.jsonl"
+
+# Checkpointing (see checkpoints.py): how many checkpoints each run keeps,
+# and how many times a failed run is restarted from its latest one
+CHECKPOINT_KEEP = 2
+MAX_RESTARTS = 2
+
+# SMARTS sampling: detailed warmup and measured window (committed
+# instructions) taken every --smarts-period instructions
+SMARTS_WARMUP_INSTS = 2000
+SMARTS_WINDOW_INSTS = 1000
+
+# Truncated runs: stats are dumped every CONVERGE_INTERVAL_INSTS committed
+# instructions, and with --converge a run stops once the IPC of the last
+# CONVERGE_WINDOW intervals is within CONVERGE_TOLERANCE of their mean
+CONVERGE_INTERVAL_INSTS = 10_000_000
+CONVERGE_WINDOW = 5
+CONVERGE_TOLERANCE = 0.02
+
+# Outputs of each finished run stored compressed (see gem5stats/compression.py);
+# every reader decompresses them on the fly
+COMPRESS_CODEC = "gzip"
+COMPRESSED_FILES = ["stats.txt", "config.ini", "config.json", "simulation.log"]
+
+# Per-workload peak memory measured by previous sweeps (see admission.py)
+FOOTPRINTS_FILE = DATA_DIR / "footprints.json"
+
+# How often the coordinator re-checks free memory and refreshes status.json
+# while waiting for completions
+COORDINATOR_POLL_SECONDS = 5
 
 # Thread lock for safe logging
 log_lock = threading.Lock()
 
+# Queue on which pool workers announce job starts (set by init_worker)
+worker_events = None
+
 # Workloads to simulate (large inputs only, as per assignment)
 WORKLOADS = [
     "basicmath",
@@ -44,9 +127,15 @@ WORKLOADS = [
     "dijkstra"
 ]
 
-# Maximum number of parallel gem5 simulations to run at once
-# Adjust based on your system's CPU cores and memory
-MAX_PARALLEL_PROCESSES = 6
+# The small-input variant a3_part4.py registers for each workload: cheap
+# proxies for design searches (see successive_halving.py), never part of
+# the assignment's results
+SMALL_WORKLOADS = {workload: f"{workload}_small" for workload in WORKLOADS}
+
+# Maximum number of parallel gem5 simulations to run at once.
+# None sizes it from the cores available; on top of that, each simulation
+# is only started once admission.py decides it fits in the host's memory.
+MAX_PARALLEL_PROCESSES = None
 
 # gem5 executable path (adjust if needed)
 # Common locations:
@@ -55,89 +144,7 @@ MAX_PARALLEL_PROCESSES = 6
 # - gem5.opt (if in PATH)
 GEM5_EXECUTABLE = "/opt/gem5/build/X86/gem5.opt"  # Update this path as needed
 
-# Processor Configurations
-PROCESSOR_CONFIGS = {
-    "design_a": {
-        "name": "Design A - Conservative (820 credits)",
-        "params": {
-            # Fixed parameters (same for all designs)
-            "fetch_width": 2,
-            "decode_width": 2,
-            "rename_width": 2,
-            "dispatch_width": 2,
-            "issue_width": 2,
-            "commit_width": 2,
-            "fetch_buffer_size": 64,
-            "fetch_queue_size": 16,
-            "num_iq_entries": 32,
-            # Variable parameters (Design A specific)
-            "fu_pool": "extended",
-            "num_rob_entries": 64,
-            "lq_entries": 8,
-            "sq_entries": 8
-        }
-    },
-    "design_b": {
-        "name": "Design B - ROB-Focused (960 credits)",
-        "params": {
-            # Fixed parameters
-            "fetch_width": 2,
-            "decode_width": 2,
-            "rename_width": 2,
-            "dispatch_width": 2,
-            "issue_width": 2,
-            "commit_width": 2,
-            "fetch_buffer_size": 64,
-            "fetch_queue_size": 16,
-            "num_iq_entries": 32,
-            # Variable parameters (Design B specific)
-            "fu_pool": "extended",
-            "num_rob_entries": 128,  # DOUBLED from Design A
-            "lq_entries": 8,
-            "sq_entries": 8
-        }
-    },
-    "design_c": {
-        "name": "Design C - LSQ-Focused (900 credits)",
-        "params": {
-            # Fixed parameters
-            "fetch_width": 2,
-            "decode_width": 2,
-            "rename_width": 2,
-            "dispatch_width": 2,
-            "issue_width": 2,
-            "commit_width": 2,
-            "fetch_buffer_size": 64,
-            "fetch_queue_size": 16,
-            "num_iq_entries": 32,
-            # Variable parameters (Design C specific)
-            "fu_pool": "extended",
-            "num_rob_entries": 64,
-            "lq_entries": 16,  # DOUBLED from Design A
-            "sq_entries": 16   # DOUBLED from Design A
-        }
-    },
-    "design_d": {
-        "name": "Design D - FU-Focused (1000 credits)",
-        "params": {
-            # Fixed parameters
-            "fetch_width": 2,
-            "decode_width": 2,
-            "rename_width": 2,
-            "dispatch_width": 2,
-            "issue_width": 2,
-            "commit_width": 2,
-            "fetch_buffer_size": 64,
-            "fetch_queue_size": 16,
-            "num_iq_entries": 32,
-            # Variable parameters (Design D specific)
-            "fu_pool": "aggressive",  # UPGRADED from Extended
-            "num_rob_entries": 64,
-            "lq_entries": 8,
-            "sq_entries": 8
-        }
-    }
-}
+# Processor configurations: see designs.py
 
 
 def log_message(message, also_print=True):
@@ -167,12 +174,8 @@ def update_status(status_data):
     This file can be checked to monitor progress.
     """
     with log_lock:
-        # Ensure directory exists
-        STATUS_FILE.parent.mkdir(parents=True, exist_ok=True)
-
-        # Write status file
-        with open(STATUS_FILE, 'w') as f:
-            json.dump(status_data, f, indent=2)
+        # Written atomically so readers never see a half-written file
+        write_json_atomic(STATUS_FILE, status_data)
 
 
 def load_status():
@@ -211,114 +214,265 @@ def check_gem5_executable():
     return False
 
 
+def init_worker(events):
+    """Pool initializer: give each worker the queue for job start events."""
+    global worker_events
+    worker_events = events
+
+
+def design_args(params):
+    """
+    a3_part4.py arguments that configure the O3 core for one design, built
+    from a3_part4.py's own argparse schema (see gem5_schema.py).
+    """
+    return option_args(params, load_schema(GEM5_SCRIPT))
+
+
+def sampling_args(job):
+    """a3_part4.py arguments for a SMARTS-sampled job (none for full runs)."""
+    sampling = job.get('sampling')
+    if not sampling:
+        return []
+    return [
+        "--smarts_period", str(sampling['period_insts']),
+        "--smarts_warmup", str(sampling['warmup_insts']),
+        "--smarts_window", str(sampling['window_insts'])
+    ]
+
+
+def truncation_args(job):
+    """a3_part4.py arguments for a job that may stop before the program exits."""
+    truncation = job.get('truncation')
+    if not truncation:
+        return []
+    args = [
+        "--max_insts", str(truncation['max_insts']),
+        "--converge_interval", str(truncation['interval_insts']),
+        "--converge_window", str(truncation['window']),
+        "--converge_tol", str(truncation['tolerance'])
+    ]
+    if truncation['converge']:
+        args.append("--converge")
+    return args
+
+
+def periodic_args(job):
+    """a3_part4.py arguments for a job with periodic stat dumps."""
+    periodic = job.get('periodic')
+    if not periodic:
+        return []
+    if periodic['period_ticks']:
+        return ["--stat_period_ticks", str(periodic['period_ticks'])]
+    return ["--stat_period_insts", str(periodic['period_insts'])]
+
+
+def build_gem5_command(job):
+    """Build the gem5 command line for a job, with all design parameters."""
+    # Use 'nice' to run gem5 at lower priority (nice value 10)
+    # This allows the main coordinator script to maintain higher priority
+    return [
+        "nice", "-n", "10",  # Run gem5 at lower priority
+        job['gem5_exec'],
+        str(job['gem5_script']),
+        job['workload'],
+        "-o", str(job['output_dir'])
+    ] + design_args(job['params']) + checkpoint_args(job) + sampling_args(job) + truncation_args(job) + periodic_args(job)
+
+
+def make_result(job, success, elapsed_time, returncode, **extra):
+    """Build the result dict reported for a finished (or skipped) job."""
+    output_dir = Path(job['output_dir'])
+    result = {
+        'name': f"{job['design_id']}/{job['workload']}",
+        'design_id': job['design_id'],
+        'design_name': job['design_name'],
+        'workload': job['workload'],
+        'success': success,
+        'elapsed_time': elapsed_time,
+        'output_dir': str(output_dir),
+        'log_file': str(output_dir / "simulation.log"),
+        'returncode': returncode
+    }
+    if job.get('sampling'):
+        result['sampling'] = job['sampling']
+    if job.get('truncation'):
+        result['truncation'] = job['truncation']
+    if job.get('periodic'):
+        result['periodic'] = job['periodic']
+    if job.get('restore_from'):
+        result['restarts'] = job['restarts']
+        result['restored_from_tick'] = job['restore_tick']
+    result.update(extra)
+    return result
+
+
 def run_simulation_worker(job):
     """
     Worker function to run a single gem5 simulation in a separate process.
     Takes a job dict and returns a result dict.
     """
-    design_id = job['design_id']
-    design_name = job['design_name']
-    workload_name = job['workload']
-    params = job['params']
-    gem5_exec = job['gem5_exec']
-    gem5_script = job['gem5_script']
+    name = f"{job['design_id']}/{job['workload']}"
     output_dir = Path(job['output_dir'])
 
     # Create output directory for this design and workload
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Build the command with all parameters
-    # Use 'nice' to run gem5 at lower priority (nice value 10)
-    # This allows the main coordinator script to maintain higher priority
-    cmd = [
-        "nice", "-n", "10",  # Run gem5 at lower priority
-        gem5_exec,
-        str(gem5_script),
-        workload_name,
-        "-o", str(output_dir),
-        "--fetch_width", str(params['fetch_width']),
-        "--decode_width", str(params['decode_width']),
-        "--rename_width", str(params['rename_width']),
-        "--dispatch_width", str(params['dispatch_width']),
-        "--issue_width", str(params['issue_width']),
-        "--commit_width", str(params['commit_width']),
-        "--fetch_buffer_size", str(params['fetch_buffer_size']),
-        "--fetch_queue_size", str(params['fetch_queue_size']),
-        "--num_iq_entries", str(params['num_iq_entries']),
-        "--fu_pool", params['fu_pool'],
-        "--num_rob_entries", str(params['num_rob_entries']),
-        "--lq_entries", str(params['lq_entries']),
-        "--sq_entries", str(params['sq_entries'])
-    ]
-
     # Log file for this simulation
     log_file = output_dir / "simulation.log"
 
     # Log start
-    log_message(f"STARTING: {design_id}/{workload_name}")
+    log_message(f"STARTING: {name}")
 
     # Run the simulation
     start_time = time.time()
 
     try:
-        with open(log_file, 'w') as log:
-            result = subprocess.run(
-                cmd,
-                stdout=log,
-                stderr=log,
-                text=True
-            )
+        # A failed or killed run is restarted from its latest checkpoint,
+        # appending to the same log
+        log_mode = 'a' if job.get('restore_from') else 'w'
+        while True:
+            with open(log_file, log_mode) as log:
+                process = subprocess.Popen(
+                    build_gem5_command(job),
+                    stdout=log,
+                    stderr=log,
+                    text=True
+                )
+                # Tell the coordinator the gem5 pid so it can watch its memory
+                if worker_events is not None:
+                    worker_events.put((name, start_time, process.pid))
+
+                # wait4 reaps gem5 and reports its peak RSS (KiB on Linux);
+                # 'nice' execs gem5 in place, so this is gem5's own usage
+                _, wait_status, usage = os.wait4(process.pid, 0)
+                process.returncode = os.waitstatus_to_exitcode(wait_status)
+
+            if process.returncode == 0:
+                if job.get('restore_from'):
+                    finish_restored_run(job)
+                break
+            tick = prepare_restart(job)
+            if tick is None:
+                break
+            log_message(f"RESTARTING: {name} (returncode: {process.returncode}) "
+                        f"from checkpoint at tick {tick}")
+            log_mode = 'a'
 
         elapsed_time = time.time() - start_time
 
-        success = result.returncode == 0
+        success = process.returncode == 0
 
         # Log completion
         if success:
-            log_message(f"COMPLETED: {design_id}/{workload_name} in {elapsed_time:.1f}s")
+            log_message(f"COMPLETED: {name} in {elapsed_time:.1f}s")
         else:
-            log_message(f"FAILED: {design_id}/{workload_name} (returncode: {result.returncode})")
-
-        return {
-            'name': f"{design_id}/{workload_name}",
-            'design_id': design_id,
-            'design_name': design_name,
-            'workload': workload_name,
-            'success': success,
-            'elapsed_time': elapsed_time,
-            'output_dir': str(output_dir),
-            'log_file': str(log_file),
-            'returncode': result.returncode
-        }
+            log_message(f"FAILED: {name} (returncode: {process.returncode})")
+
+        return make_result(job, success, elapsed_time, process.returncode,
+                           peak_rss_bytes=usage.ru_maxrss * 1024)
 
     except FileNotFoundError:
-        elapsed_time = time.time() - start_time
-        return {
-            'name': f"{design_id}/{workload_name}",
-            'design_id': design_id,
-            'design_name': design_name,
-            'workload': workload_name,
-            'success': False,
-            'elapsed_time': elapsed_time,
-            'output_dir': str(output_dir),
-            'log_file': str(log_file),
-            'returncode': -1,
-            'error': f"gem5 executable not found at {gem5_exec}"
-        }
+        return make_result(job, False, time.time() - start_time, -1,
+                           error=f"gem5 executable not found at {job['gem5_exec']}")
     except Exception as e:
-        elapsed_time = time.time() - start_time
-        return {
-            'name': f"{design_id}/{workload_name}",
-            'design_id': design_id,
-            'design_name': design_name,
-            'workload': workload_name,
-            'success': False,
-            'elapsed_time': elapsed_time,
-            'output_dir': str(output_dir),
-            'log_file': str(log_file) if 'log_file' in locals() else '',
-            'returncode': -1,
-            'error': str(e)
-        }
+        return make_result(job, False, time.time() - start_time, -1, error=str(e))
+
+
+def cached_result(job):
+    """Build the result dict for a job whose outputs were restored from the cache."""
+    return make_result(job, True, 0.0, 0, cached=True)
+
+
+def failed_result(job, error):
+    """Build the result dict for a job whose worker raised instead of returning."""
+    return make_result(job, False, 0.0, -1, error=str(error))
+
+
+def report_result(result):
+    """Print the outcome of a single simulation as soon as it is known."""
+    # Finished runs' outputs may have been compressed
+    stats_file = compression.resolve(Path(result['output_dir']) / "stats.txt")
+    log_file = compression.resolve(Path(result['log_file']))
+    if result.get('cached'):
+        print(f"✓ {result['name']} reused from cache")
+        print(f"  Stats: {stats_file}")
+    elif result.get('resumed'):
+        print(f"✓ {result['name']} already complete (resumed)")
+        print(f"  Stats: {stats_file}")
+    elif result['success']:
+        print(f"✓ {result['name']} completed in {result['elapsed_time']:.1f}s")
+        if result.get('restarts'):
+            print(f"  Restarted {result['restarts']}x, last from checkpoint at tick {result['restored_from_tick']}")
+        print(f"  Stats: {stats_file}")
+        print(f"  Log: {log_file}")
+    else:
+        print(f"✗ {result['name']} FAILED (return code: {result['returncode']})")
+        print(f"  Log: {log_file}")
+        if 'error' in result:
+            print(f"  Error: {result['error']}")
+
+
+def parse_completed_run(result, credits=None):
+    """
+    Parse a finished run's stats.txt right away and write its metrics to
+    metrics.json next to it, so analysis can start before the sweep ends.
+    """
+    output_dir = Path(result['output_dir'])
+    if result.get('sampling'):
+        metrics = extract_smarts_metrics(output_dir)
+        if metrics is None:
+            return None
+    elif result.get('truncation'):
+        metrics = extract_truncated_metrics(output_dir, load_roi_insts().get(result['workload']))
+        if metrics is None:
+            return None
+    elif result.get('periodic'):
+        metrics = extract_phase_metrics(output_dir)
+        if metrics is None:
+            return None
+    elif restored_inside_roi(output_dir):
+        # Its ROI dump covers only the part after the checkpoint
+        log_message(f"NOT PARSED: {result['name']} was restored from a checkpoint inside its ROI")
+        return None
+    else:
+        stats = extract_middle_stats(output_dir / "stats.txt", names=stat_paths())
+        if stats is None:
+            return None
+        metrics = compute_metrics([(result['design_id'], result['workload'], credits, stats)])[0]
+        del metrics['design'], metrics['workload']
+    write_json_atomic(output_dir / "metrics.json", metrics)
+    log_message(f"PARSED: {result['name']} (IPC={metrics['ipc']})")
+    return metrics
+
+
+def compress_run_outputs(output_dir, codec):
+    """Compress a finished run's outputs in place. Returns the bytes saved."""
+    try:
+        return compression.compress_outputs(output_dir, COMPRESSED_FILES, codec)
+    except OSError as e:
+        log_message(f"WARNING: could not compress outputs in {output_dir}: {e}")
+        return 0
+
+
+def remove_compressed_outputs(output_dir):
+    """
+    Before a run starts from tick 0, drop compressed outputs of an earlier
+    run in the same directory, so a failed run is never read as the old one.
+    """
+    for name in COMPRESSED_FILES:
+        for path in compression.variants(Path(output_dir) / name)[1:]:
+            path.unlink(missing_ok=True)
+
+
+def record_in_catalog(catalog, runs):
+    """Record (result, metrics) pairs in the results catalog in one transaction."""
+    if not runs:
+        return
+    try:
+        catalog.record_runs(runs)
+    except sqlite3.Error as e:
+        # The catalog is an index of the outputs; the sweep goes on without it
+        log_message(f"CATALOG: failed to record {len(runs)} runs: {e}")
 
 
 def print_configuration_summary():
@@ -328,37 +482,130 @@ def print_configuration_summary():
     print("=" * 80)
     print("\n| Design | ROB | LQ/SQ | FU Pool | Cost | Strategy |")
     print("|--------|-----|-------|---------|------|----------|")
-    print("| A | 64 | 8/8 | Extended | 820 | Baseline/Conservative |")
-    print("| B | 128 | 8/8 | Extended | 960 | ROB-Focused (2x ROB) |")
-    print("| C | 64 | 16/16 | Extended | 900 | LSQ-Focused (2x LQ/SQ) |")
-    print("| D | 64 | 8/8 | Aggressive | 1000 | FU-Focused (More ALUs) |")
-    print("\nAll designs use: Width=2 for all pipeline stages, FetchBuffer=64B, FetchQueue=16, IQ=32")
+    for design_id, config in PROCESSOR_CONFIGS.items():
+        params = config['params']
+        strategy = config['name'].split(" - ")[-1].split(" (")[0]
+        print(f"| {design_id.removeprefix('design_').upper()} | {params['num_rob_entries']} | "
+              f"{params['lq_entries']}/{params['sq_entries']} | {params['fu_pool'].capitalize()} | "
+              f"{config['credits']} | {strategy} |")
+    print(f"\nAll designs use: Width={FIXED_PARAMS['fetch_width']} for all pipeline stages, "
+          f"FetchBuffer={FIXED_PARAMS['fetch_buffer_size']}B, FetchQueue={FIXED_PARAMS['fetch_queue_size']}, "
+          f"IQ={FIXED_PARAMS['num_iq_entries']}")
+    print(f"Costs from the {DEFAULT_COST_MODEL} credit cost model (see cost_model.py)")
     print("=" * 80)
 
 
-def main():
-    """Run all Part 4 simulations."""
-
-    print("\n" + "=" * 80)
-    print("CSC368H1 Assignment 3 - Part 4 Out-of-Order Processor Simulations")
-    print("=" * 80)
-
-    # Check if gem5 script exists
-    if not GEM5_SCRIPT.exists():
-        print(f"\nERROR: gem5 script not found at {GEM5_SCRIPT}")
-        print("Please ensure a3_part4.py is in the gem5scripts/ directory")
-        return
-
-    # Check if gem5 executable exists
-    if not check_gem5_executable():
-        response = input("\nDo you want to continue anyway? (y/n): ")
-        if response.lower() != 'y':
-            return
-
-    # Print configuration summary
-    print_configuration_summary()
-
-    # Ask user which simulations to run
+def run_with_pool(jobs, admission, on_start, on_complete, on_poll):
+    """
+    Run jobs on a multiprocessing Pool, one worker process per slot.
+    Jobs are started in order as the admission controller allows;
+    on_start(name, started_at, pid) is called as each gem5 process starts,
+    on_complete(result, job) as each one finishes, and on_poll() whenever
+    COORDINATOR_POLL_SECONDS pass without a completion.
+    """
+    pool_size = max(1, min(admission.max_slots, len(jobs)))
+    print(f"Launching {pool_size}-worker pool...")
+
+    pending = list(jobs)
+    running = {}
+    completions = queue.Queue()
+    started_events = Queue()
+
+    with Pool(processes=pool_size, initializer=init_worker, initargs=(started_events,)) as pool:
+        while pending or running:
+            # Start every job that fits right now, longest first
+            for job in admission.admit(pending, running):
+                pending.remove(job)
+                running[job_name(job)] = job
+                pool.apply_async(run_simulation_worker, (job,), callback=completions.put,
+                                 error_callback=lambda e, job=job: completions.put(failed_result(job, e)))
+
+            # Handle each completion as it arrives, refreshing status.json
+            # (elapsed times, ETA) at least every COORDINATOR_POLL_SECONDS
+            try:
+                result = completions.get(timeout=COORDINATOR_POLL_SECONDS)
+            except queue.Empty:
+                result = None
+
+            while not started_events.empty():
+                name, started_at, pid = started_events.get()
+                on_start(name, started_at, pid)
+                if name in running:
+                    running[name]['pid'] = pid
+
+            if result is not None:
+                on_complete(result, running.pop(result['name']))
+            else:
+                on_poll()
+
+
+def parse_args():
+    """Parse command-line options for the runner."""
+    parser = argparse.ArgumentParser(description="Run the Part 4 gem5 simulation sweep")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="re-simulate every job instead of reusing cached results")
+    parser.add_argument('--parse-on-complete', action='store_true',
+                        help="parse each run's stats.txt into metrics.json as soon as it finishes")
+    parser.add_argument('--compress', choices=["none"] + list(compression.SUFFIXES), default=COMPRESS_CODEC,
+                        help=f"codec for each finished run's stats.txt, config and log (default: {COMPRESS_CODEC})")
+    parser.add_argument('--catalog', default=str(CATALOG_FILE),
+                        help="results catalog to record each finished run in")
+    parser.add_argument('--sweep', default=None,
+                        help="run the design points of a sweep spec (YAML or JSON, see sweep.py) "
+                             "instead of choosing designs interactively")
+    parser.add_argument('--max-parallel', type=int, default=MAX_PARALLEL_PROCESSES,
+                        help="upper bound on concurrent simulations (default: cores available)")
+    parser.add_argument('--engine', choices=["asyncio", "pool"], default="asyncio",
+                        help="run gem5 children from one asyncio coordinator, or from a "
+                             "multiprocessing Pool with one worker process per slot")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="stop any simulation running longer than this many seconds (asyncio engine)")
+    parser.add_argument('--resume', action='store_true',
+                        help="resume the last sweep recorded in the journal, re-running only "
+                             "jobs that did not finish or whose outputs are incomplete")
+    parser.add_argument('--gem5', default=None,
+                        help="gem5 executable to use instead of searching the usual locations "
+                             "(e.g. scripts/fake_gem5.py to exercise the runner)")
+    parser.add_argument('--checkpoint-ticks', type=int, default=0,
+                        help="take a gem5 checkpoint every this many simulated ticks (0: never)")
+    parser.add_argument('--checkpoint-insts', type=int, default=0,
+                        help="take a gem5 checkpoint every this many committed instructions (0: never)")
+    parser.add_argument('--checkpoint-keep', type=int, default=CHECKPOINT_KEEP,
+                        help="number of most recent checkpoints each run keeps")
+    parser.add_argument('--max-restarts', type=int, default=MAX_RESTARTS,
+                        help="restart a failed or killed run from its latest checkpoint up to this many times")
+    parser.add_argument('--smarts-period', type=int, default=0,
+                        help="SMARTS-sample each run: measure one window every this many committed "
+                             "instructions, fast-forwarding on an atomic CPU in between (0: full detailed runs)")
+    parser.add_argument('--smarts-warmup', type=int, default=SMARTS_WARMUP_INSTS,
+                        help="detailed warmup instructions before each SMARTS window")
+    parser.add_argument('--smarts-window', type=int, default=SMARTS_WINDOW_INSTS,
+                        help="instructions measured in each SMARTS window")
+    parser.add_argument('--max-insts', type=int, default=0,
+                        help="stop each run after this many committed instructions and extrapolate "
+                             "its ROI metrics (0: no limit)")
+    parser.add_argument('--converge', action='store_true',
+                        help="stop each run once its IPC stabilizes (see --converge-tol) and "
+                             "extrapolate its ROI metrics")
+    parser.add_argument('--converge-interval', type=int, default=CONVERGE_INTERVAL_INSTS,
+                        help="committed instructions between stat dumps of truncated runs")
+    parser.add_argument('--converge-window', type=int, default=CONVERGE_WINDOW,
+                        help="number of recent intervals whose IPC must agree to stop")
+    parser.add_argument('--converge-tol', type=float, default=CONVERGE_TOLERANCE,
+                        help="relative IPC spread of the recent intervals that counts as converged")
+    parser.add_argument('--stat-period-ticks', type=int, default=0,
+                        help="also dump stats every this many ticks, for phase analysis "
+                             "(see data/CSV/stat_timeseries.py)")
+    parser.add_argument('--stat-period-insts', type=int, default=0,
+                        help="also dump stats every this many committed instructions, for phase analysis")
+    return parser.parse_args()
+
+
+def select_simulations():
+    """
+    Ask the user which simulations to run.
+    Returns (designs, workloads), or None if nothing valid was selected.
+    """
     print("\n" + "=" * 80)
     print("SIMULATION OPTIONS")
     print("=" * 80)
@@ -380,7 +627,7 @@ def main():
         designs_to_run = [d for d in selected if d in PROCESSOR_CONFIGS]
         if not designs_to_run:
             print("No valid designs selected. Exiting.")
-            return
+            return None
 
     elif choice == "3":
         print(f"\nAvailable workloads: {', '.join(WORKLOADS)}")
@@ -388,104 +635,354 @@ def main():
         workloads_to_run = [w for w in selected if w in WORKLOADS]
         if not workloads_to_run:
             print("No valid workloads selected. Exiting.")
-            return
+            return None
 
     elif choice == "4":
         designs_to_run = ["design_a"]
         workloads_to_run = ["basicmath"]
         print("\nRunning test: design_a × basicmath")
 
+    return designs_to_run, workloads_to_run
+
+
+def main():
+    """Run all Part 4 simulations."""
+    args = parse_args()
+
+    print("\n" + "=" * 80)
+    print("CSC368H1 Assignment 3 - Part 4 Out-of-Order Processor Simulations")
+    print("=" * 80)
+
+    # Check if gem5 script exists
+    if not GEM5_SCRIPT.exists():
+        print(f"\nERROR: gem5 script not found at {GEM5_SCRIPT}")
+        print("Please ensure a3_part4.py is in the gem5scripts/ directory")
+        return
+
+    # Check if gem5 executable exists
+    global GEM5_EXECUTABLE
+    if args.gem5:
+        GEM5_EXECUTABLE = str(Path(args.gem5).resolve())
+    elif not check_gem5_executable():
+        response = input("\nDo you want to continue anyway? (y/n): ")
+        if response.lower() != 'y':
+            return
+
+    # Sampled runs switch CPUs, which a3_part4.py does not combine with
+    # periodic checkpoints
+    if args.smarts_period and (args.checkpoint_ticks or args.checkpoint_insts):
+        print("\nERROR: --smarts-period cannot be combined with --checkpoint-ticks/--checkpoint-insts")
+        return
+    truncated = args.max_insts > 0 or args.converge
+    if truncated and (args.smarts_period or args.checkpoint_ticks or args.checkpoint_insts):
+        print("\nERROR: --max-insts/--converge cannot be combined with --smarts-period or checkpoints")
+        return
+    periodic = args.stat_period_ticks > 0 or args.stat_period_insts > 0
+    if periodic and (args.smarts_period or truncated or args.checkpoint_ticks or args.checkpoint_insts):
+        print("\nERROR: --stat-period-ticks/--stat-period-insts cannot be combined with sampling, "
+              "truncation or checkpoints")
+        return
+    if args.stat_period_ticks and args.stat_period_insts:
+        print("\nERROR: use either --stat-period-ticks or --stat-period-insts")
+        return
+    if args.smarts_period and args.smarts_period < args.smarts_warmup + args.smarts_window:
+        print("\nERROR: --smarts-period must cover --smarts-warmup plus --smarts-window")
+        return
+    if args.compress != "none" and args.compress not in compression.available_codecs():
+        print(f"\nERROR: --compress {args.compress} needs the zstandard package (pip install zstandard)")
+        return
+
+    # Print configuration summary
+    print_configuration_summary()
+
+    # Decide which simulations to run: the interrupted sweep from the
+    # journal, the points of a sweep spec, or ask the user
+    job_states = {}
+    designs = all_designs()
+    if args.resume:
+        sweep, job_states = last_sweep(JOURNAL_FILE)
+        if sweep is None:
+            print(f"\nNo sweep to resume in {JOURNAL_FILE}")
+            return
+        designs_to_run = [d for d in sweep['designs'] if d in designs]
+        workloads_to_run = [w for w in sweep['workloads']
+                            if w in WORKLOADS or w in SMALL_WORKLOADS.values()]
+        print(f"\nResuming sweep started {sweep['time']}")
+    elif args.sweep:
+        spec = load_spec(args.sweep)
+        try:
+            sweep_designs, report = expand(spec)
+        except ValueError as e:
+            print(f"\nERROR: {args.sweep}: {e}")
+            return
+        workloads_to_run = spec.get('workloads', WORKLOADS)
+        unknown = [w for w in workloads_to_run if w not in WORKLOADS and w not in SMALL_WORKLOADS.values()]
+        if unknown:
+            print(f"\nERROR: {args.sweep}: unknown workloads {', '.join(unknown)}")
+            return
+        print(f"\nSweep {spec['name']}: {report['designs']} design points")
+        if report['generated']:
+            print(f"  from {report['generated']} generated ({report['rejected']} rejected by constraints, "
+                  f"{report['duplicates']} duplicates merged)")
+        print(f"Saved to {save_sweep(spec, sweep_designs)}")
+        designs.update({d: c for d, c in sweep_designs.items() if d not in PROCESSOR_CONFIGS})
+        designs_to_run = list(sweep_designs)
+    else:
+        selection = select_simulations()
+        if selection is None:
+            return
+        designs_to_run, workloads_to_run = selection
+
     # Create base data directory
     DATA_DIR.mkdir(parents=True, exist_ok=True)
 
     # Build list of all simulation jobs
     jobs = []
     for design_id in designs_to_run:
-        design_config = PROCESSOR_CONFIGS[design_id]
+        design_config = designs[design_id]
         for workload in workloads_to_run:
             output_dir = DATA_DIR / design_id / workload
+            if args.smarts_period:
+                output_dir = output_dir / SMARTS_SUBDIR
+            elif truncated:
+                output_dir = output_dir / TRUNCATED_SUBDIR
+            elif periodic:
+                output_dir = output_dir / PHASES_SUBDIR
             job = {
                 'design_id': design_id,
                 'design_name': design_config['name'],
                 'workload': workload,
                 'params': design_config['params'],
+                'credits': design_config.get('credits'),
                 'gem5_exec': GEM5_EXECUTABLE,
                 'gem5_script': str(GEM5_SCRIPT),
-                'output_dir': str(output_dir)
+                'output_dir': str(output_dir),
+                'checkpoint_ticks': args.checkpoint_ticks,
+                'checkpoint_insts': args.checkpoint_insts,
+                'checkpoint_keep': args.checkpoint_keep,
+                'max_restarts': args.max_restarts
             }
+            if args.smarts_period:
+                job['sampling'] = {
+                    'period_insts': args.smarts_period,
+                    'warmup_insts': args.smarts_warmup,
+                    'window_insts': args.smarts_window
+                }
+            if truncated:
+                job['truncation'] = {
+                    'max_insts': args.max_insts,
+                    'converge': args.converge,
+                    'interval_insts': args.converge_interval,
+                    'window': args.converge_window,
+                    'tolerance': args.converge_tol
+                }
+            if periodic:
+                job['periodic'] = {
+                    'period_ticks': args.stat_period_ticks,
+                    'period_insts': args.stat_period_insts
+                }
             jobs.append(job)
 
     total_simulations = len(jobs)
 
+    journal = JobJournal(JOURNAL_FILE)
+    catalog = ResultsCatalog(args.catalog)
+    journal.begin_sweep(designs_to_run, workloads_to_run, [job_name(job) for job in jobs])
+
+    # On --resume, keep the outputs of jobs that finished before the sweep
+    # was interrupted and re-run the rest (never started, killed mid-run,
+    # failed, or with a truncated stats.txt)
+    resumed_jobs = []
+    resumed_results = []
+    if args.resume:
+        pending = []
+        for job in jobs:
+            name = job_name(job)
+            action = classify_for_resume(name, job['output_dir'], job_states.get(name))
+            if action == "done":
+                resumed_jobs.append(job)
+                resumed_results.append(make_result(job, True, 0.0, 0, resumed=True))
+                state = (job_states.get(name) or {}).get("state")
+                if state in ("queued", "started"):
+                    # gem5 finished after the coordinator died: finish the
+                    # job's bookkeeping now
+                    journal.record(name, "completed", returncode=0)
+                    remove_checkpoints(job['output_dir'])
+                    if args.compress != "none":
+                        compress_run_outputs(job['output_dir'], args.compress)
+                else:
+                    journal.record(name, "resumed")
+            elif action == "running":
+                print(f"WARNING: {name} is still running (pid {job_states[name]['pid']}) "
+                      f"from the interrupted sweep; not restarting it")
+                total_simulations -= 1
+            else:
+                pending.append(job)
+        jobs = pending
+        print(f"Resume: {len(resumed_jobs)} already complete, {len(jobs)} to (re-)run")
+
+    # Reuse the outputs of identical earlier runs from the result cache
+    cache = None
+    cached_jobs = []
+    cached_results = []
+    if not args.no_cache:
+        cache = ResultCache(RESULT_CACHE_DIR, RESULT_CACHE_MAX_BYTES)
+        pending = []
+        for job in jobs:
+            job['cache_key'], job['cache_inputs'] = compute_cache_key(job, WORKLOADS_DIR)
+            if cache.restore(job['cache_key'], job['output_dir']):
+                cached_jobs.append(job)
+                cached_results.append(cached_result(job))
+                journal.record(job_name(job), "cached")
+                log_message(f"CACHED: {job['design_id']}/{job['workload']}")
+            else:
+                pending.append(job)
+        jobs = pending
+
+    # Runs interrupted mid-sweep continue from their latest checkpoint on
+    # --resume; everything else starts from tick 0 without stale checkpoints
+    for job in jobs:
+        tick = restore_latest(job) if args.resume else None
+        if tick is not None:
+            log_message(f"RESUMING: {job_name(job)} from checkpoint at tick {tick}")
+        else:
+            clear_restart_state(job['output_dir'])
+            remove_compressed_outputs(job['output_dir'])
+
+    # Size concurrency from the host: at most one simulation per core, and
+    # each one is only started once it fits in the memory left
+    admission = AdmissionController(load_footprints(DATA_DIR, FOOTPRINTS_FILE), max_slots=args.max_parallel)
+    workers = admission.concurrency_estimate([job['workload'] for job in jobs])
+
+    # Order jobs longest-first using run times from previous sweeps, so the
+    # multi-hour runs (basicmath) start first and short ones fill the gaps
+    runtime_history = load_runtime_history(DATA_DIR)
+    submission_order = jobs
+    jobs = order_longest_first(submission_order, runtime_history)
+    predicted_unordered = predict_makespan([job['estimated_seconds'] for job in submission_order], workers)
+    predicted_makespan = predict_makespan([job['estimated_seconds'] for job in jobs], workers)
+
     print(f"\n" + "=" * 80)
-    print(f"Starting {total_simulations} simulations in parallel (max {MAX_PARALLEL_PROCESSES} at a time)...")
+    print(f"Starting {len(jobs)} simulations in parallel (up to {admission.max_slots} at a time, "
+          f"~{workers} expected to fit in memory)...")
     print(f"Designs: {', '.join(designs_to_run)}")
     print(f"Workloads: {', '.join(workloads_to_run)}")
-    print(f"CPU cores available: {cpu_count()}")
+    if cache is not None:
+        print(f"Result cache: {cache.summary()}")
+    print(f"CPU cores available: {cpu_count()} (usable: {admission.max_slots})")
+    print(f"Memory available for simulations: {admission.free_memory() / 1024 ** 3:.1f} GiB")
+    print(f"Run time estimates from {len(runtime_history)} previous runs (longest-first order)")
+    print(f"Predicted makespan: {predicted_makespan:.1f}s (design x workload order: {predicted_unordered:.1f}s)")
     print("=" * 80)
 
     start_time = datetime.now()
 
-    # Initialize status tracking
-    initial_status = {
-        "start_time": start_time.isoformat(),
-        "total_simulations": total_simulations,
-        "completed": 0,
-        "failed": 0,
-        "in_progress": total_simulations,
-        "designs": designs_to_run,
-        "workloads": workloads_to_run,
-        "simulations": {}
-    }
-    update_status(initial_status)
-    log_message(f"Starting {total_simulations} simulations with {MAX_PARALLEL_PROCESSES} workers")
+    # Initialize status tracking (cached and resumed runs are already complete)
+    tracker = SweepStatus(resumed_jobs + cached_jobs + jobs, workers,
+                          designs_to_run, workloads_to_run, predicted_makespan)
+    for result in resumed_results:
+        tracker.mark_cached(result['name'], state="resumed")
+    for result in cached_results:
+        tracker.mark_cached(result['name'])
+    for job in jobs:
+        journal.record(job_name(job), "queued")
+    update_status(tracker.snapshot())
+    log_message(f"Starting {len(jobs)} simulations with up to {admission.max_slots} workers "
+                f"(predicted makespan {predicted_makespan:.1f}s)")
 
-    # Run simulations in parallel using multiprocessing Pool
-    print(f"\nLaunching {MAX_PARALLEL_PROCESSES}-worker pool...")
     print(f"Monitor progress: tail -f {MASTER_LOG_FILE}")
     print(f"Check status: cat {STATUS_FILE}\n")
 
-    with Pool(processes=MAX_PARALLEL_PROCESSES) as pool:
-        # Use map to run all jobs
-        results = pool.map(run_simulation_worker, jobs)
+    # Cached and resumed runs are recorded too; without --parse-on-complete
+    # (metrics None) the catalog keeps the stats it already has for them
+    done_runs = []
+    for result, job in zip(resumed_results + cached_results, resumed_jobs + cached_jobs):
+        report_result(result)
+        metrics = parse_completed_run(result, job.get('credits')) if args.parse_on_complete else None
+        if metrics is not None:
+            tracker.set_metrics(result['name'], metrics)
+        done_runs.append((result, metrics))
+    record_in_catalog(catalog, done_runs)
+
+    results = resumed_results + cached_results
+
+    def handle_start(name, started_at, pid):
+        """Record a gem5 process as soon as it starts."""
+        journal.record(name, "started", pid=pid)
+        tracker.mark_started(name, started_at)
+
+    def handle_completion(result, job):
+        """Record a finished job as soon as it completes."""
+        journal.record(result['name'], "completed" if result['success'] else "failed",
+                       returncode=result['returncode'], elapsed_seconds=result['elapsed_time'],
+                       restarts=result.get('restarts', 0))
+        results.append(result)
+        tracker.mark_finished(result)
+        admission.record(result['workload'], result.get('peak_rss_bytes'))
+
+        metrics = None
+        if result['success']:
+            remove_checkpoints(result['output_dir'])
+            if args.compress != "none":
+                saved = compress_run_outputs(result['output_dir'], args.compress)
+                log_message(f"COMPRESSED: {result['name']} ({args.compress}, {saved / 1024 ** 2:.1f} MiB saved)")
+            # Restored runs only approximate an uninterrupted one (gem5 does
+            # not checkpoint stats), so they are not cached
+            if cache is not None and not result.get('restarts'):
+                # Labelled by output directory: full, SMARTS, truncated and
+                # periodic runs of one design/workload are separate entries
+                label = Path(job['output_dir']).relative_to(DATA_DIR).as_posix()
+                cache.store(job['cache_key'], label, job['cache_inputs'], job['output_dir'])
+            if args.parse_on_complete:
+                metrics = parse_completed_run(result, job.get('credits'))
+                if metrics is not None:
+                    tracker.set_metrics(result['name'], metrics)
+        # Reported once compressed, so the printed stats path exists
+        report_result(result)
+        record_in_catalog(catalog, [(result, metrics)])
+
+        update_status(tracker.snapshot())
+
+    if args.engine == "asyncio":
+        print(f"Launching asyncio orchestrator (up to {admission.max_slots} concurrent simulations)...")
+        orchestrator = AsyncOrchestrator(
+            admission, build_gem5_command, make_result, log_message,
+            timeout=args.timeout,
+            poll_seconds=COORDINATOR_POLL_SECONDS,
+            on_start=handle_start,
+            on_complete=handle_completion,
+            on_poll=lambda: update_status(tracker.snapshot())
+        )
+        try:
+            orchestrator.run_sync(jobs)
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            log_message("Sweep cancelled; running simulations were stopped")
+    else:
+        run_with_pool(jobs, admission, handle_start, handle_completion,
+                      lambda: update_status(tracker.snapshot()))
+
+    admission.save(FOOTPRINTS_FILE)
+    catalog.close()
 
     end_time = datetime.now()
     wall_time = (end_time - start_time).total_seconds()
 
     # Process results
-    successful = []
-    failed = []
-    total_sim_time = 0
-
-    for result in results:
-        total_sim_time += result['elapsed_time']
-        if result['success']:
-            successful.append(result['name'])
-            print(f"✓ {result['name']} completed in {result['elapsed_time']:.1f}s")
-            print(f"  Stats: {result['output_dir']}/stats.txt")
-            print(f"  Log: {result['log_file']}")
-        else:
-            failed.append(result['name'])
-            print(f"✗ {result['name']} FAILED (return code: {result['returncode']})")
-            print(f"  Log: {result['log_file']}")
-            if 'error' in result:
-                print(f"  Error: {result['error']}")
+    successful = [result['name'] for result in results if result['success']]
+    failed = [result['name'] for result in results if not result['success']]
+    total_sim_time = sum(result['elapsed_time'] for result in results)
 
     # Update final status
-    final_status = {
-        "start_time": start_time.isoformat(),
+    final_status = tracker.snapshot()
+    final_status.update({
         "end_time": end_time.isoformat(),
-        "total_simulations": total_simulations,
-        "completed": len(successful),
-        "failed": len(failed),
-        "in_progress": 0,
         "wall_time_seconds": wall_time,
         "total_sim_time_seconds": total_sim_time,
-        "designs": designs_to_run,
-        "workloads": workloads_to_run,
         "successful_simulations": successful,
-        "failed_simulations": failed
-    }
+        "failed_simulations": failed,
+        "cache_hits": cache.hits if cache is not None else 0,
+        "cache_misses": cache.misses if cache is not None else 0
+    })
     update_status(final_status)
     log_message(f"All simulations complete: {len(successful)} successful, {len(failed)} failed")
 
@@ -496,12 +993,14 @@ def main():
     print(f"\nTotal simulations: {total_simulations}")
     print(f"Successful: {len(successful)}")
     print(f"Failed: {len(failed)}")
+    if cache is not None:
+        print(f"Result cache: {cache.summary()}")
     print(f"\nTotal simulation time: {total_sim_time:.1f}s")
-    print(f"Wall clock time: {wall_time:.1f}s")
+    print(f"Wall clock time: {wall_time:.1f}s (predicted makespan: {predicted_makespan:.1f}s)")
     print(f"Average time per simulation: {total_sim_time/max(len(successful), 1):.1f}s")
     if total_sim_time > 0 and wall_time > 0:
         speedup = total_sim_time / wall_time
-        print(f"Parallel speedup: {speedup:.2f}x (efficiency: {(speedup/MAX_PARALLEL_PROCESSES)*100:.1f}%)")
+        print(f"Parallel speedup: {speedup:.2f}x (efficiency: {(speedup/workers)*100:.1f}%)")
 
     if successful:
         print("\n✓ Successful simulations:")
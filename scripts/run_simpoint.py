@@ -0,0 +1,188 @@
+"""
+run_simpoint.py
+SimPoint sampling pipeline for the Part 4 designs
+
+Instead of simulating every workload end to end on each O3 design, this
+simulates a handful of representative intervals per workload:
+1. Profile: one AtomicSimpleCPU run per workload collects basic-block
+   vectors (a3_part4.py --simpoint_profile)
+2. Cluster: k-means over the BBVs picks representative intervals and their
+   weights (simpoint.py)
+3. Checkpoint: a second atomic run checkpoints the start of each interval,
+   minus its warmup (a3_part4.py --simpoint_checkpoints)
+4. Simulate: for every design, each checkpoint is restored into the O3 core,
+   warmed up and one interval measured (a3_part4.py --restore_simpoint)
+
+Steps 1-3 do not depend on the design and are done once per workload.
+Outputs that already exist are reused unless --force is given.
+Weighted whole-program IPC is then rebuilt by:
+  python3 data/CSV/parse_sampled.py simpoint
+
+Layout:
+  data/simpoint/profiles/<workload>/simpoint.bb.gz, simpoints.json, checkpoints/
+  data/simpoint/<design>/<workload>/sp_<id>/stats.txt, simpoint_window.json
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import run_part4_sim
+from admission import available_cores
+from run_part4_sim import (GEM5_SCRIPT, PROCESSOR_CONFIGS, PROJECT_ROOT, WORKLOADS,
+                           check_gem5_executable, design_args)
+from simpoint import (DEFAULT_INTERVAL_INSTS, DEFAULT_WARMUP_INSTS, MAX_K, add_start_points,
+                      pick_simpoints, read_bbv, write_simpoints)
+
+
+SIMPOINT_DIR = PROJECT_ROOT / "data" / "simpoint"
+PROFILE_DIR = SIMPOINT_DIR / "profiles"
+
+
+def gem5_command(gem5_exec, out_dir, workload, extra_args):
+    """gem5 command line writing all of its output (stats, BBVs) to out_dir."""
+    return [
+        "nice", "-n", "10",
+        gem5_exec,
+        f"--outdir={out_dir}",
+        str(GEM5_SCRIPT),
+        workload,
+        "-o", str(out_dir)
+    ] + extra_args
+
+
+def run_gem5(cmd, out_dir, label):
+    """Run one gem5 invocation, logging to simulation.log. Returns success."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start_time = time.time()
+    with open(out_dir / "simulation.log", 'w') as log:
+        returncode = subprocess.run(cmd, stdout=log, stderr=log).returncode
+    elapsed_time = time.time() - start_time
+
+    if returncode == 0:
+        print(f"✓ {label} ({elapsed_time:.1f}s)")
+    else:
+        print(f"✗ {label} FAILED (return code: {returncode})")
+        print(f"  Log: {out_dir / 'simulation.log'}")
+    return returncode == 0
+
+
+def prepare_workload(gem5_exec, workload, interval, warmup, max_k, force):
+    """
+    Profile, cluster and checkpoint one workload (design independent).
+    Returns its simpoints, or None if a step failed.
+    """
+    profile_dir = PROFILE_DIR / workload
+    bbv_file = profile_dir / "simpoint.bb.gz"
+    simpoints_file = profile_dir / "simpoints.json"
+    checkpoint_dir = profile_dir / "checkpoints"
+
+    if force or not bbv_file.exists():
+        cmd = gem5_command(gem5_exec, profile_dir, workload,
+                           ["--simpoint_profile", "--simpoint_interval", str(interval)])
+        if not run_gem5(cmd, profile_dir, f"{workload}: BBV profile"):
+            return None
+
+    if force or not simpoints_file.exists():
+        bbv = read_bbv(bbv_file)
+        simpoints, scores = pick_simpoints(bbv, max_k=max_k)
+        add_start_points(simpoints, interval, warmup)
+        write_simpoints(simpoints_file, simpoints, interval, len(bbv), scores, source=bbv_file)
+        # Checkpoints of a previous clustering are for different intervals
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+        print(f"✓ {workload}: {len(bbv)} intervals -> {len(simpoints)} simpoints")
+
+    with open(simpoints_file, 'r') as f:
+        simpoints = json.load(f)['simpoints']
+
+    missing = [sp for sp in simpoints if not (checkpoint_dir / f"cpt.simpoint_{sp['id']:02d}").is_dir()]
+    if force or missing:
+        cmd = gem5_command(gem5_exec, profile_dir / "checkpointing", workload,
+                           ["--simpoint_checkpoints", str(simpoints_file),
+                            "--checkpoint_dir", str(checkpoint_dir)])
+        if not run_gem5(cmd, profile_dir / "checkpointing", f"{workload}: simpoint checkpoints"):
+            return None
+
+    return simpoints
+
+
+def simulate_simpoint(gem5_exec, design_id, workload, simpoint, interval, force):
+    """Restore one simpoint checkpoint into a design's O3 core and measure it."""
+    out_dir = SIMPOINT_DIR / design_id / workload / f"sp_{simpoint['id']:02d}"
+    window_file = out_dir / "simpoint_window.json"
+    simpoints_file = PROFILE_DIR / workload / "simpoints.json"
+    # Reuse a measurement unless the workload was re-clustered since
+    if (not force and window_file.exists()
+            and window_file.stat().st_mtime >= simpoints_file.stat().st_mtime):
+        return True
+
+    checkpoint = PROFILE_DIR / workload / "checkpoints" / f"cpt.simpoint_{simpoint['id']:02d}"
+    cmd = gem5_command(gem5_exec, out_dir, workload,
+                       ["--restore_simpoint", str(checkpoint),
+                        "--simpoint_interval", str(interval),
+                        "--simpoint_warmup", str(simpoint['warmup_insts'])]
+                       + design_args(PROCESSOR_CONFIGS[design_id]['params']))
+    return run_gem5(cmd, out_dir, f"{design_id}/{workload} simpoint {simpoint['id']} "
+                                  f"(weight {simpoint['weight']:.3f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Part 4 designs on SimPoint intervals")
+    parser.add_argument('--designs', nargs='+', default=list(PROCESSOR_CONFIGS),
+                        choices=list(PROCESSOR_CONFIGS))
+    parser.add_argument('--workloads', nargs='+', default=WORKLOADS)
+    parser.add_argument('--interval', type=int, default=DEFAULT_INTERVAL_INSTS,
+                        help="instructions per interval")
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP_INSTS,
+                        help="detailed warmup instructions before each measured interval")
+    parser.add_argument('--max-k', type=int, default=MAX_K,
+                        help="most simpoints (detailed simulations) per workload and design")
+    parser.add_argument('--max-parallel', type=int, default=None,
+                        help="concurrent gem5 processes (default: cores available)")
+    parser.add_argument('--gem5', default=None, help="gem5 executable to use")
+    parser.add_argument('--force', action='store_true', help="redo steps whose outputs already exist")
+    args = parser.parse_args()
+
+    # check_gem5_executable() updates run_part4_sim.GEM5_EXECUTABLE if it finds gem5
+    if args.gem5:
+        gem5_exec = str(Path(args.gem5).resolve())
+    else:
+        check_gem5_executable()
+        gem5_exec = run_part4_sim.GEM5_EXECUTABLE
+
+    workers = args.max_parallel or available_cores()
+    print("\n" + "=" * 80)
+    print(f"SimPoint sampling: {len(args.designs)} designs x {len(args.workloads)} workloads, "
+          f"{args.interval:,}-instruction intervals, {args.warmup:,} warmup, up to {workers} in parallel")
+    print("=" * 80)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        prepared = pool.map(lambda w: prepare_workload(gem5_exec, w, args.interval, args.warmup,
+                                                       args.max_k, args.force), args.workloads)
+        simpoints = dict(zip(args.workloads, prepared))
+
+        runs = []
+        for design_id in args.designs:
+            for workload in args.workloads:
+                for simpoint in simpoints[workload] or []:
+                    runs.append(pool.submit(simulate_simpoint, gem5_exec, design_id, workload,
+                                            simpoint, args.interval, args.force))
+        succeeded = sum(1 for run in runs if run.result())
+
+    skipped = [w for w in args.workloads if simpoints[w] is None]
+    print("\n" + "=" * 80)
+    print(f"Detailed interval simulations: {succeeded}/{len(runs)} succeeded")
+    if skipped:
+        print(f"Workloads without simpoints (profiling failed): {', '.join(skipped)}")
+    print(f"Data saved to: {SIMPOINT_DIR}/")
+    print("Weighted IPC: python3 data/CSV/parse_sampled.py simpoint")
+    print("=" * 80 + "\n")
+
+
+if __name__ == "__main__":
+    main()
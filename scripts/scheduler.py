@@ -0,0 +1,137 @@
+"""
+scheduler.py
+Longest-job-first scheduling for the Part 4 simulation sweep
+
+Run times of the Part 4 jobs differ by two orders of magnitude (basicmath
+takes ~17,000 host-seconds, susan_corners ~110s). Dispatching them in
+design x workload order can leave a single basicmath run going alone at the
+end of the sweep while the other workers sit idle. This module estimates
+each job's run time from the hostSeconds recorded in previous stats.txt
+files and orders the queue longest-first, so the long runs start early and
+the short ones fill in the gaps.
+"""
+
+import heapq
+import sys
+from pathlib import Path
+
+# The shared stats parser (and its compressed-file readers) lives in data/gem5stats
+sys.path.insert(0, str(Path(__file__).parent.parent / "data"))
+from gem5stats import compression
+
+
+# Fallback run time estimates (host-seconds) for workloads without any
+# previous stats.txt. Taken from the design_a sweep on the course VM.
+DEFAULT_WORKLOAD_SECONDS = {
+    "basicmath": 17300.0,
+    "bitcounts": 2550.0,
+    "qsort": 2500.0,
+    "susan_edges": 285.0,
+    "susan_corners": 110.0,
+    "susan_smoothing": 1950.0,
+    "jpeg_encode": 480.0,
+    "jpeg_decode": 120.0,
+    "dijkstra": 1660.0,
+    # Small-input proxies: the large-input times scaled by MiBench's
+    # small/large instruction count ratio
+    "basicmath_small": 750.0,
+    "bitcounts_small": 170.0,
+    "qsort_small": 150.0,
+    "susan_edges_small": 17.0,
+    "susan_corners_small": 7.0,
+    "susan_smoothing_small": 150.0,
+    "jpeg_encode_small": 130.0,
+    "jpeg_decode_small": 36.0,
+    "dijkstra_small": 400.0
+}
+
+# Estimate used when a workload has neither history nor a default
+UNKNOWN_WORKLOAD_SECONDS = max(DEFAULT_WORKLOAD_SECONDS.values())
+
+
+def read_host_seconds(stats_file):
+    """
+    Return the total host-seconds recorded in a gem5 stats.txt file.
+
+    hostSeconds is reset along with the other stats at every dump, so the
+    run time of the whole simulation is the sum over all dumps.
+    Returns None if the file is missing or has no hostSeconds entry.
+    """
+    total = None
+    try:
+        with compression.open_text(stats_file) as f:
+            for line in f:
+                if line.startswith("hostSeconds"):
+                    parts = line.split()
+                    if len(parts) >= 2:
+                        total = (total or 0.0) + float(parts[1])
+    except (OSError, ValueError):
+        return None
+    return total
+
+
+def load_runtime_history(data_dir):
+    """
+    Scan <data_dir>/<design>/<workload>/stats.txt for past run times.
+    Returns a dict of (design_id, workload) -> host-seconds.
+    """
+    history = {}
+    data_dir = Path(data_dir)
+    if not data_dir.exists():
+        return history
+
+    for stats_file in compression.glob(data_dir, "*/*/stats.txt"):
+        seconds = read_host_seconds(stats_file)
+        if seconds is not None:
+            workload = stats_file.parent.name
+            design_id = stats_file.parent.parent.name
+            history[(design_id, workload)] = seconds
+    return history
+
+
+def estimate_runtime(design_id, workload, history):
+    """
+    Estimate the run time of a single job in host-seconds.
+
+    Uses, in order of preference:
+    1. The previous run of the same design and workload
+    2. The mean of previous runs of the workload on other designs
+    3. DEFAULT_WORKLOAD_SECONDS
+    """
+    if (design_id, workload) in history:
+        return history[(design_id, workload)]
+
+    same_workload = [s for (d, w), s in history.items() if w == workload]
+    if same_workload:
+        return sum(same_workload) / len(same_workload)
+
+    return DEFAULT_WORKLOAD_SECONDS.get(workload, UNKNOWN_WORKLOAD_SECONDS)
+
+
+def order_longest_first(jobs, history):
+    """
+    Annotate each job with 'estimated_seconds' and return a new list sorted
+    longest-first. Ties keep their original (design x workload) order.
+    """
+    for job in jobs:
+        job['estimated_seconds'] = estimate_runtime(job['design_id'], job['workload'], history)
+    return sorted(jobs, key=lambda job: -job['estimated_seconds'])
+
+
+def predict_makespan(durations, workers):
+    """
+    Predict the wall-clock time of running jobs with the given durations in
+    list order on a number of slots, where each slot that frees up starts
+    the next queued job. This is how the asyncio orchestrator dispatches
+    when every job fits in memory; workers should then be the concurrency
+    admission control expects (AdmissionController.concurrency_estimate).
+    Jobs admission control holds back or backfills out of order make the
+    real makespan differ. The pool engine with chunksize=1 behaves the same.
+    """
+    if not durations:
+        return 0.0
+    finish_times = [0.0] * max(1, min(workers, len(durations)))
+    for duration in durations:
+        start = heapq.heappop(finish_times)
+        heapq.heappush(finish_times, start + duration)
+    return max(finish_times)
@@ -0,0 +1,308 @@
+"""
+simpoint.py
+SimPoint-style selection of representative simulation intervals
+
+A profiling run of a3_part4.py (--simpoint_profile, AtomicSimpleCPU) writes
+simpoint.bb.gz: one basic-block vector (BBV) per interval of
+--simpoint_interval committed instructions. This module clusters those
+vectors with k-means (NumPy only) and picks, for each cluster, the interval
+closest to its centroid. Each representative is weighted by the fraction of
+all intervals in its cluster, so whole-program CPI can be rebuilt as the
+weighted sum of the representatives' CPIs (see data/CSV/parse_sampled.py).
+
+Following SimPoint 3.0:
+1. Each BBV is normalized to sum to 1
+2. Vectors are randomly projected down to PROJECTION_DIMS dimensions
+3. k-means runs for k = 1..max_k (several seeds each) and each clustering
+   is scored with the Bayesian Information Criterion
+4. The smallest k whose BIC reaches BIC_THRESHOLD of the best score wins
+
+Usage:
+  python3 scripts/simpoint.py cluster simpoint.bb.gz -o simpoints.json
+  python3 scripts/simpoint.py synthesize synthetic.bb.gz --phases 40 25 35
+"""
+
+import argparse
+import gzip
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+# Dimensions BBVs are projected down to before clustering
+PROJECTION_DIMS = 15
+
+# Largest number of clusters (= detailed simulations per design) tried
+MAX_K = 10
+
+# k-means restarts per k, and iteration cap per restart
+KMEANS_INITS = 5
+KMEANS_MAX_ITER = 100
+
+# Pick the smallest k whose BIC is within this fraction of the best
+BIC_THRESHOLD = 0.9
+
+# Defaults for interval length and detailed warmup (committed instructions)
+DEFAULT_INTERVAL_INSTS = 10_000_000
+DEFAULT_WARMUP_INSTS = 1_000_000
+
+
+def read_bbv(path):
+    """
+    Read a gem5 SimPoint BBV file (gzip or plain text) into a dense
+    intervals x basic-blocks count matrix. Each line is one interval:
+        T:<bb id>:<count> :<bb id>:<count> ...
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    rows = []
+    max_id = 0
+    with opener(path, 'rt') as f:
+        for line in f:
+            if not line.startswith("T"):
+                continue
+            row = {}
+            for token in line[1:].split():
+                _, bb_id, count = token.split(":")
+                row[int(bb_id)] = int(count)
+            if row:
+                max_id = max(max_id, max(row))
+            rows.append(row)
+
+    matrix = np.zeros((len(rows), max_id + 1))
+    for i, row in enumerate(rows):
+        ids = np.fromiter(row.keys(), dtype=np.int64, count=len(row))
+        matrix[i, ids] = np.fromiter(row.values(), dtype=np.float64, count=len(row))
+    return matrix
+
+
+def write_bbv(path, matrix):
+    """Write an intervals x basic-blocks count matrix in gem5's BBV format."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, 'wt') as f:
+        for row in matrix:
+            ids = np.nonzero(row)[0]
+            f.write("T" + " ".join(f":{i}:{int(row[i])}" for i in ids) + "\n")
+
+
+def normalize(matrix):
+    """Scale each interval's vector to sum to 1 (empty intervals stay zero)."""
+    totals = matrix.sum(axis=1, keepdims=True)
+    return np.divide(matrix, totals, out=np.zeros_like(matrix), where=totals > 0)
+
+
+def random_projection(matrix, dims=PROJECTION_DIMS, seed=0):
+    """Project vectors onto dims random directions drawn uniformly from [-1, 1]."""
+    if matrix.shape[1] <= dims:
+        return matrix
+    rng = np.random.default_rng(seed)
+    return matrix @ rng.uniform(-1.0, 1.0, size=(matrix.shape[1], dims))
+
+
+def squared_distances(points, centers):
+    """points x centers matrix of squared Euclidean distances."""
+    return (np.sum(points ** 2, axis=1)[:, None]
+            - 2.0 * points @ centers.T
+            + np.sum(centers ** 2, axis=1)[None, :]).clip(min=0.0)
+
+
+def kmeans(points, k, seed=0, max_iter=KMEANS_MAX_ITER):
+    """
+    One run of Lloyd's algorithm with k-means++ seeding.
+    Returns (labels, centers, distortion).
+    """
+    rng = np.random.default_rng(seed)
+    n = len(points)
+    k = min(k, n)
+
+    centers = [points[rng.integers(n)]]
+    for _ in range(1, k):
+        nearest = squared_distances(points, np.array(centers)).min(axis=1)
+        total = nearest.sum()
+        if total == 0:
+            centers.append(points[rng.integers(n)])
+        else:
+            centers.append(points[rng.choice(n, p=nearest / total)])
+    centers = np.array(centers)
+
+    labels = np.full(n, -1)
+    for _ in range(max_iter):
+        new_labels = squared_distances(points, centers).argmin(axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(k):
+            members = points[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+
+    distortion = squared_distances(points, centers)[np.arange(n), labels].sum()
+    return labels, centers, distortion
+
+
+def best_kmeans(points, k, seed=0, inits=KMEANS_INITS):
+    """Lowest-distortion clustering out of several seeded k-means runs."""
+    runs = [kmeans(points, k, seed=seed + i) for i in range(inits)]
+    return min(runs, key=lambda run: run[2])
+
+
+def bic(points, labels, k, distortion):
+    """
+    Bayesian Information Criterion of a clustering, modelling each cluster
+    as a spherical Gaussian with a shared variance (higher is better).
+    """
+    n, dims = points.shape
+    if n <= k:
+        return -np.inf
+    variance = max(distortion / (dims * (n - k)), 1e-12)
+    sizes = np.bincount(labels, minlength=k)
+    sizes = sizes[sizes > 0]
+
+    log_likelihood = (np.sum(sizes * np.log(sizes / n))
+                      - n * dims / 2.0 * np.log(2.0 * np.pi * variance)
+                      - distortion / (2.0 * variance))
+    free_parameters = (k - 1) + k * dims + 1
+    return log_likelihood - free_parameters / 2.0 * np.log(n)
+
+
+def choose_k(scores, threshold=BIC_THRESHOLD):
+    """Smallest k whose BIC reaches threshold of the way from the worst to the best score."""
+    ks = sorted(scores)
+    values = np.array([scores[k] for k in ks])
+    finite = np.isfinite(values)
+    if not finite.any():
+        return ks[0]
+    low, high = values[finite].min(), values[finite].max()
+    target = low + threshold * (high - low)
+    for k, value in zip(ks, values):
+        if np.isfinite(value) and value >= target:
+            return k
+    return ks[-1]
+
+
+def pick_simpoints(bbv, max_k=MAX_K, dims=PROJECTION_DIMS, seed=0):
+    """
+    Cluster a BBV matrix and return (simpoints, scores): one representative
+    interval per cluster with its weight, sorted by interval, and the BIC
+    of every k tried.
+    """
+    points = random_projection(normalize(bbv), dims, seed)
+    max_k = max(1, min(max_k, len(points)))
+
+    clusterings = {}
+    scores = {}
+    for k in range(1, max_k + 1):
+        labels, centers, distortion = best_kmeans(points, k, seed)
+        clusterings[k] = (labels, centers)
+        scores[k] = bic(points, labels, k, distortion)
+
+    labels, centers = clusterings[choose_k(scores)]
+    distances = squared_distances(points, centers)
+    simpoints = []
+    for c in range(len(centers)):
+        members = np.nonzero(labels == c)[0]
+        if len(members) == 0:
+            continue
+        representative = members[distances[members, c].argmin()]
+        simpoints.append({
+            "cluster": int(c),
+            "interval": int(representative),
+            "weight": len(members) / len(points)
+        })
+    simpoints.sort(key=lambda sp: sp["interval"])
+    for i, simpoint in enumerate(simpoints):
+        simpoint["id"] = i
+    return simpoints, scores
+
+
+def add_start_points(simpoints, interval_insts, warmup_insts):
+    """
+    Set where each representative's checkpoint is taken: warmup_insts
+    before its interval starts (less for intervals near the beginning).
+    """
+    for simpoint in simpoints:
+        start = simpoint["interval"] * interval_insts
+        simpoint["start_insts"] = max(0, start - warmup_insts)
+        simpoint["warmup_insts"] = start - simpoint["start_insts"]
+    return simpoints
+
+
+def write_simpoints(path, simpoints, interval_insts, num_intervals, scores, source=None):
+    """Write simpoints.json as read by a3_part4.py --simpoint_checkpoints."""
+    data = {
+        "source": str(source) if source else None,
+        "interval_insts": interval_insts,
+        "num_intervals": num_intervals,
+        "bic": {str(k): float(v) for k, v in scores.items()},
+        "simpoints": simpoints
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def synthetic_bbv(phase_lengths, num_blocks=64, blocks_per_phase=12,
+                  insts_per_interval=100_000, noise=0.05, seed=0):
+    """
+    Build a BBV matrix with a known phase structure, for checking the
+    clustering: phase p contributes phase_lengths[p] consecutive intervals
+    that all execute the same random subset of basic blocks, plus noise.
+    Returns (matrix, phase label of each interval).
+    """
+    rng = np.random.default_rng(seed)
+    rows = []
+    phases = []
+    for phase, length in enumerate(phase_lengths):
+        blocks = rng.choice(num_blocks, size=blocks_per_phase, replace=False)
+        profile = np.zeros(num_blocks)
+        profile[blocks] = rng.dirichlet(np.ones(blocks_per_phase))
+        for _ in range(length):
+            mix = profile * (1.0 - noise) + rng.dirichlet(np.ones(num_blocks)) * noise
+            rows.append(np.round(mix * insts_per_interval))
+            phases.append(phase)
+    return np.array(rows), np.array(phases)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SimPoint interval selection")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cluster = commands.add_parser("cluster", help="pick representative intervals from a BBV file")
+    cluster.add_argument("bbv", help="simpoint.bb.gz written by a3_part4.py --simpoint_profile")
+    cluster.add_argument("-o", "--output", default="simpoints.json")
+    cluster.add_argument("--interval", type=int, default=DEFAULT_INTERVAL_INSTS,
+                         help="instructions per BBV interval (--simpoint_interval of the profile)")
+    cluster.add_argument("--warmup", type=int, default=DEFAULT_WARMUP_INSTS,
+                         help="detailed warmup instructions before each interval")
+    cluster.add_argument("--max-k", type=int, default=MAX_K)
+    cluster.add_argument("--seed", type=int, default=0)
+
+    synthesize = commands.add_parser("synthesize", help="write a BBV file with known phases")
+    synthesize.add_argument("output")
+    synthesize.add_argument("--phases", type=int, nargs="+", default=[40, 25, 35],
+                            help="number of intervals in each phase")
+    synthesize.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "synthesize":
+        matrix, phases = synthetic_bbv(args.phases, seed=args.seed)
+        write_bbv(args.output, matrix)
+        print(f"✓ Wrote {len(matrix)} intervals in {len(args.phases)} phases to {args.output}")
+        for phase, length in enumerate(args.phases):
+            print(f"  phase {phase}: {length} intervals (weight {length / len(matrix):.3f})")
+        return
+
+    bbv = read_bbv(args.bbv)
+    simpoints, scores = pick_simpoints(bbv, max_k=args.max_k, seed=args.seed)
+    add_start_points(simpoints, args.interval, args.warmup)
+    write_simpoints(args.output, simpoints, args.interval, len(bbv), scores, source=args.bbv)
+
+    print(f"✓ {len(bbv)} intervals -> {len(simpoints)} simpoints (written to {args.output})")
+    for simpoint in simpoints:
+        print(f"  interval {simpoint['interval']:5d}  weight {simpoint['weight']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
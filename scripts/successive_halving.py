@@ -0,0 +1,228 @@
+"""
+successive_halving.py
+Successive-halving design search with the *_small inputs as cheap proxies
+
+Evaluates every candidate design of a sweep spec (see sweep.py) on the
+small-input variant of each workload, ranks the candidates by geometric
+mean IPC per credit, and promotes only the top 1/--eta of them (at least
+--min-promote) to the large inputs the assignment is graded on:
+1. Small rung: all candidates x <workload>_small
+2. Large rung: promoted candidates x <workload>, plus --validate
+   non-promoted candidates picked at random
+Both rungs are ordinary run_part4_sim.py --sweep runs, so the journal,
+result cache, admission control and catalog all apply, and candidates
+already simulated are reused.
+
+The report ranks the designs run on both input sizes and gives the
+Spearman and Kendall rank correlations between them (with the number of
+designs), overall and per workload: the small inputs are only a valid
+proxy if these stay high. The validation designs are what make the
+correlation meaningful: the promoted designs alone are the top of the
+small-input ranking, a narrow and biased sample of it.
+It is printed and written to data/part4/halving/<sweep>/report.json.
+
+Usage:
+  python3 scripts/successive_halving.py SPEC [--eta 3] [--min-promote 3] [--validate 3] [runner options]
+
+Runner options (--gem5, --no-cache, --max-parallel, --engine, --compress,
+...) are passed on to run_part4_sim.py.
+"""
+
+import argparse
+import math
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+from scipy import stats
+
+from checkpoints import restored_inside_roi
+from run_part4_sim import DATA_DIR, SMALL_WORKLOADS, WORKLOADS
+from sweep import expand, load_spec, save_sweep
+from sweep_status import write_json_atomic
+
+# parse_data.py lives under data/CSV
+sys.path.insert(0, str(Path(__file__).parent.parent / "data" / "CSV"))
+from parse_data import extract_middle_stats
+
+RUNNER = Path(__file__).parent / "run_part4_sim.py"
+HALVING_DIR = DATA_DIR / "halving"
+
+DEFAULT_ETA = 3
+DEFAULT_MIN_PROMOTE = 3
+DEFAULT_VALIDATE = 3
+SEED = 368
+
+IPC_STAT = "system.cpu.ipc"
+
+
+def run_rung(search, rung, design_ids, workloads, runner_args):
+    """Simulate design_ids x workloads with run_part4_sim.py --sweep. Returns success."""
+    name = f"{search}__{rung}"
+    spec_path = HALVING_DIR / search / f"{name}.json"
+    write_json_atomic(spec_path, {"name": name, "designs": design_ids, "workloads": workloads})
+    cmd = [sys.executable, str(RUNNER), "--sweep", str(spec_path)] + runner_args
+    return subprocess.run(cmd).returncode == 0
+
+
+def run_ipc(design_id, workload):
+    """ROI IPC of one finished run, or None if it has no usable stats."""
+    if restored_inside_roi(DATA_DIR / design_id / workload):
+        return None
+    roi = extract_middle_stats(DATA_DIR / design_id / workload / "stats.txt", names=[IPC_STAT])
+    return roi.get(IPC_STAT) if roi else None
+
+
+def score_designs(designs, workloads):
+    """
+    design_id -> {"ipc": {workload: IPC}, "geomean_ipc", "score"} for the
+    designs with every run complete; score is geomean IPC per credit.
+    """
+    scores = {}
+    for design_id, config in designs.items():
+        ipcs = {workload: run_ipc(design_id, workload) for workload in workloads}
+        if any(ipc is None or ipc <= 0 for ipc in ipcs.values()):
+            continue
+        geomean = math.exp(sum(math.log(ipc) for ipc in ipcs.values()) / len(ipcs))
+        scores[design_id] = {"ipc": ipcs, "geomean_ipc": geomean, "score": geomean / config["credits"]}
+    return scores
+
+
+def ranking(scores):
+    """design ids by descending score."""
+    return sorted(scores, key=lambda design_id: scores[design_id]["score"], reverse=True)
+
+
+def rank_correlation(small, large):
+    """Spearman's rho and Kendall's tau of two equally long lists of values, and their length n."""
+    if len(small) < 3:
+        return {"n": len(small), "spearman": None, "kendall": None}
+    return {"n": len(small),
+            "spearman": float(stats.spearmanr(small, large).statistic),
+            "kendall": float(stats.kendalltau(small, large).statistic)}
+
+
+def proxy_report(design_ids, small_scores, large_scores, workloads):
+    """Rank correlation between the small and large results of design_ids (promoted and validation)."""
+    both = [design_id for design_id in design_ids if design_id in large_scores]
+    report = {"designs": both,
+              "overall": rank_correlation([small_scores[d]["score"] for d in both],
+                                          [large_scores[d]["score"] for d in both]),
+              "workloads": {}}
+    for workload in workloads:
+        report["workloads"][workload] = rank_correlation(
+            [small_scores[d]["ipc"][SMALL_WORKLOADS[workload]] for d in both],
+            [large_scores[d]["ipc"][workload] for d in both])
+    return report
+
+
+def format_correlation(correlation):
+    if correlation["spearman"] is None:
+        return f"n/a (n={correlation['n']}, fewer than 3 designs)"
+    return f"Spearman {correlation['spearman']:+.3f}, Kendall {correlation['kendall']:+.3f} (n={correlation['n']})"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Successive-halving design search using the *_small workloads as proxies",
+        epilog="Other options are passed on to run_part4_sim.py")
+    parser.add_argument('spec', help="sweep spec of the candidate designs (see sweep.py)")
+    parser.add_argument('--eta', type=float, default=DEFAULT_ETA,
+                        help=f"promote the top 1/eta of the candidates to the large inputs (default: {DEFAULT_ETA})")
+    parser.add_argument('--min-promote', type=int, default=DEFAULT_MIN_PROMOTE,
+                        help="promote at least this many candidates, so the rank correlation "
+                             f"can be computed (default: {DEFAULT_MIN_PROMOTE})")
+    parser.add_argument('--validate', type=int, default=DEFAULT_VALIDATE,
+                        help="also run this many non-promoted candidates, picked at random, on the large "
+                             f"inputs to check the small-vs-large rank correlation (default: {DEFAULT_VALIDATE})")
+    parser.add_argument('--seed', type=int, default=SEED, help="seed of the validation sample")
+    args, runner_args = parser.parse_known_args()
+    if args.eta <= 1:
+        parser.error("--eta must be greater than 1")
+    if {'--sweep', '--resume'} & set(runner_args):
+        parser.error("--sweep and --resume are chosen by the search itself")
+
+    spec = load_spec(args.spec)
+    try:
+        candidates, expansion = expand(spec)
+    except ValueError as e:
+        print(f"✗ {args.spec}: {e}")
+        return
+    workloads = spec.get("workloads", WORKLOADS)
+    unknown = [w for w in workloads if w not in SMALL_WORKLOADS]
+    if unknown:
+        print(f"✗ {args.spec}: no small-input variant of {', '.join(unknown)}")
+        return
+    save_sweep(spec, candidates)
+    small_workloads = [SMALL_WORKLOADS[w] for w in workloads]
+    name = spec["name"]
+
+    print("=" * 80)
+    print(f"Successive halving over {len(candidates)} candidates of {name} "
+          f"({expansion['rejected']} rejected by constraints, {expansion['duplicates']} duplicates merged)")
+    print(f"Workloads: {', '.join(workloads)}")
+    print("=" * 80)
+
+    # Small rung: every candidate on the cheap inputs
+    if not run_rung(name, "small", list(candidates), small_workloads, runner_args):
+        print("✗ Small-input rung failed")
+        return
+    small_scores = score_designs(candidates, small_workloads)
+    if not small_scores:
+        print("✗ No candidate completed every small-input run")
+        return
+    small_rank = ranking(small_scores)
+    keep = min(len(small_rank), max(args.min_promote, math.ceil(len(small_rank) / args.eta)))
+    promoted = small_rank[:keep]
+    rest = small_rank[keep:]
+    validation = sorted(random.Random(args.seed).sample(rest, min(max(args.validate, 0), len(rest))),
+                        key=small_rank.index)
+    checked = promoted + validation
+    print(f"\n✓ Small inputs: {len(small_scores)}/{len(candidates)} candidates scored, "
+          f"promoting the top {keep} (+{len(validation)} at random to validate the proxy)")
+
+    # Large rung: the promoted and validation candidates on the real inputs
+    if not run_rung(name, "large", checked, workloads, runner_args):
+        print("✗ Large-input rung failed")
+        return
+    large_scores = score_designs({d: candidates[d] for d in checked}, workloads)
+    large_rank = ranking(large_scores)
+    proxy = proxy_report(checked, small_scores, large_scores, workloads)
+
+    print("\n" + "=" * 80)
+    print("SUCCESSIVE HALVING RESULTS")
+    print("=" * 80)
+    print(f"\n{'Design':<24} {'Role':<10} {'Small rank':>10} {'Small score':>12} {'Large rank':>10} {'Large score':>12}")
+    for design_id in checked:
+        small = small_scores[design_id]
+        large = large_scores.get(design_id)
+        large_cols = (f"{large_rank.index(design_id) + 1:>10} {large['score']:>12.6g}"
+                      if large else f"{'-':>10} {'failed':>12}")
+        role = "promoted" if design_id in promoted else "validation"
+        print(f"{design_id:<24} {role:<10} {small_rank.index(design_id) + 1:>10} {small['score']:>12.6g} {large_cols}")
+    print(f"\nSmall vs large rank correlation ({len(proxy['designs'])} designs, "
+          f"{sum(d in validation for d in proxy['designs'])} of them validation):")
+    print(f"  {'overall':<16} {format_correlation(proxy['overall'])}")
+    for workload, correlation in proxy["workloads"].items():
+        print(f"  {workload:<16} {format_correlation(correlation)}")
+    large_runs = len(checked) * len(workloads)
+    print(f"\nLarge-input runs: {large_runs} instead of {len(candidates) * len(workloads)} "
+          f"(+{len(candidates) * len(small_workloads)} small-input runs)")
+    if large_rank:
+        print(f"✓ Best design: {large_rank[0]} ({candidates[large_rank[0]]['name']})")
+
+    report_path = HALVING_DIR / name / "report.json"
+    write_json_atomic(report_path, {
+        "spec": spec, "eta": args.eta, "workloads": workloads,
+        "small": {"scores": small_scores, "ranking": small_rank},
+        "promoted": promoted,
+        "validation": validation,
+        "large": {"scores": large_scores, "ranking": large_rank},
+        "rank_correlation": proxy
+    })
+    print(f"Report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
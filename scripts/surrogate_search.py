@@ -0,0 +1,184 @@
+"""
+surrogate_search.py
+Surrogate-guided design search: simulate only the points that can matter
+
+Instead of simulating every candidate of a sweep spec (see sweep.py), each
+round:
+1. fits the IPC surrogate (data/CSV/surrogate.py) to every full run in
+   the results catalog
+2. predicts the geomean IPC, with its uncertainty, of the candidates not
+   simulated yet on all of the spec's workloads
+3. queues only the candidates whose optimistic IPC could reach the
+   IPC-vs-credit Pareto front of the designs simulated so far, or that
+   the model is too unsure of (at most --budget per round)
+4. runs them with run_part4_sim.py --sweep --parse-on-complete, so they
+   land in the catalog for the next round
+Rounds stop after --rounds or once no candidate qualifies; the rest of
+the design space is pruned without being simulated. Before the catalog
+has any run of a workload, a round seeds it with --budget candidates
+spread evenly over the credit range.
+
+Each round's queue is written to data/part4/surrogate/<sweep>/; with
+--dry-run it is only written and printed.
+
+Usage:
+  python3 scripts/surrogate_search.py SPEC [--budget 8] [--rounds 3] [--dry-run] [runner options]
+
+Runner options (--gem5, --no-cache, --max-parallel, --engine, --compress,
+...) are passed on to run_part4_sim.py.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from results_catalog import CATALOG_FILE
+from run_part4_sim import DATA_DIR, WORKLOADS
+from sweep import GEM5_SCRIPT, all_designs, design_options, effective_params, expand, load_spec, save_sweep
+from gem5_schema import load_schema
+from sweep_status import write_json_atomic
+
+# surrogate.py lives under data/CSV
+sys.path.insert(0, str(Path(__file__).parent.parent / "data" / "CSV"))
+from surrogate import (DEFAULT_BAND, DEFAULT_KAPPA, DEFAULT_MAX_STD, IPCSurrogate, design_features,
+                       load_training, select_for_simulation)
+
+RUNNER = Path(__file__).parent / "run_part4_sim.py"
+SURROGATE_DIR = DATA_DIR / "surrogate"
+
+DEFAULT_BUDGET = 8
+DEFAULT_ROUNDS = 3
+
+
+def simulated_geomeans(training, workloads):
+    """design -> geomean IPC over workloads, for the designs that ran all of them."""
+    matrix = training.pivot_table(index='design', columns='workload', values='ipc', aggfunc='last')
+    if not set(workloads) <= set(matrix.columns):
+        return {}
+    matrix = matrix[workloads].dropna()
+    return dict(zip(matrix.index, np.exp(np.log(matrix.to_numpy()).mean(axis=1))))
+
+
+def design_credits_of(design_ids):
+    """Credits of simulated designs, from designs.py or the saved sweeps."""
+    designs = all_designs()
+    return np.array([designs[d]['credits'] if d in designs else np.nan for d in design_ids], dtype=float)
+
+
+def spread_over_credits(credits, count):
+    """Indices of count points spread evenly over the credit range (cold start)."""
+    order = np.argsort(credits, kind='stable')
+    return order[np.unique(np.linspace(0, len(order) - 1, min(count, len(order))).round().astype(int))]
+
+
+def plan_round(candidates, features, workloads, training, args):
+    """
+    Candidate ids to simulate next and a line per id describing why.
+    Returns ([], [...]) once no candidate qualifies.
+    """
+    geomeans = simulated_geomeans(training, workloads)
+    pending = [design_id for design_id in candidates if design_id not in geomeans]
+    if not pending:
+        return [], []
+    credits = np.array([candidates[d]['credits'] for d in pending], dtype=float)
+
+    if set(workloads) - set(training['workload']):
+        chosen = spread_over_credits(credits, args.budget)
+        return [pending[i] for i in chosen], [f"{credits[i]:>6.0f} credits  (seed: no model yet)" for i in chosen]
+
+    model = IPCSurrogate().fit(training[training['workload'].isin(workloads)])
+    mean, std = model.predict_geomean(np.array([features[d] for d in pending]), workloads)
+    simulated = list(geomeans)
+    simulated_credits = design_credits_of(simulated)
+    costed = ~np.isnan(simulated_credits)
+    chosen = select_for_simulation(credits, mean, std, simulated_credits[costed],
+                                   np.array(list(geomeans.values()))[costed],
+                                   kappa=args.kappa, band=args.band, max_std=args.max_std, budget=args.budget)
+    print(f"  Surrogate: {len(pending)} unsimulated candidates, {len(simulated)} designs simulated, "
+          f"{len(chosen)} worth simulating")
+    return ([pending[i] for i in chosen],
+            [f"{credits[i]:>6.0f} credits  predicted IPC {np.exp(mean[i]):.4f} ±{100 * std[i]:.1f}%"
+             for i in chosen])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Surrogate-guided design search: simulate only points near the Pareto front or uncertain",
+        epilog="Other options are passed on to run_part4_sim.py")
+    parser.add_argument('spec', help="sweep spec of the candidate designs (see sweep.py)")
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET,
+                        help=f"most candidates simulated per round (default: {DEFAULT_BUDGET})")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS,
+                        help=f"fit / select / simulate rounds (default: {DEFAULT_ROUNDS})")
+    parser.add_argument('--kappa', type=float, default=DEFAULT_KAPPA,
+                        help=f"optimism of the front test, in standard deviations (default: {DEFAULT_KAPPA})")
+    parser.add_argument('--band', type=float, default=DEFAULT_BAND,
+                        help=f"relative IPC distance to the front that counts as near it (default: {DEFAULT_BAND})")
+    parser.add_argument('--max-std', type=float, default=DEFAULT_MAX_STD,
+                        help="simulate points whose predicted log IPC has a larger standard deviation "
+                             f"(default: {DEFAULT_MAX_STD})")
+    parser.add_argument('--catalog', default=str(CATALOG_FILE),
+                        help="results catalog to train on, and that the runner records the rounds in")
+    parser.add_argument('--dry-run', action='store_true', help="write and print the first queue without running it")
+    args, runner_args = parser.parse_known_args()
+    if {'--sweep', '--resume'} & set(runner_args):
+        parser.error("--sweep and --resume are chosen by the search itself")
+
+    spec = load_spec(args.spec)
+    try:
+        candidates, expansion = expand(spec)
+    except ValueError as e:
+        print(f"✗ {args.spec}: {e}")
+        return
+    workloads = spec.get("workloads", WORKLOADS)
+    unknown = [w for w in workloads if w not in WORKLOADS]
+    if unknown:
+        print(f"✗ {args.spec}: unknown workloads {', '.join(unknown)}")
+        return
+    save_sweep(spec, candidates)
+    name = spec["name"]
+    options = design_options(load_schema(GEM5_SCRIPT))
+    features = {d: design_features(effective_params(config['params'], options)) for d, config in candidates.items()}
+
+    print("=" * 80)
+    print(f"Surrogate-guided search over {len(candidates)} candidates of {name} "
+          f"({expansion['rejected']} rejected by constraints, {expansion['duplicates']} duplicates merged)")
+    print(f"Workloads: {', '.join(workloads)}")
+    print("=" * 80)
+
+    simulated = 0
+    for round_number in range(1, args.rounds + 1):
+        print(f"\nRound {round_number}:")
+        training = load_training(Path(args.catalog))
+        queue, reasons = plan_round(candidates, features, workloads, training, args)
+        if not queue:
+            print("✓ No unsimulated candidate can reach the Pareto front or is uncertain; search done")
+            break
+        for design_id, reason in zip(queue, reasons):
+            print(f"  {design_id:<24} {reason}")
+
+        queue_path = SURROGATE_DIR / name / f"{name}__round{round_number}.json"
+        write_json_atomic(queue_path, {"name": f"{name}__round{round_number}", "designs": queue,
+                                       "workloads": workloads})
+        if args.dry_run:
+            print(f"\nQueue written to {queue_path}; run it with:")
+            print(f"  python3 scripts/run_part4_sim.py --sweep {queue_path} --parse-on-complete "
+                  f"--catalog {args.catalog}")
+            return
+        cmd = [sys.executable, str(RUNNER), "--sweep", str(queue_path), "--parse-on-complete",
+               "--catalog", args.catalog] + runner_args
+        if subprocess.run(cmd).returncode != 0:
+            print(f"✗ Round {round_number} failed")
+            return
+        simulated += len(queue)
+
+    print(f"\n✓ Simulated {simulated} of {len(candidates)} candidates: {simulated * len(workloads)} runs "
+          f"instead of {len(candidates) * len(workloads)} for the full sweep")
+    print(f"  Frontier: python3 data/CSV/pareto.py --catalog {args.catalog}")
+
+
+if __name__ == "__main__":
+    main()
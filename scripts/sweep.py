@@ -0,0 +1,296 @@
+"""
+sweep.py
+Declarative design-space sweeps for the Part 4 runner
+
+A sweep spec (YAML or JSON) declares base parameters, the axes to vary and
+the constraints every point must meet; expand() turns it into designs in
+the same form as PROCESSOR_CONFIGS, which run_part4_sim.py --sweep SPEC
+queues like the hand-written ones:
+
+  name: rob_lsq
+  base: design_a                      # a design from designs.py,
+  params: {num_iq_entries: 48}        # and/or parameters (override base)
+  design: lhs                         # full_factorial (default), lhs or oat
+  samples: 64                         # lhs: points to draw
+  seed: 368                           # lhs: random seed
+  axes:
+    num_rob_entries: [32, 64, 128, 192]
+    lq_entries: {range: [8, 32, 8]}   # start, stop (inclusive), step
+    num_iq_entries: {pow2: [16, 64]}  # powers of two from 16 to 64
+  link:
+    sq_entries: lq_entries            # always equal to another parameter
+  constraints:
+    - num_iq_entries <= num_rob_entries
+    - lq_entries + sq_entries <= num_rob_entries // 2
+  workloads: [qsort, susan_edges]     # default: all of them
+
+A spec can also list existing designs (from designs.py or saved sweeps)
+to run as they are, alone or next to generated points:
+
+  designs: [design_a, rob_lsq_3f2a9c01d4]
+
+Designs:
+- full_factorial: every combination of the axis values
+- lhs: a Latin hypercube sample of the axes (each axis' values hit evenly)
+- oat: one at a time, the base point plus each axis varied alone
+
+Parameter names, types and choices are checked against a3_part4.py's
+argparse schema (gem5_schema.py), and constraints are arithmetic and
+comparisons over parameter names. Points whose effective parameters are
+the same (after links, type conversion and a3_part4.py's defaults) are
+merged, every point is costed in credits by cost_model.py, and a point equal to a design in designs.py keeps that design's
+id, so no configuration is simulated twice. Other points are named
+<sweep>_<hash of their parameters>, stable across invocations, --resume
+and the result cache.
+
+Expanded sweeps are saved to data/part4/sweeps/<name>.json; all_designs()
+merges them with PROCESSOR_CONFIGS so resumed sweeps and the results
+catalog can find every point's parameters.
+
+Usage:
+  python3 scripts/sweep.py SPEC [--commands]
+"""
+
+import argparse
+import ast
+import hashlib
+import itertools
+import json
+from pathlib import Path
+
+from cost_model import design_credits
+from designs import PROCESSOR_CONFIGS
+from gem5_schema import load_schema, normalize_params, option_args
+from sweep_status import write_json_atomic
+
+PROJECT_ROOT = Path(__file__).parent.parent
+GEM5_SCRIPT = PROJECT_ROOT / "gem5scripts" / "a3_part4.py"
+SWEEPS_DIR = PROJECT_ROOT / "data" / "part4" / "sweeps"
+
+DESIGN_METHODS = ["full_factorial", "lhs", "oat"]
+DEFAULT_LHS_SAMPLES = 32
+DEFAULT_SEED = 368
+
+# a3_part4.py options the runner sets itself (run modes, not design
+# parameters), which specs may not sweep
+RUNNER_OPTIONS = ("out_dir", "checkpoint_", "restore_", "simpoint_", "smarts_",
+                  "max_insts", "converge", "stat_period_")
+
+# Syntax allowed in constraints
+CONSTRAINT_NODES = (ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+                    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+                    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+                    ast.Name, ast.Load, ast.Constant, ast.Tuple, ast.List)
+
+
+def load_spec(path):
+    """Read a sweep spec from a .yaml/.yml or .json file."""
+    path = Path(path)
+    with open(path, 'r') as f:
+        if path.suffix in (".yaml", ".yml"):
+            import yaml
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    spec.setdefault("name", path.stem)
+    return spec
+
+
+def design_options(schema):
+    """The a3_part4.py options that describe a design (everything the runner does not set)."""
+    return {name: option for name, option in schema.items()
+            if not name.startswith(RUNNER_OPTIONS)}
+
+
+def axis_values(name, entry):
+    """The values of one axis: a list, {range: [start, stop, step]} or {pow2: [low, high]}."""
+    if isinstance(entry, list):
+        values = entry
+    elif isinstance(entry, dict) and "range" in entry:
+        start, stop, step = entry["range"]
+        values = list(range(start, stop + 1, step))
+    elif isinstance(entry, dict) and "pow2" in entry:
+        low, high = entry["pow2"]
+        values = [1 << bits for bits in range(high.bit_length()) if low <= 1 << bits <= high]
+    else:
+        raise ValueError(f"axis {name}: expected a list, {{range: [start, stop, step]}} or {{pow2: [low, high]}}")
+    if not values:
+        raise ValueError(f"axis {name} has no values")
+    return list(dict.fromkeys(values))
+
+
+def compile_constraint(expression, names):
+    """Compile a constraint, allowing only arithmetic and comparisons over names."""
+    tree = ast.parse(expression, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, CONSTRAINT_NODES):
+            raise ValueError(f"constraint {expression!r}: {type(node).__name__} is not allowed")
+        if isinstance(node, ast.Name) and node.id not in names:
+            raise ValueError(f"constraint {expression!r}: unknown parameter {node.id!r}")
+    return compile(tree, f"<constraint {expression}>", "eval")
+
+
+def full_factorial(axes):
+    """Every combination of the axis values."""
+    names = list(axes)
+    for values in itertools.product(*axes.values()):
+        yield dict(zip(names, values))
+
+
+def latin_hypercube(axes, samples, seed):
+    """samples points of a Latin hypercube over the axes' value indices."""
+    from scipy.stats import qmc
+    names = list(axes)
+    sampler = qmc.LatinHypercube(d=len(names), seed=seed)
+    for row in sampler.random(samples):
+        yield {name: axes[name][min(int(u * len(axes[name])), len(axes[name]) - 1)]
+               for name, u in zip(names, row)}
+
+
+def one_at_a_time(axes, base):
+    """The base point, then each axis set to each of its other values alone."""
+    center = {name: base.get(name, values[0]) for name, values in axes.items()}
+    yield dict(center)
+    for name, values in axes.items():
+        for value in values:
+            if value != center[name]:
+                yield {**center, name: value}
+
+
+def effective_params(params, options):
+    """A design's parameters with a3_part4.py's defaults filled in: equal for equivalent points."""
+    return {name: params.get(name, option.default) for name, option in sorted(options.items())}
+
+
+def params_hash(effective):
+    return hashlib.sha1(json.dumps(effective, sort_keys=True).encode()).hexdigest()[:10]
+
+
+def expand(spec, schema=None):
+    """
+    Expand a sweep spec into {design_id: {"name", "params"}} in generation
+    order, and a report of how many points were generated, rejected by the
+    constraints and merged as duplicates.
+    Raises ValueError if the spec is invalid.
+    """
+    schema = schema if schema is not None else load_schema(GEM5_SCRIPT)
+    options = design_options(schema)
+    name = spec.get("name", "sweep")
+    method = spec.get("design", "full_factorial")
+    if method not in DESIGN_METHODS:
+        raise ValueError(f"unknown design {method!r} (expected one of {', '.join(DESIGN_METHODS)})")
+
+    designs = {}
+    report = {"generated": 0, "rejected": 0, "duplicates": 0}
+    if spec.get("designs"):
+        saved = all_designs()
+        unknown = [design_id for design_id in spec["designs"] if design_id not in saved]
+        if unknown:
+            raise ValueError(f"unknown design(s) {', '.join(unknown)}")
+        for design_id in spec["designs"]:
+            normalize_params(saved[design_id]["params"], options)  # still valid for a3_part4.py
+            designs[design_id] = saved[design_id]
+        if not any(key in spec for key in ("base", "params", "axes")):
+            report["designs"] = len(designs)
+            return designs, report
+
+    base = {}
+    if spec.get("base"):
+        if spec["base"] not in PROCESSOR_CONFIGS:
+            raise ValueError(f"unknown base design {spec['base']!r}")
+        base.update(PROCESSOR_CONFIGS[spec["base"]]["params"])
+    base.update(spec.get("params", {}))
+    axes = {axis: axis_values(axis, entry) for axis, entry in spec.get("axes", {}).items()}
+    links = spec.get("link", {})
+    for param in list(base) + list(axes) + list(links) + list(links.values()):
+        if param not in options:
+            raise ValueError(f"{param!r} is not a design option of {GEM5_SCRIPT.name}")
+    base = normalize_params(base, options)
+    axes = {axis: [options[axis].normalize(value) for value in values] for axis, values in axes.items()}
+    constraints = [(expression, compile_constraint(expression, options))
+                   for expression in spec.get("constraints", [])]
+
+    # Designs in designs.py (and listed ones) keep their ids when a sweep reaches them
+    known = {params_hash(effective_params(config["params"], options)): design_id
+             for design_id, config in {**PROCESSOR_CONFIGS, **designs}.items()}
+
+    if method == "oat":
+        points = one_at_a_time(axes, base)
+    elif method == "lhs":
+        points = latin_hypercube(axes, spec.get("samples", DEFAULT_LHS_SAMPLES), spec.get("seed", DEFAULT_SEED))
+    else:
+        points = full_factorial(axes)
+
+    for point in points:
+        report["generated"] += 1
+        params = {**base, **point}
+        for param, source in links.items():
+            params[param] = params[source]
+        effective = effective_params(params, options)
+        if not all(eval(code, {"__builtins__": {}}, dict(effective)) for _, code in constraints):
+            report["rejected"] += 1
+            continue
+        digest = params_hash(effective)
+        design_id = known.get(digest, f"{name}_{digest}")
+        if design_id in designs:
+            report["duplicates"] += 1
+            continue
+        if design_id in PROCESSOR_CONFIGS:
+            designs[design_id] = PROCESSOR_CONFIGS[design_id]
+            continue
+        label = ", ".join(f"{axis}={params[axis]}" for axis in axes) or "base"
+        designs[design_id] = {"name": f"{name}: {label}", "credits": design_credits(effective), "params": params}
+    report["designs"] = len(designs)
+    return designs, report
+
+
+def save_sweep(spec, designs):
+    """Record an expanded sweep so its points can be looked up later (all_designs)."""
+    path = SWEEPS_DIR / f"{spec.get('name', 'sweep')}.json"
+    write_json_atomic(path, {"spec": spec, "designs": designs})
+    return path
+
+
+def all_designs():
+    """PROCESSOR_CONFIGS plus the points of every saved sweep."""
+    designs = {}
+    for path in sorted(SWEEPS_DIR.glob("*.json")):
+        try:
+            with open(path, 'r') as f:
+                designs.update(json.load(f)["designs"])
+        except (OSError, ValueError, KeyError):
+            continue
+    # Sweeps saved before points were costed
+    options = design_options(load_schema(GEM5_SCRIPT))
+    for config in designs.values():
+        if config.get("credits") is None:
+            config["credits"] = design_credits(effective_params(config["params"], options))
+    designs.update(PROCESSOR_CONFIGS)
+    return designs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expand a sweep spec into Part 4 design points")
+    parser.add_argument('spec', help="sweep spec (.yaml, .yml or .json)")
+    parser.add_argument('--commands', action='store_true',
+                        help="print each point's a3_part4.py design arguments")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    try:
+        designs, report = expand(spec)
+    except ValueError as e:
+        print(f"✗ {args.spec}: {e}")
+        return
+
+    schema = load_schema(GEM5_SCRIPT)
+    for design_id, config in designs.items():
+        print(f"{design_id:<24} {config['credits']:>5} credits  {config['name']}")
+        if args.commands:
+            print("    " + " ".join(option_args(config['params'], schema)))
+    print(f"\n✓ {report['designs']} design points from {report['generated']} generated "
+          f"({report['rejected']} rejected by constraints, {report['duplicates']} duplicates merged)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+sweep_status.py
+Live progress tracking for the Part 4 simulation sweep
+
+Keeps per-job state (queued, running, completed, failed, cached, resumed) for every
+job in a sweep and renders it into the dict written to status.json after
+every start and completion. The sweep ETA is predicted from each job's
+estimated run time (see scheduler.py), counting how long running jobs have
+already been going.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from scheduler import predict_makespan
+
+
+def write_json_atomic(path, data):
+    """
+    Write data as JSON so readers never see a half-written file:
+    write to a temporary file in the same directory, fsync, then rename.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def job_name(job):
+    """Name a job the same way the worker names its result."""
+    return f"{job['design_id']}/{job['workload']}"
+
+
+class SweepStatus:
+    """Per-job and overall progress of one sweep."""
+
+    def __init__(self, jobs, workers, designs, workloads, predicted_makespan):
+        self.workers = workers
+        self.designs = designs
+        self.workloads = workloads
+        self.predicted_makespan = predicted_makespan
+        self.start_time = time.time()
+        self.jobs = {}
+        for job in jobs:
+            self.jobs[job_name(job)] = {
+                "state": "queued",
+                "estimated_seconds": job.get('estimated_seconds'),
+                "output_dir": job['output_dir']
+            }
+
+    def mark_cached(self, name, state="cached"):
+        """Mark a job that needs no simulation (restored from cache, or already done on --resume)."""
+        entry = self.jobs[name]
+        entry["state"] = state
+        entry["elapsed_seconds"] = 0.0
+        entry["finished"] = datetime.now().isoformat()
+
+    def mark_started(self, name, started_at):
+        entry = self.jobs[name]
+        if entry["state"] == "queued":
+            entry["state"] = "running"
+            entry["started_at"] = started_at
+            entry["started"] = datetime.fromtimestamp(started_at).isoformat()
+
+    def mark_finished(self, result):
+        entry = self.jobs[result['name']]
+        entry["state"] = "completed" if result['success'] else "failed"
+        entry["elapsed_seconds"] = result['elapsed_time']
+        entry["returncode"] = result['returncode']
+        entry["finished"] = datetime.now().isoformat()
+        entry.pop("started_at", None)
+        if 'error' in result:
+            entry["error"] = result['error']
+
+    def set_metrics(self, name, metrics):
+        """Attach headline metrics parsed from a finished run."""
+        self.jobs[name]["ipc"] = metrics.get('ipc')
+
+    def count(self, *states):
+        return sum(1 for entry in self.jobs.values() if entry["state"] in states)
+
+    def eta_seconds(self):
+        """
+        Predict the remaining wall-clock time: running jobs need their
+        estimate minus the time already spent, queued jobs their full
+        estimate, scheduled on the pool's workers.
+        """
+        now = time.time()
+        running = []
+        queued = []
+        for entry in self.jobs.values():
+            estimate = entry.get("estimated_seconds") or 0.0
+            if entry["state"] == "running":
+                running.append(max(0.0, estimate - (now - entry["started_at"])))
+            elif entry["state"] == "queued":
+                queued.append(estimate)
+        return predict_makespan(sorted(running, reverse=True) + queued, self.workers)
+
+    def snapshot(self):
+        """Render the current state as the status.json payload."""
+        now = time.time()
+        eta = self.eta_seconds()
+        simulations = {}
+        for name, entry in self.jobs.items():
+            simulations[name] = {k: v for k, v in entry.items() if k != "started_at"}
+            if entry["state"] == "running":
+                simulations[name]["elapsed_seconds"] = now - entry["started_at"]
+
+        return {
+            "start_time": datetime.fromtimestamp(self.start_time).isoformat(),
+            "updated": datetime.fromtimestamp(now).isoformat(),
+            "total_simulations": len(self.jobs),
+            "completed": self.count("completed", "cached", "resumed"),
+            "failed": self.count("failed"),
+            "in_progress": self.count("running"),
+            "queued": self.count("queued"),
+            "elapsed_seconds": now - self.start_time,
+            "eta_seconds": eta,
+            "eta": (datetime.fromtimestamp(now) + timedelta(seconds=eta)).isoformat(),
+            "predicted_makespan_seconds": self.predicted_makespan,
+            "designs": self.designs,
+            "workloads": self.workloads,
+            "simulations": simulations
+        }